@@ -2,20 +2,12 @@ const express = require('express');
 const fetch = require('node-fetch'); // Ensure you have node-fetch installed
 const crypto = require('crypto');
 const app = express();
-const redis = require('redis');
 const FormData = require('form-data');
 
 // Generate a new secret each time the app starts
 const TELEGRAM_SECRET = crypto.randomBytes(32).toString('hex');
 const TELERGAM_WEBHOOK_URL = `https://tarot.soniclords.com/api/telegram/hook`;
 
-const redisClient = redis.createClient({
-    host: '127.0.0.1',
-    port: 6379
-});
-// Connect to the KeyDB/Redis server
-redisClient.on('error', (err) => console.error('Redis/KeyDB Client Error', err));
-redisClient.connect();
 app.use(express.json());
 
 // Single page route at "/"
@@ -38,24 +30,41 @@ function formatTime(seconds) {
     return parts.join(', ');
 }
 
+// One reading per user every twelve hours, the agent's default "readings" limit
+const READING_WINDOW_SECONDS = 12 * 60 * 60;
+// Last reading time of each user, for when the agent's limiter can't be reached
+const localReadings = new Map();
+
+const checkLocalRateLimit = (userId) => {
+    const now = Date.now() / 1000;
+    for (const [user, readAt] of localReadings) {
+        if (now - readAt >= READING_WINDOW_SECONDS) localReadings.delete(user);
+    }
+    const readAt = localReadings.get(userId);
+    if (readAt !== undefined) {
+        return Math.ceil(readAt + READING_WINDOW_SECONDS - now);
+    }
+    localReadings.set(userId, now);
+    return true;
+};
+
 // A helper function to check if the user is allowed to trigger a reading.
+// Takes a slot of the agent's shared "readings" limiter, so readings requested here and
+// through the agent's own Telegram ingestion count against the same per-user budget
 const checkRateLimit = async (userId) => {
-    const key = `telegram_user:${userId}`;
-    // Check if the key exists
-    const exists = await redisClient.exists(key);
-    if (!exists) {
-        // Key doesn't exist, so we set it with a 1-hour expiration (3600 seconds)
-        const one_second = 1;
-        const one_hour = 3600;
-        const one_day = 86400;
-        const half_a_day = 43200;
-        await redisClient.setEx(key, half_a_day, '1');
-        return true; // Allowed
-    } else {
-        // Get the remaining time-to-live in seconds
-        const ttl = await redisClient.ttl(key);
-        return ttl; // Return the remaining seconds the user must wait
+    const { allowed, retry_after } = await callAgentAction(
+        `http://localhost:8000/user-limits/readings/telegram:${userId}`, {}, "POST"
+    );
+    if (allowed === undefined) {
+        // Agent down, not loaded or limiter missing: never let that lift the limit
+        console.error('Could not check the reading limit of', userId, 'with the agent, checking locally');
+        return checkLocalRateLimit(userId);
+    }
+    if (allowed) {
+        localReadings.set(userId, Date.now() / 1000);
+        return true;
     }
+    return retry_after; // The seconds the user must wait
 };
 
 const tarotCommand = async ({ user_id, chat_id, username, isGroup }) => {
@@ -92,20 +101,19 @@ const tarotCommand = async ({ user_id, chat_id, username, isGroup }) => {
         params: [`${targetChatId}`, startMessage]
     }, "POST");
 
-    // Process tarot reading asynchronously
-    callAgentAction('http://localhost:8000/agent/action', {
+    // Process tarot reading asynchronously: the text comes back first, the image follows as a job
+    runAgentJob({
         connection: "tarot-reader",
-        action: "perform-reading",
+        action: "perform-reading-pipelined",
         params: []
     }).then(async response => {
         console.log(response);
         const { status, result } = response;
-        if (status !== 'success') {
+        if (status !== 'success' || !result) {
             console.error("Something went wrong...");
             return;
         }
-        const { image_url, reading_long, reading_short, prompt } = result;
-        // let imageBuffer;
+        const { reading_long, image_job_id, prompt } = result;
         const resultMessage = isGroup
             ? `@${username} ${reading_long}`
             : `${reading_long}`;
@@ -113,23 +121,70 @@ const tarotCommand = async ({ user_id, chat_id, username, isGroup }) => {
             ? `@${username}`
             : ``;
 
+        // First, send the reading text message while the card is still being drawn
         await callAgentAction('http://localhost:8000/agent/action', {
             connection: "telegram",
             action: "send-message",
             params: [`${targetChatId}`, resultMessage]
         }, "POST");
-        // First, send the reading text message
-        await callAgentAction('http://localhost:8000/agent/action', {
-            connection: "telegram",
-            action: "send-message-with-image",
-            params: [`${targetChatId}`, yourDivination, image_url]
-        }, "POST");
+
+        const image = await waitForReadingImage(image_job_id);
+        if (image && image.status === 'done') {
+            await callAgentAction('http://localhost:8000/agent/action', {
+                connection: "telegram",
+                action: "send-message-with-image",
+                params: [`${targetChatId}`, yourDivination, image.image_url]
+            }, "POST");
+        } else {
+            console.error('No image for reading job', image_job_id, image);
+        }
         console.log({ prompt });
     }).catch(err => {
         console.error('Error processing tarot reading:', err);
     });
 }
 
+// Queue an agent action as a job and long-poll it instead of holding a request open for the whole run
+const runAgentJob = async (body, attempts = 10, waitSeconds = 30) => {
+    const { job_id } = await callAgentAction('http://localhost:8000/jobs', body, "POST");
+    if (!job_id) {
+        return {};
+    }
+    for (let i = 0; i < attempts; i++) {
+        const job = await callAgentAction(`http://localhost:8000/jobs/${job_id}?wait=${waitSeconds}`, null, "GET");
+        if (!job.status) {
+            return {};
+        }
+        if (job.status === 'succeeded') {
+            return { status: 'success', result: job.result };
+        }
+        if (job.status !== 'queued' && job.status !== 'running') {
+            console.error('Agent job', job_id, job.status, job.error);
+            return {};
+        }
+    }
+    await callAgentAction(`http://localhost:8000/jobs/${job_id}`, null, "DELETE");
+    return {};
+};
+
+// Long-poll the agent until the image of a pipelined reading is ready
+const waitForReadingImage = async (jobId, attempts = 6, waitSeconds = 30) => {
+    for (let i = 0; i < attempts; i++) {
+        const { status, result } = await callAgentAction('http://localhost:8000/agent/action', {
+            connection: "tarot-reader",
+            action: "get-reading-image",
+            params: [jobId, String(waitSeconds)] // ActionRequest params are strings
+        }, "POST");
+        if (status !== 'success' || !result) {
+            return null;
+        }
+        if (result.status !== 'pending') {
+            return result;
+        }
+    }
+    return null;
+};
+
 apiRouter.post('/telegram/hook', (req, res) => {
     // Check for secret token in the headers
     const secret = req.headers['x-telegram-bot-api-secret-token'];
@@ -1,14 +1,17 @@
 import argparse
-from src.cli import ZerePyCLI
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='ZerePy - AI Agent Framework')
     parser.add_argument('--server', action='store_true', help='Run in server mode')
     parser.add_argument('--host', default='0.0.0.0', help='Server host (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=8000, help='Server port (default: 8000)')
+    parser.add_argument('--profile-imports', action='store_true', help='Report the slowest imports of a cold start')
     args = parser.parse_args()
 
-    if args.server:
+    if args.profile_imports:
+        from src.helpers.import_profile import import_report
+        print(import_report())
+    elif args.server:
         try:
             from src.server import start_server
             start_server(host=args.host, port=args.port)
@@ -16,5 +19,6 @@ if __name__ == "__main__":
             print("Server dependencies not installed. Run: poetry install --extras server")
             exit(1)
     else:
+        from src.cli import ZerePyCLI
         cli = ZerePyCLI()
         cli.main_loop()
\ No newline at end of file
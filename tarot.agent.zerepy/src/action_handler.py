@@ -1,9 +1,21 @@
+import importlib
+import inspect
 import logging
 
+from src.helpers.event_loop import run_coroutine
+
 logger = logging.getLogger("action_handler")
 
 action_registry = {}    
 
+# Action modules of each connection, imported only for agents that configure the connection
+ACTION_MODULES = {
+    "twitter": "src.actions.twitter_actions",
+    "echochambers": "src.actions.echochamber_actions",
+    "solana": "src.actions.solana_actions",
+    "tarot-reader": "src.actions.tarot_reader_actions"
+}
+
 def register_action(action_name):
     def decorator(func):
         action_registry[action_name] = func
@@ -12,9 +24,18 @@ def register_action(action_name):
 
 def execute_action(agent, action_name, **kwargs):
     if action_name in action_registry:
-       return action_registry[action_name](agent, **kwargs)
+       result = action_registry[action_name](agent, **kwargs)
+       if inspect.isawaitable(result):
+           # Async actions run on the shared event loop
+           result = run_coroutine(result)
+       return result
     else:
         logger.error(f"Action {action_name} not found")
         return None
-    
 
+
+def load_actions(connection_names):
+    """Import the action modules of the given connections so their actions register"""
+    for name in connection_names:
+        if name in ACTION_MODULES:
+            importlib.import_module(ACTION_MODULES[name])
@@ -29,11 +29,7 @@ def post_echochambers(agent, **kwargs):
         
         if message:
             agent.logger.info(f"\n🚀 Posting message: '{message[:69]}...'")
-            agent.connection_manager.perform_action(
-                connection_name="echochambers",
-                action_name="send-message",
-                params=[message]  # Pass as list of values
-            )
+            agent.publish("echochambers", "send-message", {"content": message})
             agent.state["echochambers_last_message"] = current_time
             agent.logger.info("✅ Message posted successfully!")
             return True
@@ -91,11 +87,7 @@ def reply_echochambers(agent, **kwargs):
             
             if reply:
                 agent.logger.info(f"\n🚀 Posting reply: '{reply[:69]}...'")
-                agent.connection_manager.perform_action(
-                    connection_name="echochambers",
-                    action_name="send-message",
-                    params=[reply]
-                )
+                agent.publish("echochambers", "send-message", {"content": reply}, send_at=time.time())
                 agent.state["echochambers_replied_messages"].add(message_id)
                 agent.logger.info("✅ Reply posted successfully!")
                 return True
@@ -15,14 +15,12 @@ logger = logging.getLogger("actions.tarot_reader_actions")
 async def perform_reading_twitter(agent, **kwargs):
     """Perform a complete mystical twitter tarot reading using automatically gathered blockchain data"""
     logger.info(f"Performing a reading!")
-    tarot_reader = agent.connection_manager.connections.get("tarot-reader")
-    if not tarot_reader:
+    if "tarot-reader" not in agent.connection_manager.connections:
         logger.error("Tarot Reader connection not found")
         return None
-    import asyncio
-    result = asyncio.run(tarot_reader.perform_action("perform_reading_twitter", {}))
+    result = await agent.connection_manager.aperform_action("tarot-reader", "perform-reading-twitter", [])
     logger.info(f"Tarot reading result: {result}")
-    pass
+    return result
 
 @register_action("perform-reading")
 def perform_reading(agent, **kwargs):
@@ -23,11 +23,7 @@ def post_tweet(agent, **kwargs):
         if tweet_text:
             agent.logger.info("\n🚀 Posting tweet:")
             agent.logger.info(f"'{tweet_text}'")
-            agent.connection_manager.perform_action(
-                connection_name="twitter",
-                action_name="post-tweet",
-                params=[tweet_text]
-            )
+            agent.publish("twitter", "post-tweet", {"message": tweet_text})
             agent.state["last_tweet_time"] = current_time
             agent.logger.info("\n✅ Tweet posted successfully!")
             return True
@@ -52,11 +48,8 @@ def reply_to_tweet(agent, **kwargs):
 
         if reply_text:
             agent.logger.info(f"\n🚀 Posting reply: '{reply_text}'")
-            agent.connection_manager.perform_action(
-                connection_name="twitter",
-                action_name="reply-to-tweet",
-                params=[tweet_id, reply_text]
-            )
+            # Replies skip the queue of scheduled posts but still wait for the posting budget
+            agent.publish("twitter", "reply-to-tweet", {"tweet_id": tweet_id, "message": reply_text}, send_at=time.time())
             agent.logger.info("✅ Reply posted successfully!")
             return True
     else:
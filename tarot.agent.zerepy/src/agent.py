@@ -7,11 +7,10 @@ from pathlib import Path
 from dotenv import load_dotenv
 from src.connection_manager import ConnectionManager
 from src.helpers import print_h_bar
-from src.action_handler import execute_action
-import src.actions.twitter_actions  
-import src.actions.echochamber_actions
-import src.actions.solana_actions
-import src.actions.tarot_reader_actions
+from src.action_handler import execute_action, load_actions
+from src.helpers.outbox import Outbox
+from src.helpers.style_corpus import DEFAULT_CORPUS_TTL, StyleCorpus
+from src.helpers.user_limits import get_user_limiter
 from datetime import datetime
 
 REQUIRED_FIELDS = ["name", "bio", "traits", "examples", "loop_delay", "config", "tasks"]
@@ -36,8 +35,19 @@ class ZerePyAgent:
             self.traits = agent_dict["traits"]
             self.examples = agent_dict["examples"]
             self.example_accounts = agent_dict["example_accounts"]
+            # Example account tweets persisted between runs, refreshed in the background
+            self.example_tweets = StyleCorpus(ttl=agent_dict.get("example_tweets_ttl", DEFAULT_CORPUS_TTL))
             self.loop_delay = agent_dict["loop_delay"]
             self.connection_manager = ConnectionManager(agent_dict["config"])
+            # Posts are queued and sent at each platform's allowed rate when an outbox is configured
+            self.outbox = Outbox.from_config(agent_dict["outbox"], self.connection_manager) if "outbox" in agent_dict else None
+            self.connection_manager.outbox = self.outbox
+            # Register per-user limiters now rather than when their connection is first built,
+            # so ingress paths outside the agent can use them through the server right away
+            telegram_config = next((config for config in agent_dict["config"] if config["name"] == "telegram"), None)
+            if telegram_config:
+                get_user_limiter("readings", telegram_config.get("reading_limit"))
+            load_actions(config["name"] for config in agent_dict["config"])
             self.use_time_based_weights = agent_dict["use_time_based_weights"]
             self.time_based_multipliers = agent_dict["time_based_multipliers"]
 
@@ -73,11 +83,11 @@ class ZerePyAgent:
             raise e
 
     def _setup_llm_provider(self):
-        # Get first available LLM provider and its model
+        # Prefer the LLM router when configured, otherwise the first available LLM provider
         llm_providers = self.connection_manager.get_model_providers()
         if not llm_providers:
             raise ValueError("No configured LLM provider found")
-        self.model_provider = llm_providers[0]
+        self.model_provider = "llm-router" if "llm-router" in llm_providers else llm_providers[0]
 
         # Load Twitter username for self-reply detection if Twitter tasks exist
         if any("tweet" in task["name"] for task in self.tasks):
@@ -88,6 +98,12 @@ class ZerePyAgent:
 
     def _construct_system_prompt(self) -> str:
         """Construct the system prompt from agent configuration"""
+        if self.example_accounts:
+            # Checked on every use so accounts going stale after the first build get refetched
+            self.example_tweets.refresh_in_background(
+                self.example_accounts, self._fetch_example_tweets, self._on_example_tweets_refreshed
+            )
+
         if self._system_prompt is None:
             prompt_parts = []
             prompt_parts.extend(self.bio)
@@ -102,19 +118,25 @@ class ZerePyAgent:
                     prompt_parts.extend(f"- {example}" for example in self.examples)
 
                 if self.example_accounts:
-                    for example_account in self.example_accounts:
-                        tweets = self.connection_manager.perform_action(
-                            connection_name="twitter",
-                            action_name="get-latest-tweets",
-                            params=[example_account]
-                        )
-                        if tweets:
-                            prompt_parts.extend(f"- {tweet['text']}" for tweet in tweets)
+                    # Stored tweets are used right away, stale accounts are refetched without blocking
+                    prompt_parts.extend(f"- {text}" for text in self.example_tweets.tweets(self.example_accounts))
 
             self._system_prompt = "\n".join(prompt_parts)
 
         return self._system_prompt
     
+    def _fetch_example_tweets(self, account: str) -> list:
+        return self.connection_manager.perform_action(
+            connection_name="twitter",
+            action_name="get-latest-tweets",
+            params=[account]
+        )
+
+    def _on_example_tweets_refreshed(self, updated: int) -> None:
+        """Rebuild the system prompt with the new example tweets on its next use"""
+        if updated:
+            self._system_prompt = None
+
     def _adjust_weights_for_time(self, current_hour: int, task_weights: list) -> list:
         weights = task_weights.copy()
         
@@ -148,6 +170,19 @@ class ZerePyAgent:
 
     def perform_action(self, connection: str, action: str, **kwargs) -> None:
         return self.connection_manager.perform_action(connection, action, **kwargs)
+
+    async def aperform_action(self, connection: str, action: str, **kwargs) -> None:
+        return await self.connection_manager.aperform_action(connection, action, **kwargs)
+    
+    def publish(self, platform: str, action: str, params: dict, send_at: float = None):
+        """Queue a post in the outbox if there is one, otherwise post it right away"""
+        if self.outbox:
+            return self.outbox.enqueue(platform, action, params, send_at)
+        return self.connection_manager.perform_action(
+            connection_name=platform,
+            action_name=action,
+            params=params
+        )
     
     def select_action(self, use_time_based_weights: bool = False) -> dict:
         task_weights = [weight for weight in self.task_weights.copy()]
@@ -158,8 +193,25 @@ class ZerePyAgent:
         
         return random.choices(self.tasks, weights=task_weights, k=1)[0]
 
+    def _start_ingestion(self):
+        """Start receiving chat updates for connections configured to handle them in-process"""
+        if "telegram" not in self.connection_manager.connections:
+            return
+        try:
+            telegram = self.connection_manager.connections["telegram"]
+            telegram.start_updates()
+        except Exception as e:
+            logger.error(f"Could not start Telegram updates: {e}")
+
     def loop(self):
         """Main agent loop for autonomous behavior"""
+        # Validate every connection once, in parallel, and keep the results fresh in the background
+        self.connection_manager.health.check_all(force=False)
+        self.connection_manager.health.start()
+        self._start_ingestion()
+        if self.outbox:
+            self.outbox.start()
+
         if not self.is_llm_set:
             self._setup_llm_provider()
 
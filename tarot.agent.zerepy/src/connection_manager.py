@@ -1,107 +1,168 @@
+import asyncio
+import importlib
+import inspect
 import logging
-from typing import Any, List, Optional, Type, Dict
+import threading
+from collections.abc import Mapping
+from typing import Any, Iterator, List, Optional, Tuple, Type, Dict, Union
 from src.connections.base_connection import BaseConnection
-from src.connections.anthropic_connection import AnthropicConnection
-from src.connections.eternalai_connection import EternalAIConnection
-from src.connections.goat_connection import GoatConnection
-from src.connections.groq_connection import GroqConnection
-from src.connections.openai_connection import OpenAIConnection
-from src.connections.twitter_connection import TwitterConnection
-from src.connections.farcaster_connection import FarcasterConnection
-from src.connections.ollama_connection import OllamaConnection
-from src.connections.echochambers_connection import EchochambersConnection
-from src.connections.solana_connection import SolanaConnection
-from src.connections.hyperbolic_connection import HyperbolicConnection
-from src.connections.galadriel_connection import GaladrielConnection
-from src.connections.sonic_connection import SonicConnection
-from src.connections.discord_connection import DiscordConnection
-from src.connections.allora_connection import AlloraConnection
-from src.connections.xai_connection import XAIConnection
-from src.connections.ethereum_connection import EthereumConnection
-from src.connections.together_connection import TogetherAIConnection
-from src.connections.telegram_connection import TelegramConnection
-from src.connections.tarot_reader_connection import TarotReaderConnection
+from src.helpers.event_loop import run_coroutine
+from src.helpers.health import HealthChecker
 
 logger = logging.getLogger("connection_manager")
 
 
+# Connection type -> (module, class). Modules are imported the first time a connection of that type is used,
+# so SDKs of unused connections (solana, web3, goat, allora...) never load
+CONNECTION_CLASSES = {
+    "tarot-reader": ("src.connections.tarot_reader_connection", "TarotReaderConnection"),
+    "twitter": ("src.connections.twitter_connection", "TwitterConnection"),
+    "anthropic": ("src.connections.anthropic_connection", "AnthropicConnection"),
+    "openai": ("src.connections.openai_connection", "OpenAIConnection"),
+    "farcaster": ("src.connections.farcaster_connection", "FarcasterConnection"),
+    "groq": ("src.connections.groq_connection", "GroqConnection"),
+    "eternalai": ("src.connections.eternalai_connection", "EternalAIConnection"),
+    "ollama": ("src.connections.ollama_connection", "OllamaConnection"),
+    "echochambers": ("src.connections.echochambers_connection", "EchochambersConnection"),
+    "goat": ("src.connections.goat_connection", "GoatConnection"),
+    "solana": ("src.connections.solana_connection", "SolanaConnection"),
+    "hyperbolic": ("src.connections.hyperbolic_connection", "HyperbolicConnection"),
+    "galadriel": ("src.connections.galadriel_connection", "GaladrielConnection"),
+    "sonic": ("src.connections.sonic_connection", "SonicConnection"),
+    "discord": ("src.connections.discord_connection", "DiscordConnection"),
+    "allora": ("src.connections.allora_connection", "AlloraConnection"),
+    "xai": ("src.connections.xai_connection", "XAIConnection"),
+    "ethereum": ("src.connections.ethereum_connection", "EthereumConnection"),
+    "together": ("src.connections.together_connection", "TogetherAIConnection"),
+    "telegram": ("src.connections.telegram_connection", "TelegramConnection"),
+    "llm-router": ("src.connections.llm_router_connection", "LLMRouterConnection")
+}
+
+# Connection types whose is_llm_provider is True, known without importing them
+LLM_PROVIDERS = frozenset([
+    "anthropic", "openai", "groq", "eternalai", "ollama", "hyperbolic",
+    "galadriel", "xai", "together", "llm-router"
+])
+
+# Connections that get the connection manager to use other connections
+MANAGER_AWARE = ("tarot-reader", "llm-router", "telegram")
+
+
+class LazyConnections(Mapping):
+    """
+    Connections by name, each one imported and constructed the first time it is looked up.
+
+    Membership and len() only look at the configs, so checking whether a connection
+    exists never builds it. A connection that fails to construct is logged and dropped.
+    Each name has its own build lock, so a slow connection only holds up lookups of itself.
+    """
+
+    def __init__(self, manager: "ConnectionManager"):
+        self._manager = manager
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._connections: Dict[str, BaseConnection] = {}
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def add(self, config: Dict[str, Any]) -> None:
+        with self._lock:
+            self._configs[config["name"]] = config
+            self._connections.pop(config["name"], None)
+
+    def loaded(self) -> Dict[str, BaseConnection]:
+        """Connections constructed so far"""
+        with self._lock:
+            return dict(self._connections)
+
+    def __getitem__(self, name: str) -> BaseConnection:
+        with self._lock:
+            if name in self._connections:
+                return self._connections[name]
+            if name not in self._configs:
+                raise KeyError(name)
+            build_lock = self._building.setdefault(name, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                if name in self._connections:
+                    return self._connections[name]
+                config = self._configs.get(name)
+                if config is None:
+                    raise KeyError(name)
+
+            # Built outside the shared lock, SDK imports and network-bound __init__s can be slow
+            connection = self._manager._create_connection(config)
+            with self._lock:
+                if connection is None:
+                    if self._configs.get(name) is config:
+                        del self._configs[name]
+                    raise KeyError(name)
+                if self._configs.get(name) is config:
+                    self._connections[name] = connection
+                return connection
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._configs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._configs))
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+
 class ConnectionManager:
     def __init__(self, agent_config):
-        self.connections: Dict[str, BaseConnection] = {}
+        self.connections = LazyConnections(self)
+        # Cached is_configured results, so actions don't re-validate credentials over the network
+        self.health = HealthChecker(self.connections)
+        # Outbound post queue, set by the agent when its config has an outbox block
+        self.outbox = None
         for config in agent_config:
-            print("---> registering" + config["name"])
             self._register_connection(config)
 
     @staticmethod
     def _class_name_to_type(class_name: str) -> Type[BaseConnection]:
-        if class_name == "tarot-reader":
-            return TarotReaderConnection
-        if class_name == "twitter":
-            return TwitterConnection
-        elif class_name == "anthropic":
-            return AnthropicConnection
-        elif class_name == "openai":
-            return OpenAIConnection
-        elif class_name == "farcaster":
-            return FarcasterConnection
-        elif class_name == "groq":
-            return GroqConnection
-        elif class_name == "eternalai":
-            return EternalAIConnection
-        elif class_name == "ollama":
-            return OllamaConnection
-        elif class_name == "echochambers":
-            return EchochambersConnection
-        elif class_name == "goat":
-            return GoatConnection
-        elif class_name == "solana":
-            return SolanaConnection
-        elif class_name == "hyperbolic":
-            return HyperbolicConnection
-        elif class_name == "galadriel":
-            return GaladrielConnection
-        elif class_name == "sonic":
-            return SonicConnection
-        elif class_name == "discord":
-            return DiscordConnection
-        elif class_name == "allora":
-            return AlloraConnection
-        elif class_name == "xai":
-            return XAIConnection
-        elif class_name == "ethereum":
-            return EthereumConnection
-        elif class_name == "together":
-            return TogetherAIConnection
-        elif class_name == "telegram":
-            return TelegramConnection
-        return None
+        if class_name not in CONNECTION_CLASSES:
+            return None
+        module_name, class_attr = CONNECTION_CLASSES[class_name]
+        return getattr(importlib.import_module(module_name), class_attr)
 
     def _register_connection(self, config_dic: Dict[str, Any]) -> None:
         """
-        Create and register a new connection with configuration
+        Register a connection's configuration, the connection is created on first use
 
         Args:
-            name: Identifier for the connection
-            connection_class: The connection class to instantiate
-            config: Configuration dictionary for the connection
+            config_dic: Configuration dictionary for the connection, its name selects the connection type
         """
+        if config_dic.get("name") not in CONNECTION_CLASSES:
+            logging.error(f"Failed to register connection {config_dic.get('name')}: unknown connection type")
+            return
+        self.connections.add(config_dic)
+
+    def _create_connection(self, config_dic: Dict[str, Any]) -> Optional[BaseConnection]:
+        """Import and instantiate a registered connection"""
+        name = config_dic["name"]
         try:
-            name = config_dic["name"]
             connection_class = self._class_name_to_type(name)
 
-            # Only pass connection_manager to TarotReaderConnection
-            if name == "tarot-reader":
-                connection = connection_class(config_dic, connection_manager=self)
-            else:
-                connection = connection_class(config_dic)
-            self.connections[name] = connection
+            # Only pass connection_manager to connections that use other connections
+            if name in MANAGER_AWARE:
+                return connection_class(config_dic, connection_manager=self)
+            return connection_class(config_dic)
         except Exception as e:
             logging.error(f"Failed to initialize connection {name}: {e}")
+            return None
+
+    def llm_connection_names(self) -> List[str]:
+        """Names of the registered LLM connections, without constructing any of them"""
+        return [name for name in self.connections if name in LLM_PROVIDERS]
 
     def _check_connection(self, connection_string: str) -> bool:
         try:
-            connection = self.connections[connection_string]
-            return connection.is_configured(verbose=True)
+            if connection_string not in self.connections:
+                raise KeyError(connection_string)
+            return self.health.check(connection_string, verbose=True)
         except KeyError:
             logging.error(
                 "\nUnknown connection. Try 'list-connections' to see all supported connections."
@@ -116,6 +177,7 @@ class ConnectionManager:
         try:
             connection = self.connections[connection_name]
             success = connection.configure()
+            self.health.invalidate(connection_name)
 
             if success:
                 logging.info(
@@ -137,9 +199,10 @@ class ConnectionManager:
     def list_connections(self) -> None:
         """List all available connections and their status"""
         logging.info("\nAVAILABLE CONNECTIONS:")
-        for name, connection in self.connections.items():
+        configured = self.health.check_all()
+        for name in self.connections:
             status = (
-                "✅ Configured" if connection.is_configured() else "❌ Not Configured"
+                "✅ Configured" if configured.get(name) else "❌ Not Configured"
             )
             logging.info(f"- {name}: {status}")
 
@@ -148,7 +211,7 @@ class ConnectionManager:
         try:
             connection = self.connections[connection_name]
 
-            if connection.is_configured():
+            if self.health.is_configured(connection_name):
                 logging.info(
                     f"\n✅ {connection_name} is configured. You can use any of its actions."
                 )
@@ -172,27 +235,26 @@ class ConnectionManager:
         except Exception as e:
             logging.error(f"\nAn error occurred: {e}")
 
-    def perform_action(
-        self, connection_name: str, action_name: str, params: List[Any]
-    ) -> Optional[Any]:
-        """Perform an action on a specific connection with given parameters"""
-        try:
-            connection = self.connections[connection_name]
+    def _prepare_action(
+        self, connection_name: str, action_name: str, params: Union[List[Any], Dict[str, Any]]
+    ) -> Tuple[BaseConnection, Dict[str, Any]]:
+        """Look up a connection and turn a list of params, or params by name, into validated kwargs for one of its actions"""
+        connection = self.connections[connection_name]
 
-            if not connection.is_configured():
-                logging.error(
-                    f"\nError: Connection '{connection_name}' is not configured"
-                )
-                return None
+        if not self.health.is_configured(connection_name):
+            raise ValueError(f"Connection '{connection_name}' is not configured")
 
-            if action_name not in connection.actions:
-                logging.error(
-                    f"\nError: Unknown action '{action_name}' for connection '{connection_name}'"
-                )
-                return None
+        if action_name not in connection.actions:
+            raise ValueError(f"Unknown action '{action_name}' for connection '{connection_name}'")
 
-            action = connection.actions[action_name]
+        action = connection.actions[action_name]
 
+        if isinstance(params, Mapping):
+            unknown = [name for name in params if name not in {param.name for param in action.parameters}]
+            if unknown:
+                raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+            kwargs = dict(params)
+        else:
             # Convert list of params to kwargs dictionary, handling both required and optional params
             kwargs = {}
             param_index = 0
@@ -203,24 +265,30 @@ class ConnectionManager:
                     kwargs[param.name] = params[param_index]
                     param_index += 1
 
-            # Validate all required parameters are present
-            missing_required = [
-                param.name
-                for param in action.parameters
-                if param.required and param.name not in kwargs
-            ]
+        # Validate all required parameters are present
+        missing_required = [
+            param.name
+            for param in action.parameters
+            if param.required and param.name not in kwargs
+        ]
 
-            if missing_required:
-                logging.error(
-                    f"\nError: Missing required parameters: {', '.join(missing_required)}"
-                )
-                return None
+        if missing_required:
+            raise ValueError(f"Missing required parameters: {', '.join(missing_required)}")
 
-            if connection_name == "tarot-reader":
-                import asyncio
-                return asyncio.run(connection.perform_action(action_name, kwargs))
-            else:
-                return connection.perform_action(action_name, kwargs)
+        return connection, kwargs
+
+    def perform_action(
+        self, connection_name: str, action_name: str, params: Union[List[Any], Dict[str, Any]]
+    ) -> Optional[Any]:
+        """Perform an action on a specific connection with given parameters"""
+        try:
+            connection, kwargs = self._prepare_action(connection_name, action_name, params)
+
+            result = connection.perform_action(action_name, kwargs)
+            if inspect.isawaitable(result):
+                # Async connections run on the shared loop rather than a throwaway asyncio.run loop
+                result = run_coroutine(result)
+            return result
 
         except Exception as e:
             logging.error(
@@ -228,10 +296,34 @@ class ConnectionManager:
             )
             return None
 
+    async def aperform_action(
+        self, connection_name: str, action_name: str, params: Union[List[Any], Dict[str, Any]],
+        raise_errors: bool = False
+    ) -> Optional[Any]:
+        """
+        Async version of perform_action, async connections run directly on the caller's loop.
+
+        Errors are logged and give None, unless raise_errors is set for callers that
+        record failures themselves, e.g. the job queue.
+        """
+        try:
+            # Building the connection and its first health probe block, keep them off the loop
+            connection, kwargs = await asyncio.to_thread(self._prepare_action, connection_name, action_name, params)
+
+            if hasattr(connection, "aperform_action"):
+                return await connection.aperform_action(action_name, kwargs)
+            if inspect.iscoroutinefunction(connection.perform_action):
+                return await connection.perform_action(action_name, kwargs)
+            return await asyncio.to_thread(connection.perform_action, action_name, kwargs)
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            logging.error(
+                f"\nAn error occurred while trying action {action_name} for {connection_name} connection: {e}"
+            )
+            return None
+
     def get_model_providers(self) -> List[str]:
         """Get a list of all LLM provider connections"""
-        return [
-            name
-            for name, conn in self.connections.items()
-            if conn.is_configured() and getattr(conn, "is_llm_provider", lambda: False)
-        ]
+        return [name for name in self.llm_connection_names() if self.health.is_configured(name)]
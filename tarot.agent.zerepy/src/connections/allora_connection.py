@@ -1,13 +1,29 @@
 import logging
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Optional
 from dotenv import set_key
 from allora_sdk.v2.api_client import AlloraAPIClient, ChainSlug
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.cache import shared_cache, make_cache_key
+from src.helpers.event_loop import get_event_loop
 import os
 import asyncio
 
 logger = logging.getLogger("connections.allora_connection")
 
+# Seconds an inference may be shared between callers, 0 disables caching
+DEFAULT_CACHE_TTLS = {
+    "get-inference": 60,
+    "list-topics": 3600,
+}
+
+# Allora topics publish a new inference every few minutes
+DEFAULT_PREFETCH_INTERVAL = 300
+PREFETCH_RETRY_SECONDS = 30
+# Longest a read waits on the API before falling back to the previous inference
+DEFAULT_INFERENCE_TIMEOUT = 5
+
 class AlloraConnectionError(Exception):
     """Base exception for Allora connection errors"""
     pass
@@ -20,11 +36,97 @@ class AlloraAPIError(AlloraConnectionError):
     """Raised when Allora API requests fail"""
     pass
 
+class AlloraPrefetcher:
+    """
+    Latest inference of every topic read so far, with the ones in `intervals` kept fresh.
+
+    Each prefetched topic is refreshed on its own period by a task on the shared event
+    loop, so reads are served from memory together with when the inference was fetched.
+    """
+
+    def __init__(self, fetch, intervals: Dict[int, float]):
+        self._fetch = fetch
+        self.intervals = intervals
+        self._latest: Dict[int, Dict[str, Any]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._refreshes = 0
+        self._failures = 0
+
+    def start(self) -> None:
+        """Start refreshing the prefetched topics in the background"""
+        if self.intervals:
+            get_event_loop().call_soon_threadsafe(self._start_tasks)
+
+    def _start_tasks(self) -> None:
+        for topic_id, interval in self.intervals.items():
+            task = self._tasks.get(topic_id)
+            if task is None or task.done():
+                self._tasks[topic_id] = asyncio.get_running_loop().create_task(self._refresh_loop(topic_id, interval))
+
+    def stop(self) -> None:
+        def cancel_tasks() -> None:
+            for task in self._tasks.values():
+                task.cancel()
+        get_event_loop().call_soon_threadsafe(cancel_tasks)
+
+    async def _refresh_loop(self, topic_id: int, interval: float) -> None:
+        while True:
+            try:
+                self.store(topic_id, await self._fetch(topic_id))
+                delay = interval
+            except Exception as e:
+                with self._lock:
+                    self._failures += 1
+                logger.warning(f"Prefetching Allora topic {topic_id} failed: {e}")
+                delay = min(interval, PREFETCH_RETRY_SECONDS)
+            await asyncio.sleep(delay)
+
+    def store(self, topic_id: int, inference: Dict[str, Any]) -> Dict[str, Any]:
+        """Record an inference as the topic's latest"""
+        with self._lock:
+            self._refreshes += 1
+            self._latest[topic_id] = {**inference, "fetched_at": time.time()}
+        return self.latest(topic_id)
+
+    def latest(self, topic_id: int) -> Optional[Dict[str, Any]]:
+        """The topic's last inference with its age, None if it was never fetched"""
+        with self._lock:
+            inference = self._latest.get(topic_id)
+        if inference is None:
+            return None
+        return {**inference, "age_seconds": round(time.time() - inference["fetched_at"], 2)}
+
+    def is_fresh(self, inference: Dict[str, Any]) -> bool:
+        """Whether a prefetched inference is recent enough to serve without asking the API"""
+        interval = self.intervals.get(inference["topic_id"])
+        # Allow one missed refresh before the value counts as overdue
+        return interval is not None and inference["age_seconds"] <= 2 * interval
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            latest = {topic_id: inference["fetched_at"] for topic_id, inference in self._latest.items()}
+            refreshes, failures = self._refreshes, self._failures
+        return {
+            "topics": {
+                topic_id: {
+                    "interval": self.intervals.get(topic_id),
+                    "age_seconds": round(time.time() - latest[topic_id], 2) if topic_id in latest else None
+                }
+                for topic_id in set(self.intervals) | set(latest)
+            },
+            "refreshes": refreshes,
+            "failures": failures
+        }
+
+
 class AlloraConnection(BaseConnection):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._client = None
         self.chain_slug = config.get("chain_slug", ChainSlug.TESTNET)
+        self.prefetcher = AlloraPrefetcher(self._fetch_inference, self._prefetch_intervals())
+        self.prefetcher.start()
 
     @property
     def is_llm_provider(self) -> bool:
@@ -56,6 +158,11 @@ class AlloraConnection(BaseConnection):
                 name="list-topics",
                 parameters=[],
                 description="List all available Allora Network topics"
+            ),
+            Action(
+                name="get-prefetch-status",
+                parameters=[],
+                description="Get the age of every prefetched Allora inference"
             )
         ]
         self.actions = {action.name: action for action in actions}
@@ -69,26 +176,92 @@ class AlloraConnection(BaseConnection):
         except Exception as e:
             raise AlloraAPIError(f"API request failed: {str(e)}")
 
+    def _cache_ttl(self, action_name: str) -> float:
+        """Seconds a result may be reused for, 0 disables caching"""
+        ttls = {**DEFAULT_CACHE_TTLS, **self.config.get("cache_ttls", {})}
+        return ttls.get(action_name, 0)
+
+    def _prefetch_intervals(self) -> Dict[int, float]:
+        """Refresh period of every prefetched topic, from a list of ids or an id -> seconds mapping"""
+        topics = self.config.get("prefetch_topics", [])
+        if isinstance(topics, dict):
+            return {int(topic_id): interval for topic_id, interval in topics.items()}
+        return {int(topic_id): DEFAULT_PREFETCH_INTERVAL for topic_id in topics}
+
+    async def _fetch_inference(self, topic_id: int) -> Dict[str, Any]:
+        """Fetch a fresh inference from the Allora API"""
+        response = await self._make_request('get_inference_by_topic_id', topic_id)
+
+        return {
+            "topic_id": topic_id,
+            "raw": response,
+            "inference": response.inference_data
+        }
+
+    async def _load_inference(self, topic_id: int) -> Dict[str, Any]:
+        """Fetch an inference, sharing it between concurrent callers for the cache TTL"""
+        ttl = self._cache_ttl("get-inference")
+        if not ttl:
+            inference = await self._fetch_inference(topic_id)
+        else:
+            inference = await shared_cache.aget_or_call(
+                make_cache_key(f"allora:{self.chain_slug}", "get-inference", {"topic_id": topic_id}),
+                ttl,
+                lambda: self._fetch_inference(topic_id)
+            )
+        return self.prefetcher.store(topic_id, inference)
+
     async def get_inference(self, topic_id: int) -> Dict[str, Any]:
-        """Get inference from Allora Network for a specific topic"""
-        try:
-            response = await self._make_request('get_inference_by_topic_id', topic_id)
+        """
+        Get inference from Allora Network for a specific topic
+
+        Prefetched topics are answered from memory. Other reads wait at most
+        `inference_timeout` seconds on the API before falling back to the previous
+        inference, marked stale.
+        """
+        latest = self.prefetcher.latest(topic_id)
+        if latest and self.prefetcher.is_fresh(latest):
+            return {**latest, "stale": False}
 
-            return {
-                "topic_id": topic_id,
-                "raw": response,
-                "inference": response.inference_data
-            }
+        # Keep the fetch running past the timeout so the next read finds its result
+        fetch = asyncio.ensure_future(self._load_inference(topic_id))
+        try:
+            inference = await asyncio.wait_for(
+                asyncio.shield(fetch), self.config.get("inference_timeout", DEFAULT_INFERENCE_TIMEOUT)
+            )
+            return {**inference, "stale": False}
         except Exception as e:
-            raise AlloraAPIError(f"Failed to get inference: {str(e)}")
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            if isinstance(e, asyncio.TimeoutError):
+                # Nobody awaits the fetch any more, so retrieve its failure here
+                def log_failure(finished: asyncio.Future) -> None:
+                    if not finished.cancelled() and finished.exception():
+                        logger.error(f"Background Allora fetch for topic {topic_id} failed: {finished.exception()}")
+                fetch.add_done_callback(log_failure)
+            if latest:
+                logger.warning(f"Serving previous Allora inference for topic {topic_id}: {reason}")
+                return {**latest, "stale": True}
+            raise AlloraAPIError(f"Failed to get inference: {reason}")
 
     async def list_topics(self) -> List[Dict[str, Any]]:
         """List all available Allora Network topics"""
         try:
-            return await self._make_request('get_all_topics')
+            ttl = self._cache_ttl("list-topics")
+            if not ttl:
+                return await self._make_request('get_all_topics')
+
+            return await shared_cache.aget_or_call(
+                make_cache_key(f"allora:{self.chain_slug}", "list-topics", {}),
+                ttl,
+                lambda: self._make_request('get_all_topics')
+            )
         except Exception as e:
             raise AlloraAPIError(f"Failed to list topics: {str(e)}")
 
+    async def get_prefetch_status(self) -> Dict[str, Any]:
+        """Age of every prefetched inference"""
+        return self.prefetcher.status()
+
     def configure(self) -> bool:
         """Sets up Allora API authentication"""
         print("\n🔮 ALLORA API SETUP")
@@ -116,6 +289,22 @@ class AlloraConnection(BaseConnection):
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Validate Allora configuration from JSON"""
         # No required fields for Allora connection
+        cache_ttls = config.get("cache_ttls", {})
+        if not isinstance(cache_ttls, dict):
+            raise ValueError("cache_ttls must be a dictionary")
+        for action_name, ttl in cache_ttls.items():
+            if not isinstance(ttl, (int, float)) or ttl < 0:
+                raise ValueError(f"Invalid cache TTL for '{action_name}'. Must be a non-negative number of seconds")
+        topics = config.get("prefetch_topics", [])
+        if not isinstance(topics, (list, dict)):
+            raise ValueError("prefetch_topics must be a list of topic ids or a mapping of topic id to seconds")
+        if isinstance(topics, dict):
+            for topic_id, interval in topics.items():
+                if not isinstance(interval, (int, float)) or interval <= 0:
+                    raise ValueError(f"Invalid prefetch interval for topic {topic_id}. Must be a positive number of seconds")
+        timeout = config.get("inference_timeout")
+        if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise ValueError("inference_timeout must be a positive number of seconds")
         return config
 
     def is_configured(self, verbose: bool = False) -> bool:
@@ -4,6 +4,8 @@ from typing import Dict, Any
 from dotenv import load_dotenv, set_key
 from anthropic import Anthropic, NotFoundError
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
+from src.helpers.rate_limiter import estimate_tokens, rate_limited
 
 logger = logging.getLogger("connections.anthropic_connection")
 
@@ -128,6 +130,7 @@ class AnthropicConnection(BaseConnection):
                 logger.debug(f"Configuration check failed: {e}")
             return False
 
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using Anthropic models"""
         try:
@@ -137,23 +140,25 @@ class AnthropicConnection(BaseConnection):
             if not model:
                 model = self.config["model"]
 
-            message = client.messages.create(
-                model=model,
-                max_tokens=1000,
-                temperature=0,
-                system=system_prompt,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ]
-            )
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                message = client.messages.create(
+                    model=model,
+                    max_tokens=1000,
+                    temperature=0,
+                    system=system_prompt,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": prompt
+                                }
+                            ]
+                        }
+                    ]
+                )
+                slot.record_tokens(message.usage.input_tokens + message.usage.output_tokens if message.usage else None)
             return message.content[0].text
             
         except Exception as e:
@@ -1,7 +1,10 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Callable
+from typing import Any, Dict, List, Callable, Optional
 from dataclasses import dataclass
+from src.helpers.http import get_session
+from src.helpers.llm_cache import response_cache_ttl
+from src.helpers.rate_limiter import get_rate_limiter
 
 @dataclass
 class ActionParameter:
@@ -29,10 +32,23 @@ class Action:
         return errors
 
 class BaseConnection(ABC):
+    # Rate limit applied when the config doesn't declare a `rate_limit` block
+    DEFAULT_RATE_LIMIT: Optional[Dict[str, Any]] = None
+    # HTTP timeouts and retries applied when the config doesn't declare an `http` block
+    DEFAULT_HTTP: Optional[Dict[str, Any]] = None
+
     def __init__(self, config, connection_manager=None):
         try:
             self.actions: Dict[str, Callable] = {}
             self.config = self.validate_config(config) 
+            self.rate_limiter = get_rate_limiter(
+                self.config.get("name", type(self).__name__),
+                self.config.get("rate_limit", self.DEFAULT_RATE_LIMIT)
+            )
+            # Pooled keep-alive session for REST calls, shared by connections with the same `http` config
+            self.http = get_session(self.config.get("http", self.DEFAULT_HTTP))
+            # Seconds LLM responses are cached for, None unless the config enables response_cache
+            self.response_cache_ttl = response_cache_ttl(self.config.get("response_cache"))
             # Store connection_manager before validating config
             self.connection_manager = connection_manager
             # Register actions during initialization
@@ -22,6 +22,9 @@ class EchochambersAPIError(EchochambersConnectionError):
     pass
 
 class EchochambersConnection(BaseConnection):
+    # _make_request retries on its own, the session shouldn't retry underneath it
+    DEFAULT_HTTP = {"timeout": 10, "retries": 0}
+
     def __init__(self, config: Dict[str, Any]):
         logger.info("✨ Initializing Echochambers adapter")
         super().__init__(config)
@@ -211,7 +214,7 @@ class EchochambersConnection(BaseConnection):
 
         for attempt in range(3):
             try:
-                response = requests.request(method, url, timeout=10, **kwargs)
+                response = self.http.request(method, url, **kwargs)
                 if response.status_code == 429:  # Rate limit
                     retry_after = int(response.headers.get('Retry-After', 60))
                     logger.warning(f"Rate limit hit, waiting {retry_after}s")
@@ -1,17 +1,30 @@
 import logging
+import math
 import os
 import json
-from typing import Dict, Any
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv, set_key
 from openai import OpenAI
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
+from src.helpers.cache import TTLCache
+from src.helpers.rate_limiter import estimate_tokens, rate_limited
 from web3 import Web3
-import requests
+from src.helpers.http import get_session
 
 logger = logging.getLogger("connections.eternalai_connection")
 IPFS = "ipfs://"
 LIGHTHOUSE_IPFS = "https://gateway.lighthouse.storage/ipfs/"
 GCS_ETERNAL_AI_BASE_URL = "https://cdn.eternalai.org/upload/"
+# Gateways serving on-chain prompt content, raced against each other
+PROMPT_GATEWAYS = (LIGHTHOUSE_IPFS, GCS_ETERNAL_AI_BASE_URL)
+PROMPT_CACHE_DIR = os.path.join(".cache", "eternalai_prompts")
+# How long the contract's prompt pointer is trusted, and how soon a failed refresh is retried
+DEFAULT_PROMPT_TTL = 300
+PROMPT_RETRY_SECONDS = 30
 AGENT_CONTRACT_ABI = [{"inputs": [{"internalType": "uint256","name": "_agentId","type": "uint256"}],"name": "getAgentSystemPrompt","outputs": [{"internalType": "bytes[]","name": "","type": "bytes[]"}],"stateMutability": "view","type": "function"}]
 
 class EternalAIConnectionError(Exception):
@@ -29,10 +42,140 @@ class EternalAIAPIError(EternalAIConnectionError):
     pass
 
 
+_prompt_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="eternalai-prompt")
+# Gateway fetches get their own pool: a refresh running on _prompt_executor waits on them,
+# and sharing its workers could leave every one of them waiting on a queued fetch
+_gateway_executor = ThreadPoolExecutor(max_workers=2 * len(PROMPT_GATEWAYS), thread_name_prefix="eternalai-gateway")
+
+# IPFS content never changes for a CID, so it is cached for good, in memory and on disk
+_prompt_contents = TTLCache()
+
+
+def _fetch_gateway(url: str) -> str:
+    response = get_session().get(url)
+    if response.status_code != 200:
+        raise EternalAIAPIError(f"invalid on-chain system prompt response status {response.status_code} from {url}")
+    return response.text
+
+
+def _fetch_ipfs_content(cid: str) -> str:
+    """Fetch a CID from every gateway at once, the first good answer wins"""
+    path = os.path.join(PROMPT_CACHE_DIR, cid.replace("/", "_"))
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    pending = {_gateway_executor.submit(_fetch_gateway, gateway + cid) for gateway in PROMPT_GATEWAYS}
+    errors = []
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                content = future.result()
+                os.makedirs(PROMPT_CACHE_DIR, exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(content)
+                return content
+            errors.append(str(future.exception()))
+    raise EternalAIAPIError(f"Could not fetch on-chain system prompt {cid}: {'; '.join(errors)}")
+
+
+def resolve_prompt_content(on_chain_data: str) -> str:
+    """The system prompt an on-chain pointer refers to: IPFS content, or the data itself"""
+    if IPFS in on_chain_data:
+        cid = on_chain_data.replace(IPFS, "")
+        return _prompt_contents.get_or_call(cid, math.inf, lambda: _fetch_ipfs_content(cid))
+    if len(on_chain_data) > 0:
+        return on_chain_data
+    raise EternalAIAPIError("invalid on-chain system prompt")
+
+
+class OnChainPromptResolver:
+    """
+    System prompt of an EternalAI agent registered on-chain.
+
+    The contract's prompt pointer is cached for `ttl` seconds. Once it expires the last
+    known prompt keeps being served while a background refresh reads the contract again,
+    so only the very first generation waits on the RPC.
+    """
+
+    def __init__(self, rpc_url: str, contract_address: str, agent_id: int, ttl: float = DEFAULT_PROMPT_TTL):
+        self.rpc_url = rpc_url
+        self.contract_address = contract_address
+        self.agent_id = agent_id
+        self.ttl = ttl
+        self._contract = None
+        self._pointer: Optional[str] = None
+        self._expires_at = 0.0
+        self._refreshing: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def _get_contract(self):
+        if self._contract is None:
+            web3 = Web3(Web3.HTTPProvider(self.rpc_url))
+            self._contract = web3.eth.contract(address=self.contract_address, abi=AGENT_CONTRACT_ABI)
+        return self._contract
+
+    def _refresh(self) -> Optional[str]:
+        """Read the prompt pointer from the contract and resolve its content ahead of use"""
+        try:
+            result = self._get_contract().functions.getAgentSystemPrompt(self.agent_id).call()
+            pointer = result[0].decode("utf-8") if len(result) > 0 else None
+            logger.info(f"on-chain system_prompt: {pointer}")
+            if pointer:
+                resolve_prompt_content(pointer)
+            with self._lock:
+                self._pointer = pointer
+                self._expires_at = time.monotonic() + self.ttl
+            return pointer
+        except Exception as e:
+            logger.error(f"Reading the on-chain system prompt failed: {e}")
+            with self._lock:
+                self._expires_at = time.monotonic() + PROMPT_RETRY_SECONDS
+            raise
+        finally:
+            with self._lock:
+                self._refreshing = None
+
+    def _submit_refresh(self) -> Future:
+        with self._lock:
+            if self._refreshing is None:
+                self._refreshing = _prompt_executor.submit(self._refresh)
+            return self._refreshing
+
+    def prefetch(self) -> None:
+        """Start reading the contract in the background, e.g. when the connection is created"""
+        self._submit_refresh()
+
+    def resolve(self) -> Optional[str]:
+        """The agent's on-chain system prompt, None if the contract has none"""
+        with self._lock:
+            pointer, fetched = self._pointer, self._expires_at > 0
+            expired = time.monotonic() >= self._expires_at
+
+        if not fetched:
+            pointer = self._submit_refresh().result()
+        elif expired:
+            self._submit_refresh()
+        return resolve_prompt_content(pointer) if pointer else None
+
+
 class EternalAIConnection(BaseConnection):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._client = None
+        self._prompt_resolver = None
+        if self.config.get("agent_id") and self.config.get("contract_address") and self.config.get("rpc_url"):
+            self._prompt_resolver = OnChainPromptResolver(
+                self.config["rpc_url"],
+                self.config["contract_address"],
+                self.config["agent_id"],
+                self.config.get("system_prompt_ttl", DEFAULT_PROMPT_TTL)
+            )
+            # Resolve the prompt while the agent starts rather than on the first generation
+            self._prompt_resolver.prefetch()
 
     @property
     def is_llm_provider(self) -> bool:
@@ -49,6 +192,10 @@ class EternalAIConnection(BaseConnection):
         if not isinstance(config["model"], str):
             raise ValueError("model must be a string")
 
+        ttl = config.get("system_prompt_ttl")
+        if ttl is not None and (not isinstance(ttl, (int, float)) or ttl <= 0):
+            raise ValueError("system_prompt_ttl must be a positive number of seconds")
+
         return config
 
     def register_actions(self) -> None:
@@ -145,63 +292,46 @@ class EternalAIConnection(BaseConnection):
 
     @staticmethod
     def get_on_chain_system_prompt_content(on_chain_data: str) -> str:
-        if IPFS in on_chain_data:
-            light_house = on_chain_data.replace(IPFS, LIGHTHOUSE_IPFS)
-            response = requests.get(light_house)
-            if response.status_code == 200:
-                return response.text
-            else:
-                gcs = on_chain_data.replace(IPFS, GCS_ETERNAL_AI_BASE_URL)
-                response = requests.get(gcs)
-                if response.status_code == 200:
-                    return response.text
-                else:
-                    raise Exception(f"invalid on-chain system prompt response status{response.status_code}")
-        else:
-            if len(on_chain_data) > 0:
-                return on_chain_data
-            else:
-                raise Exception(f"invalid on-chain system prompt")
+        return resolve_prompt_content(on_chain_data)
 
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, chain_id: str = None, **kwargs) -> str:
         """Generate text using EternalAI models"""
+        model = model or self.config["model"]
+        logger.info(f"model {model}")
+
+        chain_id = chain_id or self.config.get("chain_id")
+        if not chain_id or chain_id == "":
+            chain_id = "45762"
+        logger.info(f"chain_id {chain_id}")
+
+        # Substitute the on-chain prompt before the response cache builds its key
+        if self._prompt_resolver:
+            logger.info(f"agent_id: {self._prompt_resolver.agent_id}, contract_address: {self._prompt_resolver.contract_address}")
+            try:
+                on_chain_prompt = self._prompt_resolver.resolve()
+                if on_chain_prompt:
+                    system_prompt = on_chain_prompt
+                    logging.info(f"new system_prompt: {system_prompt}")
+            except Exception as e:
+                logger.error(f"get on-chain system_prompt fail {e}")
+
+        return self._generate_text(prompt, system_prompt, model, chain_id=chain_id)
+
+    @cached_generation
+    def _generate_text(self, prompt: str, system_prompt: str, model: str, chain_id: str) -> str:
         try:
             client = self._get_client()
-            model = model or self.config["model"]
-            logger.info(f"model {model}")
-
-            chain_id = chain_id or self.config["chain_id"]
-            if not chain_id or chain_id == "":
-                chain_id = "45762"
-            logger.info(f"chain_id {chain_id}")
-
-            agent_id = self.config["agent_id"] or None
-            contract_address = self.config["contract_address"] or None
-            rpc = self.config["rpc_url"] or None
-
-            if agent_id and contract_address and rpc:
-                logger.info(f"agent_id: {agent_id}, contract_address: {contract_address}")
-                # call on-chain system prompt
-                web3 = Web3(Web3.HTTPProvider(rpc))
-                logger.info(f"web3 connected to {rpc} {web3.is_connected()}")
-                contract = web3.eth.contract(address=contract_address, abi=AGENT_CONTRACT_ABI)
-                result = contract.functions.getAgentSystemPrompt(agent_id).call()
-                logger.info(f"on-chain system_prompt: {result}")
-                if len(result) > 0:
-                    try:
-                        system_prompt = self.get_on_chain_system_prompt_content(result[0].decode("utf-8"))
-                        logging.info(f"new system_prompt: {system_prompt}")
-                    except Exception as e:
-                        logger.error(f"get on-chain system_prompt fail {e}")
-
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                extra_body={"chain_id": chain_id}
-            )
+
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    extra_body={"chain_id": chain_id}
+                )
+                slot.record_tokens(completion.usage.total_tokens if completion.usage else None)
 
             if completion.choices is None:
                 raise EternalAIAPIError(f"Text generation failed: completion.choices is None")
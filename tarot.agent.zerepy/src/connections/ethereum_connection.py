@@ -1,13 +1,12 @@
 import logging
 import os
 import time
-import requests
 from typing import Dict, Any, Optional, Union
 from dotenv import load_dotenv, set_key
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from src.constants.networks import EVM_NETWORKS
-from src.constants.abi import ERC20_ABI
+from src.helpers.token_registry import token_registry
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
 
 logger = logging.getLogger("connections.ethereum_connection")
@@ -202,7 +201,7 @@ class EthereumConnection(BaseConnection):
     def _get_token_address(self, ticker: str) -> Optional[str]:
         """Helper function to get token address from DEXScreener"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"https://api.dexscreener.com/latest/dex/search?q={ticker}"
             )
             response.raise_for_status()
@@ -252,15 +251,12 @@ class EthereumConnection(BaseConnection):
         """Helper function to get raw balance value"""
         if token_address and token_address.lower() != self.NATIVE_TOKEN.lower():
             # Get ERC20 token balance
-            contract = self._web3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=ERC20_ABI
-            )
+            contract = token_registry.contract(self._web3, token_address)
             balance = contract.functions.balanceOf(
                 Web3.to_checksum_address(address)
             ).call()
-            decimals = contract.functions.decimals().call()
-            return balanqce / (10 ** decimals)
+            decimals = token_registry.decimals(self._web3, token_address)
+            return balance / (10 ** decimals)
         else:
             # Get native ETH balance
             balance = self._web3.eth.get_balance(Web3.to_checksum_address(address))
@@ -292,14 +288,11 @@ class EthereumConnection(BaseConnection):
                 return self._web3.from_wei(raw_balance, 'ether')
             
             # Get token contract
-            token_contract = self._web3.eth.contract(
-                address=Web3.to_checksum_address(token_address), 
-                abi=ERC20_ABI 
-            )
+            token_contract = token_registry.contract(self._web3, token_address)
             
             # Get token info
-            symbol = token_contract.functions.symbol().call()
-            decimals = token_contract.functions.decimals().call()
+            symbol = token_registry.symbol(self._web3, token_address)
+            decimals = token_registry.decimals(self._web3, token_address)
             
             # Get balance
             raw_balance = token_contract.functions.balanceOf(account.address).call()
@@ -308,7 +301,7 @@ class EthereumConnection(BaseConnection):
             # Try to get ETH value using Kyberswap price API
             try:
                 kyber_url = f"{self.aggregator_api}/tokens/rates"
-                response = requests.get(kyber_url, params={
+                response = self.http.get(kyber_url, params={
                     "tokenIn": token_address, 
                     "tokenOut": self.NATIVE_TOKEN, 
                     "amount": str(raw_balance) 
@@ -345,11 +338,8 @@ class EthereumConnection(BaseConnection):
             
             if token_address and token_address.lower() != self.NATIVE_TOKEN.lower():
                 # Prepare ERC20 transfer
-                contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=ERC20_ABI
-                )
-                decimals = contract.functions.decimals().call()
+                contract = token_registry.contract(self._web3, token_address)
+                decimals = token_registry.decimals(self._web3, token_address)
                 amount_raw = int(amount * (10 ** decimals))
                 
                 tx = contract.functions.transfer(
@@ -424,11 +414,7 @@ class EthereumConnection(BaseConnection):
             if token_in.lower() == self.NATIVE_TOKEN.lower():
                 amount_raw = self._web3.to_wei(amount, 'ether')
             else:
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_in),
-                    abi=ERC20_ABI
-                )
-                decimals = token_contract.functions.decimals().call()
+                decimals = token_registry.decimals(self._web3, token_in)
                 amount_raw = int(amount * (10 ** decimals))
             
             # Prepare API request
@@ -441,7 +427,7 @@ class EthereumConnection(BaseConnection):
                 "gasInclude": "true"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -479,7 +465,7 @@ class EthereumConnection(BaseConnection):
                 "source": "zerepy"
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = self.http.post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             data = response.json()
@@ -522,10 +508,7 @@ class EthereumConnection(BaseConnection):
                 private_key = os.getenv('ETH_PRIVATE_KEY')
                 account = self._web3.eth.account.from_key(private_key)
                 
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=ERC20_ABI
-                )
+                token_contract = token_registry.contract(self._web3, token_address)
                 
                 # Check current allowance
                 current_allowance = token_contract.functions.allowance(
@@ -604,11 +587,7 @@ class EthereumConnection(BaseConnection):
                 if token_in.lower() == "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2".lower():  # WETH
                     amount_raw = self._web3.to_wei(amount, 'ether')
                 else:
-                    token_contract = self._web3.eth.contract(
-                        address=Web3.to_checksum_address(token_in),
-                        abi=ERC20_ABI
-                    )
-                    decimals = token_contract.functions.decimals().call()
+                    decimals = token_registry.decimals(self._web3, token_in)
                     amount_raw = int(amount * (10 ** decimals))
                     
                 approval_hash = self._handle_token_approval(token_in, router_address, amount_raw)
@@ -2,10 +2,11 @@ import logging
 import os
 from typing import Dict, Any
 
-import requests
 from dotenv import load_dotenv, set_key
 from openai import OpenAI
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
+from src.helpers.rate_limiter import estimate_tokens, rate_limited
 
 logger = logging.getLogger("connections.galadriel_connection")
 
@@ -127,7 +128,7 @@ class GaladrielConnection(BaseConnection):
             return False
 
     def _is_api_key_valid(self, api_key):
-        response = requests.get(
+        response = self.http.get(
             f"{API_BASE_URL}/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}"
@@ -136,6 +137,7 @@ class GaladrielConnection(BaseConnection):
         )
         return response.status_code != 401
 
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using Galadriel models"""
         try:
@@ -145,13 +147,15 @@ class GaladrielConnection(BaseConnection):
             if not model:
                 model = self.config["model"]
 
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-            )
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+                slot.record_tokens(completion.usage.total_tokens if completion.usage else None)
 
             return completion.choices[0].message.content
 
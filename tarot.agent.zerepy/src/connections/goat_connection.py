@@ -9,6 +9,8 @@ from web3 import Web3
 from dotenv import set_key, load_dotenv
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
 from src.helpers import print_h_bar
+from src.helpers.cache import shared_cache, make_cache_key
+from src.helpers.multicall import get_balances
 from src.action_handler import register_action
 from goat.classes.plugin_base import PluginBase
 from goat import ToolBase, WalletClientBase, get_tools
@@ -16,6 +18,13 @@ from goat_wallets.web3 import Web3EVMWalletClient
 
 logger = logging.getLogger("connections.goat_connection")
 
+# Read-only tools whose results are shared across callers for a few seconds.
+# Anything not listed here (transfers, approvals...) is never cached.
+DEFAULT_CACHE_TTLS = {
+    "get_token_balance": 30,
+    "get_coin_price": 60,
+}
+
 
 class GoatConnectionError(Exception):
     """Base exception for Goat connection errors"""
@@ -35,6 +44,7 @@ class GoatConnection(BaseConnection):
 
         self._is_configured = False
         self._wallet_client: WalletClientBase | None = None
+        self._web3: Web3 | None = None
         self._plugins: Dict[str, PluginBase] = {}
         self._action_registry: Dict[str, ToolBase] = {}
         self._config = self.validate_config(
@@ -206,6 +216,13 @@ class GoatConnection(BaseConnection):
                 f"Missing required configuration fields: {', '.join(missing_fields)}"
             )
 
+        cache_ttls = config.get("cache_ttls", {})
+        if not isinstance(cache_ttls, dict):
+            raise ValueError("cache_ttls must be a dictionary")
+        for action_name, ttl in cache_ttls.items():
+            if not isinstance(ttl, (int, float)) or ttl < 0:
+                raise ValueError(f"Invalid cache TTL for '{action_name}'. Must be a non-negative number of seconds")
+
         for plugin_config in config["plugins"]:
             missing_plugin_fields = [
                 field for field in required_plugin_fields if field not in plugin_config
@@ -281,6 +298,7 @@ class GoatConnection(BaseConnection):
             try:
                 account = Account.from_key(private_key)
                 w3.eth.default_account = account.address
+                self._web3 = w3
                 self._wallet_client = Web3EVMWalletClient(w3)
                 # Register actions now that we have a wallet
                 self._register_actions_with_wallet()
@@ -375,6 +393,7 @@ class GoatConnection(BaseConnection):
 
             # Initialize wallet client
             w3.eth.default_account = account.address
+            self._web3 = w3
             self._wallet_client = Web3EVMWalletClient(w3)
 
             # Register actions now that we have a wallet
@@ -400,4 +419,33 @@ class GoatConnection(BaseConnection):
             raise KeyError(f"Unknown action: {action_name}")
 
         tool = self._action_registry[action_name]
-        return tool.execute(kwargs)
+
+        ttl = self._cache_ttl(action_name)
+        if not ttl:
+            return tool.execute(kwargs)
+
+        return shared_cache.get_or_call(
+            make_cache_key("goat", action_name, kwargs),
+            ttl,
+            lambda: tool.execute(kwargs)
+        )
+
+    def get_token_balances(self, token_addresses: List[str], wallet_addresses: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Raw balances of several tokens for several wallets in one Multicall3 call.
+
+        Returns {wallet: {token: balance}}, shared through the cache like get_token_balance.
+        """
+        if not self.is_configured():
+            raise GoatConfigurationError("GOAT connection is not configured")
+
+        return shared_cache.get_or_call(
+            make_cache_key("goat", "get_token_balances", {"tokens": token_addresses, "wallets": wallet_addresses}),
+            self._cache_ttl("get_token_balance"),
+            lambda: get_balances(self._web3, token_addresses, wallet_addresses)
+        )
+
+    def _cache_ttl(self, action_name: str) -> float:
+        """Seconds a tool result may be reused for, 0 disables caching"""
+        ttls = {**DEFAULT_CACHE_TTLS, **self._config.get("cache_ttls", {})}
+        return ttls.get(action_name, 0)
@@ -4,6 +4,8 @@ from typing import Dict, Any
 from dotenv import load_dotenv, set_key
 from openai import OpenAI
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
+from src.helpers.rate_limiter import estimate_tokens, rate_limited
 
 logger = logging.getLogger("connections.groq_connection")
 
@@ -137,6 +139,7 @@ class GroqConnection(BaseConnection):
                 logger.debug(f"Configuration check failed: {e}")
             return False
 
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using Groq models"""
         try:
@@ -146,14 +149,16 @@ class GroqConnection(BaseConnection):
             if not model:
                 model = self.config["model"]
 
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
                 
-            )
+                )
+                slot.record_tokens(completion.usage.total_tokens if completion.usage else None)
 
             return completion.choices[0].message.content
             
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.event_loop import run_coroutine
+
+logger = logging.getLogger("connections.llm_router_connection")
+
+class LLMRouterConnectionError(Exception):
+    """Base exception for LLM router errors"""
+    pass
+
+class LLMRouterConfigurationError(LLMRouterConnectionError):
+    """Raised when the router has no usable providers"""
+    pass
+
+class LLMRouterAPIError(LLMRouterConnectionError):
+    """Raised when every provider failed a request"""
+    pass
+
+# Number of recent calls per provider used for p95 latency and error rate
+DEFAULT_WINDOW = 50
+
+# Each recent error weighs like this many times the p95 latency when ranking providers
+ERROR_PENALTY = 4
+
+# Latency a failed call counts as when the router has no timeout configured
+DEFAULT_FAILURE_LATENCY = 30
+
+
+class ProviderStats:
+    """Rolling latency and error rate of one provider, failed calls count as slow calls"""
+
+    def __init__(self, window: int):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, ok: bool, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self._outcomes.append(ok)
+            self._latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            ordered = sorted(self._latencies)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def score(self) -> float:
+        """Lower is better. Providers without data score 0 so they get tried"""
+        return (self.p95() or 0.0) * (1 + ERROR_PENALTY * self.error_rate())
+
+
+class LLMRouterConnection(BaseConnection):
+    """
+    Routes generate-text across every configured LLM provider.
+
+    Providers are ranked by rolling p95 latency and error rate. A request that hasn't
+    answered after `hedge_after` seconds is duplicated on the next provider and the first
+    answer wins; a failed request moves on to the next provider.
+    """
+
+    def __init__(self, config: Dict[str, Any], connection_manager=None):
+        super().__init__(config, connection_manager=connection_manager)
+        self._stats: Dict[str, ProviderStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def is_llm_provider(self) -> bool:
+        return True
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate LLM router configuration from JSON"""
+        providers = config.get("providers")
+        if providers is not None and (
+            not isinstance(providers, list) or not all(isinstance(name, str) for name in providers)
+        ):
+            raise ValueError("providers must be a list of connection names")
+
+        for field in ("hedge_after", "timeout"):
+            if field in config and config[field] is not None and (
+                not isinstance(config[field], (int, float)) or config[field] <= 0
+            ):
+                raise ValueError(f"{field} must be a positive number")
+
+        if "window" in config and (not isinstance(config["window"], int) or config["window"] <= 0):
+            raise ValueError("window must be a positive integer")
+
+        return config
+
+    def register_actions(self) -> None:
+        """Register available LLM router actions"""
+        self.actions = {
+            "generate-text": Action(
+                name="generate-text",
+                parameters=[
+                    ActionParameter("prompt", True, str, "The input prompt for text generation"),
+                    ActionParameter("system_prompt", True, str, "System prompt to guide the model")
+                ],
+                description="Generate text using the fastest healthy LLM provider"
+            ),
+            "get-provider-stats": Action(
+                name="get-provider-stats",
+                parameters=[],
+                description="Get latency and error rate of each routed provider"
+            )
+        }
+
+    def configure(self) -> bool:
+        """The router has no credentials of its own, configure its providers instead"""
+        logger.info("\nThe LLM router uses the configured LLM connections, configure those instead.")
+        return self.is_configured()
+
+    def is_configured(self, verbose = False) -> bool:
+        """Configured when at least one of its providers is"""
+        try:
+            return any(
+                self.connection_manager.health.is_configured(name)
+                for name in self._provider_names()
+            )
+        except Exception as e:
+            if verbose:
+                logger.debug(f"Configuration check failed: {e}")
+            return False
+
+    def _provider_names(self) -> List[str]:
+        """Providers from config, or every LLM connection in the agent"""
+        if not self.connection_manager:
+            raise LLMRouterConfigurationError("LLM router needs a connection manager")
+
+        connections = self.connection_manager.connections
+        names = self.config.get("providers") or self.connection_manager.llm_connection_names()
+        return [name for name in names if connections.get(name) is not None and connections.get(name) is not self]
+
+    def _configured_providers(self) -> List[str]:
+        """Providers whose credentials passed their last health check"""
+        return [name for name in self._provider_names() if self.connection_manager.health.is_configured(name)]
+
+    def _provider_stats(self, name: str) -> ProviderStats:
+        with self._stats_lock:
+            if name not in self._stats:
+                self._stats[name] = ProviderStats(self.config.get("window", DEFAULT_WINDOW))
+            return self._stats[name]
+
+    def _ranked_providers(self) -> List[str]:
+        """Configured providers ordered best first, config order breaks ties"""
+        names = self._configured_providers()
+        if not names:
+            raise LLMRouterConfigurationError("No configured LLM providers to route to")
+        return sorted(names, key=lambda name: self._provider_stats(name).score())
+
+    async def _call_provider(self, name: str, prompt: str, system_prompt: str) -> Tuple[str, str]:
+        """Run generate-text on one provider, recording its latency or failure"""
+        connection = self.connection_manager.connections[name]
+        params = {"prompt": prompt, "system_prompt": system_prompt}
+        started = time.monotonic()
+        try:
+            if hasattr(connection, "aperform_action"):
+                call = connection.aperform_action("generate-text", params)
+            else:
+                call = asyncio.to_thread(connection.perform_action, "generate-text", params)
+            result = await asyncio.wait_for(call, timeout=self.config.get("timeout"))
+            if result is None:
+                raise LLMRouterAPIError(f"{name} returned no text")
+        except asyncio.CancelledError:
+            # Lost a hedge race, only a lower bound of its latency is known so it isn't recorded
+            raise
+        except Exception as e:
+            failure_latency = self.config.get("timeout") or DEFAULT_FAILURE_LATENCY
+            self._provider_stats(name).record(False, max(failure_latency, time.monotonic() - started))
+            raise LLMRouterAPIError(f"{name}: {e}") from e
+
+        self._provider_stats(name).record(True, time.monotonic() - started)
+        return name, result
+
+    async def agenerate_text(self, prompt: str, system_prompt: str, **kwargs) -> str:
+        """Generate text on the best provider, hedging slow requests and failing over on errors"""
+        # A provider's first health check goes over the network, keep it off the loop
+        remaining = await asyncio.to_thread(self._ranked_providers)
+        hedge_after = self.config.get("hedge_after")
+        pending: Dict[asyncio.Task, str] = {}
+        errors: List[str] = []
+
+        def launch() -> None:
+            name = remaining.pop(0)
+            pending[asyncio.create_task(self._call_provider(name, prompt, system_prompt))] = name
+
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_after if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(f"{', '.join(pending.values())} slower than {hedge_after}s, hedging")
+                    launch()
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        name, text = task.result()
+                    except Exception as e:
+                        logger.warning(f"LLM provider failed, failing over: {e}")
+                        errors.append(str(e))
+                        continue
+                    logger.debug(f"LLM router answered with {name}")
+                    return text
+
+                # Everything that finished failed, fail over right away
+                if remaining:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise LLMRouterAPIError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    def generate_text(self, prompt: str, system_prompt: str, **kwargs) -> str:
+        """Synchronous version of agenerate_text"""
+        return run_coroutine(self.agenerate_text(prompt, system_prompt))
+
+    async def aget_provider_stats(self, **kwargs) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.get_provider_stats)
+
+    def get_provider_stats(self, **kwargs) -> Dict[str, Any]:
+        """Latency and error rate of each provider, best first"""
+        stats = {}
+        for name in self._ranked_providers():
+            provider = self._provider_stats(name)
+            p95 = provider.p95()
+            stats[name] = {
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "error_rate": round(provider.error_rate(), 4),
+                "calls": provider.calls,
+                "errors": provider.errors
+            }
+        return stats
+
+    def perform_action(self, action_name: str, kwargs) -> Any:
+        """Execute an LLM router action with validation"""
+        if action_name not in self.actions:
+            raise KeyError(f"Unknown action: {action_name}")
+
+        action = self.actions[action_name]
+        errors = action.validate_params(kwargs)
+        if errors:
+            raise ValueError(f"Invalid parameters: {', '.join(errors)}")
+
+        method_name = action_name.replace('-', '_')
+        method = getattr(self, method_name)
+        return method(**kwargs)
+
+    async def aperform_action(self, action_name: str, kwargs) -> Any:
+        """Async version of perform_action"""
+        if action_name not in self.actions:
+            raise KeyError(f"Unknown action: {action_name}")
+
+        action = self.actions[action_name]
+        errors = action.validate_params(kwargs)
+        if errors:
+            raise ValueError(f"Invalid parameters: {', '.join(errors)}")
+
+        method_name = action_name.replace('-', '_')
+        return await getattr(self, f"a{method_name}")(**kwargs)
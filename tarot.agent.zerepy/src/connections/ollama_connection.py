@@ -1,8 +1,8 @@
 import logging
-import requests
 import json
 from typing import Dict, Any
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
 
 logger = logging.getLogger("connections.ollama_connection")
 
@@ -18,6 +18,9 @@ class OllamaAPIError(OllamaConnectionError):
 
 
 class OllamaConnection(BaseConnection):
+    # Local models can take minutes to load before the first token streams back
+    DEFAULT_HTTP = {"timeout": 300}
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.base_url = config.get("base_url", "http://localhost:11434")  # Default to local Ollama setup
@@ -79,7 +82,7 @@ class OllamaConnection(BaseConnection):
         """Test if Ollama is reachable"""
         try:
             url = f"{self.base_url}/v1/models"
-            response = requests.get(url)
+            response = self.http.get(url)
             if response.status_code != 200:
                 raise OllamaAPIError(f"Failed to connect to Ollama: {response.status_code} - {response.text}")
         except Exception as e:
@@ -95,6 +98,7 @@ class OllamaConnection(BaseConnection):
                 logger.error(f"Ollama configuration check failed: {e}")
             return False
 
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using Ollama API with streaming support"""
         try:
@@ -104,7 +108,7 @@ class OllamaConnection(BaseConnection):
                 "prompt": prompt,
                 "system": system_prompt,
             }
-            response = requests.post(url, json=payload, stream=True)
+            response = self.http.post(url, json=payload, stream=True)
 
             if response.status_code != 200:
                 raise OllamaAPIError(f"API error: {response.status_code} - {response.text}")
@@ -1,10 +1,13 @@
+import asyncio
 import logging
 import os
-import time
+import weakref
 from typing import Dict, Any
 from dotenv import load_dotenv, set_key
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import acached_generation, cached_generation
+from src.helpers.rate_limiter import arate_limited, estimate_tokens, rate_limited
 
 logger = logging.getLogger("connections.openai_connection")
 
@@ -21,11 +24,14 @@ class OpenAIAPIError(OpenAIConnectionError):
     pass
 
 class OpenAIConnection(BaseConnection):
+    # One request per second on average, with short bursts allowed
+    DEFAULT_RATE_LIMIT = {"requests_per_minute": 60, "burst": 5}
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._client = None
-        self._last_request_time = 0
-        self._min_request_interval = 1.0  # Minimum seconds between requests
+        # One pooled async client per event loop, httpx connections can't be shared across loops
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
 
     @property
     def is_llm_provider(self) -> bool:
@@ -85,6 +91,18 @@ class OpenAIConnection(BaseConnection):
             self._client = OpenAI(api_key=api_key)
         return self._client
 
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Get or create the pooled async OpenAI client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if not client:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise OpenAIConfigurationError("OpenAI API key not found in environment")
+            client = AsyncOpenAI(api_key=api_key)
+            self._async_clients[loop] = client
+        return client
+
     def configure(self) -> bool:
         """Sets up OpenAI API authentication"""
         logger.info("\n🤖 OPENAI API SETUP")
@@ -138,50 +156,71 @@ class OpenAIConnection(BaseConnection):
                 logger.debug(f"Configuration check failed: {e}")
             return False
 
-    def _throttle_requests(self):
-        """Implement request throttling"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-        
-        if time_since_last_request < self._min_request_interval:
-            sleep_time = self._min_request_interval - time_since_last_request
-            logger.debug(f"Rate limiting: Waiting {sleep_time:.2f}s before next request")
-            time.sleep(sleep_time)
-            
-        self._last_request_time = time.time()
-
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using OpenAI models with rate limiting"""
         try:
-            self._throttle_requests()  # Apply rate limiting
-            
             client = self._get_client()
             
             # Use configured model if none provided
             if not model:
                 model = self.config["model"]
 
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-            )
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+                slot.record_tokens(completion.usage.total_tokens if completion.usage else None)
 
             return completion.choices[0].message.content
             
         except Exception as e:
             raise OpenAIAPIError(f"Text generation failed: {e}")
 
+    @acached_generation
+    async def agenerate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
+        """Async version of generate_text, waits for the rate limiter on the event loop"""
+        try:
+            client = self._get_async_client()
+
+            # Use configured model if none provided
+            if not model:
+                model = self.config["model"]
+
+            async with arate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                completion = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+                slot.record_tokens(completion.usage.total_tokens if completion.usage else None)
+
+            return completion.choices[0].message.content
+
+        except Exception as e:
+            raise OpenAIAPIError(f"Text generation failed: {e}")
+
     def generate_text_sync(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Synchronous version of generate_text"""
         return self.generate_text(prompt, system_prompt, model, **kwargs)
 
     def generate_image(self, prompt: str, **kwargs) -> str:
-        self._throttle_requests()
         client = self._get_client()
-        response = client.images.generate(prompt=prompt, model="dall-e-2")
+        with rate_limited(self.rate_limiter):
+            response = client.images.generate(prompt=prompt, model="dall-e-2")
+        return response.data[0].url
+
+    async def agenerate_image(self, prompt: str, **kwargs) -> str:
+        """Async version of generate_image"""
+        client = self._get_async_client()
+        async with arate_limited(self.rate_limiter):
+            response = await client.images.generate(prompt=prompt, model="dall-e-2")
         return response.data[0].url
 
     def check_model(self, model, **kwargs):
@@ -236,3 +275,19 @@ class OpenAIConnection(BaseConnection):
         method_name = action_name.replace('-', '_')
         method = getattr(self, method_name)
         return method(**kwargs)
+
+    async def aperform_action(self, action_name: str, kwargs) -> Any:
+        """Async version of perform_action, uses the async client where there is one"""
+        if action_name not in self.actions:
+            raise KeyError(f"Unknown action: {action_name}")
+
+        action = self.actions[action_name]
+        errors = action.validate_params(kwargs)
+        if errors:
+            raise ValueError(f"Invalid parameters: {', '.join(errors)}")
+
+        method_name = action_name.replace('-', '_')
+        async_method = getattr(self, f"a{method_name}", None)
+        if async_method:
+            return await async_method(**kwargs)
+        return await asyncio.to_thread(getattr(self, method_name), **kwargs)
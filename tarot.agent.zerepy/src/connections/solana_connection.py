@@ -1,7 +1,6 @@
 import logging
 import os
 import requests
-import asyncio
 from typing import Dict, Any, Optional
 
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
@@ -16,6 +15,7 @@ from src.helpers.solana.token_deploy import TokenDeploymentManager
 from src.helpers.solana.performance import SolanaPerformanceTracker
 from src.helpers.solana.transfer import SolanaTransferHelper
 from src.helpers.solana.read import SolanaReadHelper
+from src.helpers.event_loop import run_coroutine
 
 
 from dotenv import load_dotenv, set_key
@@ -46,6 +46,7 @@ class SolanaConfigurationError(SolanaConnectionError):
 class SolanaConnection(BaseConnection):
     def __init__(self, config: Dict[str, Any]):
         logger.info("Initializing Solana connection...")
+        self._async_client: Optional[AsyncClient] = None
         super().__init__(config)
 
     @property
@@ -53,8 +54,10 @@ class SolanaConnection(BaseConnection):
         return False
 
     def _get_connection_async(self) -> AsyncClient:
-        conn = AsyncClient(self.config["rpc"])
-        return conn
+        # Reused across calls, every coroutine runs on the same shared event loop
+        if self._async_client is None:
+            self._async_client = AsyncClient(self.config["rpc"])
+        return self._async_client
 
     def _get_wallet(self):
         creds = self._get_credentials()
@@ -293,7 +296,7 @@ class SolanaConnection(BaseConnection):
             amount,
             token_mint,
         )
-        res = asyncio.run(res)
+        res = run_coroutine(res)
         logger.debug(f"Transferred {amount} to {to_address}\nTransaction ID: {res}")
         return res
 
@@ -318,7 +321,7 @@ class SolanaConnection(BaseConnection):
             input_mint,
             slippage_bps,
         )
-        res = asyncio.run(res)
+        res = run_coroutine(res)
         return res
 
     def get_balance(self, token_address: str = None) -> float:
@@ -329,7 +332,7 @@ class SolanaConnection(BaseConnection):
         res = SolanaReadHelper.get_balance(
             self._get_connection_async(), self._get_wallet(), token_address
         )
-        res = asyncio.run(res)
+        res = run_coroutine(res)
         return res
 
     def stake(self, amount: float) -> str:
@@ -337,7 +340,7 @@ class SolanaConnection(BaseConnection):
         res = StakeManager.stake_with_jup(
             self._get_connection_async(), self._get_wallet(), amount
         )
-        res = asyncio.run(res)
+        res = run_coroutine(res)
         logger.debug(f"Staked {amount} SOL\nTransaction ID: {res}")
         return res
 
@@ -348,14 +351,14 @@ class SolanaConnection(BaseConnection):
         # res = AssetLender.lend_asset(
         #     self._get_connection_async(), self._get_wallet(), amount
         # )
-        # res = asyncio.run(res)
+        # res = run_coroutine(res)
         # logger.debug(f"Lent {amount} USDC\nTransaction ID: {res}")
         # return res
 
     def request_faucet(self) -> str:
         logger.info("Requesting faucet funds")
         res = FaucetManager.request_faucet_funds(self)
-        res = asyncio.run(res)
+        res = run_coroutine(res)
         logger.debug(f"Requested faucet funds\nTransaction ID: {res}")
         return res
 
@@ -365,7 +368,7 @@ class SolanaConnection(BaseConnection):
         # res = TokenDeploymentManager.deploy_token(
         #     self._get_connection_async(), self._get_wallet(), decimals
         # )
-        # res = asyncio.run(res)
+        # res = run_coroutine(res)
         # logger.debug(
         #     f"Deployed token with {decimals} decimals\nToken Mint: {res['mint']}"
         # )
@@ -377,7 +380,7 @@ class SolanaConnection(BaseConnection):
     # todo: test on mainnet
     def get_tps(self) -> int:
         res = SolanaPerformanceTracker.fetch_current_tps(self._get_connection_async())
-        res = asyncio.run(res)
+        res = run_coroutine(res)
         return res
 
     def get_token_by_ticker(self, ticker: str) -> str:
@@ -409,7 +412,7 @@ class SolanaConnection(BaseConnection):
         #    image_url,
         #    options,
         # )
-        # res = asyncio.run(res)
+        # res = run_coroutine(res)
         # logger.debug(
         #    f"Launched Pump & Fun token {token_ticker}\nToken Mint: {res['mint']}"
         # )
@@ -1,6 +1,5 @@
 import logging
 import os
-import requests
 import time
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv, set_key
@@ -9,6 +8,8 @@ from web3.middleware import geth_poa_middleware
 from src.constants.abi import ERC20_ABI
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
 from src.constants.networks import SONIC_NETWORKS
+from src.helpers.multicall import get_balances
+from src.helpers.token_registry import token_registry
 
 logger = logging.getLogger("connections.sonic_connection")
 
@@ -78,7 +79,7 @@ class SonicConnection(BaseConnection):
             if ticker.lower() in ["s", "S"]:
                 return "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
                 
-            response = requests.get(
+            response = self.http.get(
                 f"https://api.dexscreener.com/latest/dex/search?q={ticker}"
             )
             response.raise_for_status()
@@ -123,6 +124,14 @@ class SonicConnection(BaseConnection):
                 ],
                 description="Get $S or token balance"
             ),
+            "get-balances": Action(
+                name="get-balances",
+                parameters=[
+                    ActionParameter("token_addresses", True, str, "Comma separated token addresses"),
+                    ActionParameter("address", False, str, "Address to check balances for")
+                ],
+                description="Get several token balances in one call"
+            ),
             "transfer": Action(
                 name="transfer",
                 parameters=[
@@ -203,12 +212,9 @@ class SonicConnection(BaseConnection):
                 address = account.address
 
             if token_address:
-                contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=self.ERC20_ABI
-                )
+                contract = token_registry.contract(self._web3, token_address, self.ERC20_ABI)
                 balance = contract.functions.balanceOf(address).call()
-                decimals = contract.functions.decimals().call()
+                decimals = token_registry.decimals(self._web3, token_address)
                 return balance / (10 ** decimals)
             else:
                 balance = self._web3.eth.get_balance(address)
@@ -218,6 +224,28 @@ class SonicConnection(BaseConnection):
             logger.error(f"Failed to get balance: {e}")
             raise
 
+    def get_balances(self, token_addresses: str, address: Optional[str] = None) -> Dict[str, float]:
+        """Get balances of several tokens with a single Multicall3 call"""
+        try:
+            if not address:
+                private_key = os.getenv('SONIC_PRIVATE_KEY')
+                if not private_key:
+                    raise SonicConnectionError("No wallet configured")
+                address = self._web3.eth.account.from_key(private_key).address
+
+            tokens = [token.strip() for token in token_addresses.split(",") if token.strip()]
+            raw_balances = get_balances(self._web3, tokens, [address])[address]
+            decimals = token_registry.get_decimals(self._web3, tokens)
+            return {
+                token: None if raw_balances[token] is None or token not in decimals
+                else raw_balances[token] / (10 ** decimals[token])
+                for token in tokens
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to get balances: {e}")
+            raise
+
     def transfer(self, to_address: str, amount: float, token_address: Optional[str] = None) -> str:
         """Transfer $S or tokens to an address"""
         try:
@@ -226,11 +254,8 @@ class SonicConnection(BaseConnection):
             chain_id = self._web3.eth.chain_id
             
             if token_address:
-                contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=self.ERC20_ABI
-                )
-                decimals = contract.functions.decimals().call()
+                contract = token_registry.contract(self._web3, token_address, self.ERC20_ABI)
+                decimals = token_registry.decimals(self._web3, token_address)
                 amount_raw = int(amount * (10 ** decimals))
                 
                 tx = contract.functions.transfer(
@@ -272,11 +297,7 @@ class SonicConnection(BaseConnection):
             if token_in.lower() == self.NATIVE_TOKEN.lower():
                 amount_raw = self._web3.to_wei(amount_in, 'ether')
             else:
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_in),
-                    abi=self.ERC20_ABI
-                )
-                decimals = token_contract.functions.decimals().call()
+                decimals = token_registry.decimals(self._web3, token_in)
                 amount_raw = int(amount_in * (10 ** decimals))
             
             # Set up API request
@@ -289,7 +310,7 @@ class SonicConnection(BaseConnection):
                 "gasInclude": "true"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -320,7 +341,7 @@ class SonicConnection(BaseConnection):
                 "source": "ZerePyBot"
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = self.http.post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             data = response.json()
@@ -339,10 +360,7 @@ class SonicConnection(BaseConnection):
             private_key = os.getenv('SONIC_PRIVATE_KEY')
             account = self._web3.eth.account.from_key(private_key)
             
-            token_contract = self._web3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=self.ERC20_ABI
-            )
+            token_contract = token_registry.contract(self._web3, token_address, self.ERC20_ABI)
             
             # Check current allowance
             current_allowance = token_contract.functions.allowance(
@@ -401,11 +419,7 @@ class SonicConnection(BaseConnection):
                 if token_in.lower() == "0x039e2fb66102314ce7b64ce5ce3e5183bc94ad38".lower():  # $S token
                     amount_raw = self._web3.to_wei(amount, 'ether')
                 else:
-                    token_contract = self._web3.eth.contract(
-                        address=Web3.to_checksum_address(token_in),
-                        abi=self.ERC20_ABI
-                    )
-                    decimals = token_contract.functions.decimals().call()
+                    decimals = token_registry.decimals(self._web3, token_in)
                     amount_raw = int(amount * (10 ** decimals))
                 self._handle_token_approval(token_in, router_address, amount_raw)
             
@@ -1,21 +1,159 @@
+import asyncio
+import functools
 import logging
-import os
-from typing import Dict, Any, List
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Dict, Any, List, Mapping, Optional, Tuple
 
 import httpx
 from bs4 import BeautifulSoup
 import json
 
-import requests
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.constants.networks import SONIC_NETWORKS
+from src.helpers.event_loop import run_coroutine
+from src.helpers.image_store import image_store
+from src.helpers.token_registry import token_registry
 from decimal import Decimal
 
 logger = logging.getLogger("connections.tarot_reader")
 
+# Wallet that receives the bribes, and the tokens we weigh the reading with
+BRIBE_WALLET = "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf"
+BRIBE_TOKENS = {
+    "usdce": "0x29219dd400f2Bf60E5a23d13Be72B486D4038894",
+    "shadow": "0x3333b97138D4b086720b5aE8A7844b1345a33333",
+    "beets": "0x2D0E0814E62D80056181F5cd932274405966e4f0",
+    "relic": "0xf2968631d02330dc5e420373f083b7b4f8b24e17"
+}
+BRIBE_TOKEN_DECIMALS = {
+    "usdce": 6,
+    "shadow": 18,
+    "beets": 18,
+    "relic": 18
+}
+
+# Seed the token registry so the bribe tokens never cost a decimals() call
+token_registry.prewarm(SONIC_NETWORKS["mainnet"]["chain_id"], {
+    BRIBE_TOKENS[name]: {"decimals": decimals} for name, decimals in BRIBE_TOKEN_DECIMALS.items()
+})
+
+NO_DATA = " { there's currently no data, sorry! }"
+
+# Seconds each data source gets before we fall back to a default value
+DEFAULT_SOURCE_TIMEOUTS = {
+    "balances": 5.0,
+    "market": 5.0,
+    "allora": 8.0
+}
+
+# Blocking fetches run here rather than in the loop's default executor, so a source
+# that outlives its timeout never holds up the shutdown of the reading's event loop
+_fetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tarot-fetch")
+
+# Image prompt rewrite + image generation for pipelined readings run here, after the
+# text reading has already been handed back to the caller
+_image_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tarot-image")
+
+# How many image jobs we remember, the oldest finished ones are forgotten first
+MAX_IMAGE_JOBS = 100
+
+DALLE_PROMPT_TEMPLATE = """
+You will enhance the following text to create a DALL-E prompt:
+* A tarot card illustration in a Rider-Waite style, featuring [describe the central figure], symbolizing [the underlying concept]. The figure is adorned in [describe attire and accessories] and [include additional distinctive features]. The card incorporates [describe key elements or objects], set against a background that is [describe the environment], evoking [a specific mood or atmosphere]. The illustration should be hand-drawn with bold black outlines, vibrant flat colors, and subtle shading for depth, staying true to the timeless tarot aesthetic. *
+Using the mystical reading provided below, add a detailed character description. Include negative parameters to ensure no text appears in the image and that only one card is depicted.
+Below is the mystical reading (for reference only; do not include it in your output):
+{mystical_reading}
+"""
+
+# Background refresh of the reading context, both in seconds
+DEFAULT_CONTEXT_REFRESH_INTERVAL = 60
+DEFAULT_CONTEXT_MAX_STALENESS = 300
+
+EMPTY_MARKET_DATA = {
+    "price": 0.0,
+    "price_change": 0.0,
+    "market_cap": 0,
+    "volume": 0
+}
+
+
+@dataclass
+class ReadingInputs:
+    """Everything a reading needs from the outside world, fetched up front"""
+    balances: Dict[str, int]
+    market_data: Dict[str, Any]
+    allora_prediction: Dict[str, Any]
+    # Names of the sources that timed out or failed and were replaced by a fallback
+    degraded: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ReadingContext:
+    """
+    Immutable snapshot of everything derived from chain and market data for a reading.
+
+    Snapshots are swapped atomically by the background refresher, readings only ever
+    hold a reference to one, so they never observe a half-updated context.
+    """
+    weights: Mapping[str, float]
+    weight_descriptions: Mapping[str, str]
+    market_data: Mapping[str, Any]
+    allora_inference: Any
+    degraded: Tuple[str, ...]
+    created_at: float
+
+    def age(self) -> float:
+        """Seconds since this snapshot was built"""
+        return time.time() - self.created_at
+
+
+def get_weight_description(weight: float) -> str:
+    """Bucket a bribe weight (in percent) into a description of its influence"""
+    if weight < 5:
+        return "no influence"
+    elif weight < 25:
+        return "little influence"
+    elif weight < 50:
+        return "some influence"
+    elif weight < 90:
+        return "lots of influence"
+    else:
+        return "total influence"
+
+
+def _format_market_data(market_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Round market numbers for the prompt, leaving values that aren't numeric untouched"""
+    formatted = dict(market_data)
+    for key, convert in (
+        ("price", lambda v: round(float(v), 2)),
+        ("price_change", lambda v: round(float(v), 2)),
+        ("market_cap", int),
+        ("volume", int)
+    ):
+        try:
+            formatted[key] = convert(market_data[key])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return formatted
+
+
 class TarotReaderConnection(BaseConnection):
     def __init__(self, config: Dict[str, Any], connection_manager=None):
         # Don't set connection_manager here, let parent handle it
         super().__init__(config, connection_manager=connection_manager)
+        self._context: Optional[ReadingContext] = None
+        self._context_refreshes = 0
+        self._refresher_lock = threading.Lock()
+        self._refresher_thread: Optional[threading.Thread] = None
+        self._stop_refresher = threading.Event()
+        self._image_jobs: "OrderedDict[str, Future]" = OrderedDict()
+        self._image_jobs_lock = threading.Lock()
 
     @property
     def is_llm_provider(self) -> bool:
@@ -24,7 +162,19 @@ class TarotReaderConnection(BaseConnection):
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Validate TarotReader configuration"""
-        return config  # No specific config needed for now
+        timeouts = config.get("source_timeouts", {})
+        if not isinstance(timeouts, dict):
+            raise ValueError("source_timeouts must be a dictionary")
+        for source, timeout in timeouts.items():
+            if source not in DEFAULT_SOURCE_TIMEOUTS:
+                raise ValueError(f"Unknown data source '{source}'. Must be one of: {', '.join(DEFAULT_SOURCE_TIMEOUTS.keys())}")
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise ValueError(f"Timeout for '{source}' must be a positive number")
+        for field_name in ("context_refresh_interval", "context_max_staleness"):
+            value = config.get(field_name)
+            if value is not None and (not isinstance(value, (int, float)) or value < 0):
+                raise ValueError(f"{field_name} must be a non-negative number of seconds")
+        return config
 
     def register_actions(self) -> None:
         """Register available TarotReader actions"""
@@ -43,6 +193,24 @@ class TarotReaderConnection(BaseConnection):
                 name="get-market-sentiment",
                 parameters=[],
                 description="Get current market sentiment"
+            ),
+            "perform-reading-pipelined": Action(
+                name="perform-reading-pipelined",
+                parameters=[],
+                description="Perform a tarot reading, returning the text right away and an image job to poll"
+            ),
+            "get-reading-image": Action(
+                name="get-reading-image",
+                parameters=[
+                    ActionParameter("job_id", True, str, "Image job id returned by perform-reading-pipelined"),
+                    ActionParameter("wait", False, float, "Seconds to wait for the image if it isn't ready yet")
+                ],
+                description="Get the status and image of a pipelined reading"
+            ),
+            "get-context-status": Action(
+                name="get-context-status",
+                parameters=[],
+                description="Get the age and status of the precomputed reading context"
             )
         }
 
@@ -55,6 +223,219 @@ class TarotReaderConnection(BaseConnection):
         return True
 
 
+    def _source_timeout(self, source: str) -> float:
+        """Get the configured timeout (in seconds) for a data source"""
+        return self.config.get("source_timeouts", {}).get(source, DEFAULT_SOURCE_TIMEOUTS[source])
+
+    async def _fetch_source(self, source: str, fetch, fallback: Any, degraded: List[str]) -> Any:
+        """Await a single data source, degrading to the fallback on timeout or error"""
+        try:
+            return await asyncio.wait_for(fetch(), timeout=self._source_timeout(source))
+        except asyncio.TimeoutError:
+            logger.warning(f"Data source '{source}' timed out, using fallback value")
+        except Exception as e:
+            logger.error(f"Data source '{source}' failed, using fallback value: {e}")
+        degraded.append(source)
+        return fallback
+
+    @staticmethod
+    async def _run_blocking(func, *args, **kwargs) -> Any:
+        """Run a blocking connection call on the fetch executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_fetch_executor, functools.partial(func, *args, **kwargs))
+
+    def _get_llm(self):
+        """Text generation goes through the LLM router when the agent has one, OpenAI otherwise"""
+        return self.connection_manager.connections.get("llm-router") or self.connection_manager.connections["openai"]
+
+    async def _llm_action(self, llm_conn, action_name: str, params: Dict[str, Any]) -> Any:
+        """Run an LLM action without blocking the event loop, natively if the connection is async"""
+        if hasattr(llm_conn, "aperform_action"):
+            return await llm_conn.aperform_action(action_name, params)
+        return await self._run_blocking(llm_conn.perform_action, action_name, params)
+
+    def _get_goat(self):
+        """Get the Goat connection used for balances and CoinGecko prices"""
+        goat = self.connection_manager.connections.get("goat")
+        if not goat:
+            raise KeyError("Goat connection not found")
+        return goat
+
+    async def _fetch_balances(self) -> Dict[str, int]:
+        """Read all bribe token balances, in one multicall when the goat connection supports it"""
+        goat = self._get_goat()
+        names = list(BRIBE_TOKENS.keys())
+        if hasattr(goat, "get_token_balances"):
+            balances = await self._run_blocking(goat.get_token_balances, list(BRIBE_TOKENS.values()), [BRIBE_WALLET])
+            return {name: balances[BRIBE_WALLET][BRIBE_TOKENS[name]] or 0 for name in names}
+
+        results = await asyncio.gather(*[
+            self._run_blocking(
+                goat.perform_action,
+                action_name="get_token_balance",
+                wallet=BRIBE_WALLET,
+                tokenAddress=BRIBE_TOKENS[name]
+            )
+            for name in names
+        ])
+        return dict(zip(names, results))
+
+    async def _fetch_market_data(self) -> Dict[str, Any]:
+        """Get basic price data for SONIC from CoinGecko"""
+        goat = self._get_goat()
+        raw_market_data = await self._run_blocking(
+            goat.perform_action,
+            "get_coin_price",
+            coin_id="sonic-3",
+            vs_currency="usd",
+            include_market_cap=True,
+            include_24hr_vol=True,
+            include_24hr_change=True,
+            include_last_updated_at=True
+        )
+        logger.debug(f"market data: {raw_market_data}")
+        market_data = raw_market_data.get('sonic-3', {})
+
+        # Format market data with actual values
+        return {
+            "price": market_data.get("usd", 0.0),
+            "price_change": market_data.get("usd_24h_change", 0),
+            "market_cap": market_data.get("usd_market_cap", 0),
+            "volume": market_data.get("usd_24h_vol", 0)
+        }
+
+    async def _fetch_allora_prediction(self) -> Dict[str, Any]:
+        """Get Allora's price prediction (topic 2)"""
+        allora_conn = self.connection_manager.connections.get("allora")
+        if not allora_conn:
+            raise KeyError("Allora connection not found")
+        return await allora_conn.perform_action("get-inference", {"topic_id": 2})
+
+    async def _gather_reading_inputs(self) -> ReadingInputs:
+        """
+        Fetch balances, market data and the Allora inference concurrently.
+
+        Each source gets its own timeout (see ``source_timeouts`` in the config), so a
+        slow source degrades to a fallback value instead of holding up the others.
+        """
+        degraded: List[str] = []
+        balances, market_data, allora_prediction = await asyncio.gather(
+            self._fetch_source(
+                "balances", self._fetch_balances,
+                {name: 0 for name in BRIBE_TOKENS}, degraded
+            ),
+            self._fetch_source(
+                "market", self._fetch_market_data,
+                dict(EMPTY_MARKET_DATA), degraded
+            ),
+            self._fetch_source(
+                "allora", self._fetch_allora_prediction,
+                {"inference": NO_DATA}, degraded
+            )
+        )
+        if degraded:
+            logger.warning(f"Reading inputs degraded for: {', '.join(degraded)}")
+        return ReadingInputs(
+            balances=balances,
+            market_data=market_data,
+            allora_prediction=allora_prediction,
+            degraded=degraded
+        )
+
+    def _build_reading_context(self, inputs: ReadingInputs) -> ReadingContext:
+        """Turn raw reading inputs into the weights and numbers a reading prompt uses"""
+        amounts = {
+            name: inputs.balances[name] / (10 ** BRIBE_TOKEN_DECIMALS[name])
+            for name in BRIBE_TOKENS
+        }
+        total_amount = sum(amounts.values())
+        if not total_amount:
+            # No balances (e.g. the balance source degraded), weigh every bribe equally
+            amounts = {name: 1 for name in BRIBE_TOKENS}
+            total_amount = len(amounts)
+
+        weights = {name: (amount / total_amount) * 100 for name, amount in amounts.items()}
+        logger.info(
+            "Bribe weights: " +
+            ", ".join(f"{name.upper()}: {weight:.2f}% (raw {inputs.balances[name]})" for name, weight in weights.items())
+        )
+
+        return ReadingContext(
+            weights=MappingProxyType(weights),
+            weight_descriptions=MappingProxyType(
+                {name: get_weight_description(weight) for name, weight in weights.items()}
+            ),
+            market_data=MappingProxyType(_format_market_data(inputs.market_data)),
+            allora_inference=inputs.allora_prediction.get("inference", NO_DATA),
+            degraded=tuple(inputs.degraded),
+            created_at=time.time()
+        )
+
+    def _context_refresh_interval(self) -> float:
+        return self.config.get("context_refresh_interval", DEFAULT_CONTEXT_REFRESH_INTERVAL)
+
+    def _context_max_staleness(self) -> float:
+        return self.config.get("context_max_staleness", DEFAULT_CONTEXT_MAX_STALENESS)
+
+    async def _refresh_context(self) -> ReadingContext:
+        """Fetch fresh inputs and publish a new context snapshot"""
+        context = self._build_reading_context(await self._gather_reading_inputs())
+        self._context = context
+        self._context_refreshes += 1
+        return context
+
+    def _run_refresher(self) -> None:
+        """Refresh the reading context every interval until stopped"""
+        interval = self._context_refresh_interval()
+        while not self._stop_refresher.wait(interval):
+            try:
+                run_coroutine(self._refresh_context())
+            except Exception as e:
+                logger.error(f"Failed to refresh reading context: {e}")
+
+    def _ensure_refresher(self) -> None:
+        """Start the background refresher once, if enabled"""
+        if not self._context_refresh_interval():
+            return
+        with self._refresher_lock:
+            if self._refresher_thread and self._refresher_thread.is_alive():
+                return
+            self._stop_refresher.clear()
+            self._refresher_thread = threading.Thread(
+                target=self._run_refresher, name="tarot-context-refresher", daemon=True
+            )
+            self._refresher_thread.start()
+
+    def stop_refresher(self) -> None:
+        """Stop the background refresher"""
+        self._stop_refresher.set()
+
+    async def _get_reading_context(self) -> ReadingContext:
+        """Get the current snapshot, rebuilding it inline only if it is missing or too stale"""
+        self._ensure_refresher()
+        context = self._context
+        if context is not None and context.age() <= self._context_max_staleness():
+            return context
+
+        logger.info("Reading context missing or stale, refreshing inline")
+        return await self._refresh_context()
+
+    async def get_context_status(self) -> Dict[str, Any]:
+        """Report the age and content summary of the current reading context"""
+        context = self._context
+        max_staleness = self._context_max_staleness()
+        return {
+            "available": context is not None,
+            "age_seconds": round(context.age(), 2) if context else None,
+            "stale": context is None or context.age() > max_staleness,
+            "refresh_interval": self._context_refresh_interval(),
+            "max_staleness": max_staleness,
+            "refresher_running": bool(self._refresher_thread and self._refresher_thread.is_alive()),
+            "refreshes": self._context_refreshes,
+            "degraded": list(context.degraded) if context else [],
+            "weights": dict(context.weight_descriptions) if context else {}
+        }
+
     def _analyze_market_data(self, market_data: Dict[str, Any], network_stats: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze market data and network stats to generate base reading"""
         sentiment = "neutral"
@@ -186,8 +567,102 @@ class TarotReaderConnection(BaseConnection):
 
     #     return None
 
-    async def perform_reading(self) -> Dict[str, Any]:
-        """Process market data and network stats into a reading format"""
+    def _generate_reading_image(self, llm_conn, openai_conn, system_prompt: str,
+                                mystical_reading: str) -> Tuple[str, Optional[str]]:
+        """Rewrite a reading into a DALL-E prompt and generate its image, returns (prompt, image_url)"""
+        dalle_friendly_prompt = mystical_reading
+        try:
+            dalle_friendly_prompt = llm_conn.perform_action("generate-text", {
+                "prompt": DALLE_PROMPT_TEMPLATE.format(mystical_reading=mystical_reading),
+                "system_prompt": system_prompt
+            })
+        except Exception as e:
+            logger.error(f"Failed to generate dall-e friendly prompt reading: {e}")
+
+        logger.info("dall-e will read this: " + dalle_friendly_prompt)
+
+        image_url = None
+        try:
+            image_url = openai_conn.perform_action("generate-image", {
+                "prompt": dalle_friendly_prompt[:999]
+            })
+        except Exception as e:
+            logger.error(f"Failed to generate mystical image: {e}")
+        logger.info(image_url)
+        return dalle_friendly_prompt, image_url
+
+    def _start_image_job(self, llm_conn, openai_conn, system_prompt: str, mystical_reading: str,
+                         on_image: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
+        """
+        Generate the image for a reading in the background.
+
+        Returns a job id for get_reading_image. If on_image is given it is called with
+        (job_id, result) once the job finishes, from the worker thread.
+        """
+        job_id = uuid.uuid4().hex
+        future = _image_executor.submit(
+            self._generate_reading_image, llm_conn, openai_conn, system_prompt, mystical_reading
+        )
+
+        with self._image_jobs_lock:
+            self._image_jobs[job_id] = future
+            while len(self._image_jobs) > MAX_IMAGE_JOBS:
+                oldest_done = next((key for key, job in self._image_jobs.items() if job.done()), None)
+                if oldest_done is None:
+                    break
+                del self._image_jobs[oldest_done]
+
+        if on_image:
+            def deliver(finished: Future) -> None:
+                try:
+                    on_image(job_id, self._image_job_result(job_id, finished))
+                except Exception as e:
+                    logger.error(f"Image callback for job {job_id} failed: {e}")
+            future.add_done_callback(deliver)
+
+        return job_id
+
+    @staticmethod
+    def _image_job_result(job_id: str, future: Future) -> Dict[str, Any]:
+        """Describe the state of an image job"""
+        if not future.done():
+            return {"job_id": job_id, "status": "pending"}
+
+        dalle_friendly_prompt, image_url = future.result()
+        if not image_url:
+            return {"job_id": job_id, "status": "failed", "reading_short": dalle_friendly_prompt}
+        return {
+            "job_id": job_id,
+            "status": "done",
+            "image_url": image_url,
+            "reading_short": dalle_friendly_prompt
+        }
+
+    async def get_reading_image(self, job_id: str, wait: float = 0) -> Dict[str, Any]:
+        """Get the image of a pipelined reading, optionally waiting up to `wait` seconds for it"""
+        with self._image_jobs_lock:
+            future = self._image_jobs.get(job_id)
+        if future is None:
+            raise KeyError(f"Unknown image job: {job_id}")
+
+        deadline = time.monotonic() + (wait or 0)
+        while not future.done() and time.monotonic() < deadline:
+            await asyncio.sleep(0.25)
+        return self._image_job_result(job_id, future)
+
+    async def perform_reading_pipelined(self) -> Dict[str, Any]:
+        """Perform a reading, returning the text as soon as it's ready and the image as a job"""
+        return await self.perform_reading(pipeline=True)
+
+    async def perform_reading(self, pipeline: bool = False,
+                              on_image: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Process market data and network stats into a reading format
+
+        With pipeline=True the text reading is returned as soon as it is generated, together
+        with an image_job_id; the DALL-E prompt and image are produced in the background and
+        delivered through get_reading_image or the on_image callback.
+        """
         # defi_json = await self.fetch_defillama_json("https://defillama.com/chain/sonic")
         # print(defi_json)
 
@@ -203,152 +678,30 @@ class TarotReaderConnection(BaseConnection):
             logger.info(f"Connection manager status: {self.connection_manager is not None}")
             logger.info(f"Available connections: {list(self.connection_manager.connections.keys())}")
 
-            logger.info("Looking for Goat connection with CoinGecko plugin...")
-            goat = self.connection_manager.connections.get("goat")
-            if not goat:
-                logger.error("Goat connection not found")
-                return None
-
-
-            logger.info("Reading balances")
-            usdceBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0x29219dd400f2Bf60E5a23d13Be72B486D4038894"
-            )
-            shadowBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0x3333b97138D4b086720b5aE8A7844b1345a33333"
-            )
-            beetsBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0x2D0E0814E62D80056181F5cd932274405966e4f0"
-            )
-            relicBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0xf2968631d02330dc5e420373f083b7b4f8b24e17"
-            )
-
-            logger.info("Done reading balances")
-
-            def get_weight_description(weight: float) -> str:
-                if weight < 5:
-                    return "no influence"
-                elif weight < 25:
-                    return "little influence"
-                elif weight < 50:
-                    return "some influence"
-                elif weight < 90:
-                    return "lots of influence"
-                else:
-                    return "total influence"
-
-            decimals = {
-                "usdce": 6,
-                "shadow": 18,
-                "beets": 18,
-                "relic": 18
-            }
-
-            usdce_balance = usdceBalanceResponse
-            shadow_balance = shadowBalanceResponse
-            beets_balance = beetsBalanceResponse
-            relic_balance = relicBalanceResponse
-
-            usdce_eth_amount = usdce_balance / (10 ** decimals["usdce"])
-            shadow_eth_amount = shadow_balance / (10 ** decimals["shadow"])
-            beets_eth_amount = beets_balance / (10 ** decimals["beets"])
-            relic_eth_amount = relic_balance / (10 ** decimals["relic"])
-
-            total_amount = usdce_eth_amount + shadow_eth_amount + beets_eth_amount + relic_eth_amount
-            logger.info(f"""
-            Raw balances:
-            USDC-e ({decimals['usdce']} decimals): {usdce_balance}
-            SHADOW ({decimals['shadow']} decimals): {shadow_balance}
-            BEETS ({decimals['beets']} decimals): {beets_balance}
-            RELIC ({decimals['relic']} decimals): {relic_balance}
-
-            Normalized amounts:
-            USDC-e: {usdce_eth_amount}
-            SHADOW: {shadow_eth_amount}
-            BEETS: {beets_eth_amount}
-            RELIC: {relic_eth_amount}
-
-            Total amount: {total_amount}
-            """)
-
-            usdce_weight = (usdce_eth_amount / total_amount) * 100
-            shadow_weight = (shadow_eth_amount / total_amount) * 100
-            beets_weight = (beets_eth_amount / total_amount) * 100
-            relic_weight = (relic_eth_amount / total_amount) * 100
-
-            logger.info(f"""
-            Calculated weights:
-            USDC-e: {usdce_weight:.2f}%
-            SHADOW: {shadow_weight:.2f}%
-            BEETS: {beets_weight:.2f}%
-            RELIC: {relic_weight:.2f}%
-            """)
-            usdce_weight = (usdce_eth_amount / total_amount) * 100
-            shadow_weight = (shadow_eth_amount / total_amount) * 100
-            beets_weight = (beets_eth_amount / total_amount) * 100
-            relic_weight = (relic_eth_amount / total_amount) * 100
-
-            usdce_weight_description = get_weight_description(usdce_weight)
-            shadow_weight_description = get_weight_description(shadow_weight)
-            beets_weight_description = get_weight_description(beets_weight)
-            relic_weight_description = get_weight_description(relic_weight)
-
-            print("USDCe:", usdce_weight_description)
-            print("SHADOW:", shadow_weight_description)
-            print("BEETS:", beets_weight_description)
-            print("RELIC:", relic_weight_description)
+            # Everything fetched from chain and market APIs comes from the precomputed snapshot
+            context = await self._get_reading_context()
+            logger.info(f"Using reading context from {context.age():.1f}s ago")
+            usdce_weight = context.weights["usdce"]
+            shadow_weight = context.weights["shadow"]
+            beets_weight = context.weights["beets"]
+            relic_weight = context.weights["relic"]
 
             # try to get defillama data
             raw_defillama_data = "" # goat.perform_action("get_chain_volume", chain ="sonic")
             clean_defillama_data = "" #self.defillama_result_to_prompt(raw_defillama_data)
             logger.info(clean_defillama_data)
-
-            # Get basic price data for SONIC
-            try:
-                raw_market_data = goat.perform_action("get_coin_price",
-                    coin_id= "sonic-3",
-                    vs_currency= "usd",
-                    include_market_cap= True,
-                    include_24hr_vol= True,
-                    include_24hr_change= True,
-                    include_last_updated_at= True
-                )
-                print("market data: ", str(raw_market_data))
-                market_data = raw_market_data.get('sonic-3', {})
-                    
-                # Format market data with actual values
-                formatted_market_data = {
-                    "price": market_data.get("usd", 0.0),
-                    "price_change": market_data.get("usd_24h_change", 0),
-                    "market_cap": market_data.get("usd_market_cap", 0),
-                    "volume": market_data.get("usd_24h_vol", 0)
-                }
-                    
-                logger.info(f"Retrieved market data: {formatted_market_data}")
-            except Exception as e:
-                logger.error(f"Failed to fetch market data: {e}")
-                formatted_market_data = {
-                    "price": 0.0,
-                    "price_change": 0.0,
-                    "market_cap": 0,
-                    "volume": 0
-                }
             
             if stop_before_openai:
                 logger.info("Stopping before openai...")
                 return
 
             # Get mystical interpretation
-            logger.info("Getting OpenAI connection for mystical interpretation...")
+            logger.info("Getting LLM connections for mystical interpretation...")
             openai_conn = self.connection_manager.connections.get("openai")
             if not openai_conn:
                 logger.error("OpenAI connection not found")
                 return "The mystical forces are weak today... Try again when the connections align."
+            llm_conn = self._get_llm()
 
             system_prompt = (
                 "You are a mystical Tarot Reader who interprets blockchain omens.\n"
@@ -366,26 +719,10 @@ class TarotReaderConnection(BaseConnection):
 
             tweet_character_limit = "This is going to be on a tweet, keep it under 270 characters!!!! REALLY!!! and make it count!."
             tweet_character_limit_active = True
-            sonic_price_in_usd = formatted_market_data["price"]
-            sonic_price_change = formatted_market_data["price_change"]
-            sonic_market_cap_usd = formatted_market_data["market_cap"]
-            sonic_volume_usd = formatted_market_data["volume"]
-            try:
-                sonic_price_in_usd = round(float(formatted_market_data["price"]), 2)
-            except:
-                pass
-            try:
-                sonic_price_change = round(float(formatted_market_data["price_change"]), 2)
-            except:
-                pass
-            try:
-                sonic_market_cap_usd = int(formatted_market_data["market_cap"])
-            except:
-                pass
-            try:
-                sonic_volume_usd = int(formatted_market_data["volume"])
-            except:
-                pass
+            sonic_price_in_usd = context.market_data["price"]
+            sonic_price_change = context.market_data["price_change"]
+            sonic_market_cap_usd = context.market_data["market_cap"]
+            sonic_volume_usd = context.market_data["volume"]
             top_10_protocols_on_defillama = clean_defillama_data
             debridge_data = " { there's currently no data, sorry! }"
             allora_btc_price_prediction = " { there's currently no data, sorry! }"
@@ -466,8 +803,7 @@ class TarotReaderConnection(BaseConnection):
             # else:
             #     winner_bribe = usdc_e_prompt  # Fallback if no clear winner
 
-            allora_conn = self.connection_manager.connections.get("allora")
-            allora_price_prediction = await allora_conn.perform_action("get-inference", {"topic_id": 2,})
+            allora_price_prediction = {"inference": context.allora_inference}
             prompt = f"""
 # Sonic Chain Cartomancer Tarot Reading Prompt
 
@@ -522,8 +858,7 @@ Channel the spirit of medieval lore and sprinkle your insights with emojis.
             mystical_reading = "The mystical forces are clouded..."
 
             try:
-                # Use synchronous generate_text instead
-                mystical_reading = openai_conn.perform_action("generate-text", {
+                mystical_reading = await self._llm_action(llm_conn, "generate-text", {
                     "prompt": prompt,
                     "system_prompt": system_prompt
                 })
@@ -532,40 +867,21 @@ Channel the spirit of medieval lore and sprinkle your insights with emojis.
                 mystical_reading = "The mystical forces are silent today..."
             logger.info(mystical_reading)
 
-            dalle_friendly_prompt = mystical_reading
-            try:
-                # Use synchronous generate_text instead
-                dalle_friendly_prompt_content = f"""
-You will enhance the following text to create a DALL-E prompt:
-* A tarot card illustration in a Rider-Waite style, featuring [describe the central figure], symbolizing [the underlying concept]. The figure is adorned in [describe attire and accessories] and [include additional distinctive features]. The card incorporates [describe key elements or objects], set against a background that is [describe the environment], evoking [a specific mood or atmosphere]. The illustration should be hand-drawn with bold black outlines, vibrant flat colors, and subtle shading for depth, staying true to the timeless tarot aesthetic. *
-Using the mystical reading provided below, add a detailed character description. Include negative parameters to ensure no text appears in the image and that only one card is depicted.
-Below is the mystical reading (for reference only; do not include it in your output):
-{ mystical_reading }
-                """
-#                 dalle_friendly_prompt_content = f"""
-# You will improve this text in order to create a dall-e prompt
-# * A tarot card illustration in the Rider-Waite style, featuring a [add something here ], symbolizing [add something here ]. The figure wears [ add something here ], and [ add something here ]. A [add something here ]. The background is [add something here ], evoking [add something here ]. The illustration is hand-drawn with bold black outlines, vibrant flat colors, and subtle shading to create depth,  staying true to the classic tarot aesthetic *
-# You will add a character description based on the following
-# Add negative parameters to including text in the image, and we want only one card
-# Below is the mystical reading, you'll fill in the blanks with the mystical reading, but you will not include the text below in your output.
-# { mystical_reading }
-#                 """
-                dalle_friendly_prompt = openai_conn.perform_action("generate-text", { "prompt": dalle_friendly_prompt_content, "system_prompt": system_prompt })
-            except Exception as e:
-                logger.error(f"Failed to generate dall-e friendly prompt reading: {e}")
-
-            logger.info("dall-e will read this: " + dalle_friendly_prompt)
+            if pipeline:
+                # Hand the text back now, the image prompt and image follow in the background
+                return {
+                    "reading_long": mystical_reading,
+                    "prompt": prompt,
+                    "image_job_id": self._start_image_job(
+                        llm_conn, openai_conn, system_prompt, mystical_reading, on_image
+                    )
+                }
 
-            image_url = None
-            try:
-                # Use synchronous generate_text instead
-                image_url = openai_conn.perform_action("generate-image", {
-                    "prompt": dalle_friendly_prompt[:999]
-                })
-            except Exception as e:
-                logger.error(f"Failed to generate mystical image: {e}")
+            dalle_friendly_prompt, image_url = await self._run_blocking(
+                self._generate_reading_image, llm_conn, openai_conn, system_prompt, mystical_reading
+            )
+            if not image_url:
                 mystical_reading = "The mystical forces are silent today..."
-            logger.info(image_url)
             
             if stop_before_tweet:
                 logger.info("Stopping before tweet...")
@@ -577,22 +893,9 @@ Below is the mystical reading (for reference only; do not include it in your out
                 }
             
             if image_url:
-                # Define the base and images folder paths
-                base_path = os.getcwd()  # This is the project's base path
-                images_folder = os.path.join(base_path, "images")
-                os.makedirs(images_folder, exist_ok=True)
-                
-                # Define the image file name and complete path
-                image_filename = "generated_image.jpg"
-                image_path = os.path.join(images_folder, image_filename)
-
-                # Download the image using requests
+                # Download the image once into the content-addressed image store
                 try:
-                    response = requests.get(image_url)
-                    response.raise_for_status()  # Check for HTTP errors
-                    with open(image_path, "wb") as f:
-                        f.write(response.content)
-                    logger.info(f"Image successfully downloaded to {image_path}")
+                    image_path = await self._run_blocking(image_store.fetch, image_url)
                 except Exception as e:
                     logger.error(f"Error downloading image: {e}")
                     image_path = None
@@ -625,10 +928,32 @@ Below is the mystical reading (for reference only; do not include it in your out
             logger.error(f"Failed to perform reading: {str(e)}")
             return "The cards are unclear... Try again when the stars align."
 
+    async def _prepare_tweet_media(self, llm_conn, openai_conn, system_prompt: str,
+                                   mystical_reading: str) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+        """Generate a reading's image, store it and upload it to Twitter, returns (prompt, image_url, image_path, media_id)"""
+        dalle_friendly_prompt, image_url = await self._run_blocking(
+            self._generate_reading_image, llm_conn, openai_conn, system_prompt, mystical_reading
+        )
+        image_path = media_id = None
+        if image_url:
+            # Download the image once into the content-addressed image store
+            try:
+                image_path = await self._run_blocking(image_store.fetch, image_url)
+            except Exception as e:
+                logger.error(f"Error downloading image: {e}")
+
+        twitter_conn = self.connection_manager.connections.get("twitter")
+        # A queued tweet has its media uploaded by the outbox shortly before its slot
+        if image_path and twitter_conn and self.connection_manager.outbox is None:
+            try:
+                media_id = await self._run_blocking(twitter_conn.upload_media, image_path)
+            except Exception as e:
+                logger.warning(f"Early media upload failed, the tweet will upload it again: {e}")
+        return dalle_friendly_prompt, image_url, image_path, media_id
+
     async def perform_reading_twitter(self) -> Dict[str, Any]:
         """Process market data and network stats into a twitter format"""
         stop_before_openai = False
-        stop_before_tweet = False
         try:
             logger.info("Starting tarot reading process...")
     
@@ -639,147 +964,30 @@ Below is the mystical reading (for reference only; do not include it in your out
             logger.info(f"Connection manager status: {self.connection_manager is not None}")
             logger.info(f"Available connections: {list(self.connection_manager.connections.keys())}")
 
-            logger.info("Looking for Goat connection with CoinGecko plugin...")
-            goat = self.connection_manager.connections.get("goat")
-            if not goat:
-                logger.error("Goat connection not found")
-                return None
-
-
-            logger.info("Reading balances")
-            usdceBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0x29219dd400f2Bf60E5a23d13Be72B486D4038894"
-            )
-            shadowBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0x3333b97138D4b086720b5aE8A7844b1345a33333"
-            )
-            beetsBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0x2D0E0814E62D80056181F5cd932274405966e4f0"
-            )
-
-            relicBalanceResponse = goat.perform_action(action_name="get_token_balance",
-                wallet= "0x2c4a44a1a45e059b685fe49ee63023d9c7f770cf",
-                tokenAddress= "0xf2968631d02330dc5e420373f083b7b4f8b24e17"
-            )
-            logger.info("Done reading balances")
-
-            def get_weight_description(weight: float) -> str:
-                if weight < 5:
-                    return "no influence"
-                elif weight < 25:
-                    return "little influence"
-                elif weight < 50:
-                    return "some influence"
-                elif weight < 90:
-                    return "lots of influence"
-                else:
-                    return "total influence"
-
-            decimals = {
-                "usdce": 6,
-                "shadow": 18,
-                "beets": 18,
-                "relic": 18
-            }
-
-            usdce_balance = usdceBalanceResponse
-            shadow_balance = shadowBalanceResponse
-            beets_balance = beetsBalanceResponse
-            relic_balance = relicBalanceResponse
-
-            usdce_eth_amount = usdce_balance / (10 ** decimals["usdce"])
-            shadow_eth_amount = shadow_balance / (10 ** decimals["shadow"])
-            beets_eth_amount = beets_balance / (10 ** decimals["beets"])
-            relic_eth_amount = relic_balance / (10 ** decimals["relic"])
-
-            total_amount = usdce_eth_amount + shadow_eth_amount + beets_eth_amount + relic_eth_amount
-            logger.info(f"""
-            Raw balances:
-            USDC-e ({decimals['usdce']} decimals): {usdce_balance}
-            SHADOW ({decimals['shadow']} decimals): {shadow_balance}
-            BEETS ({decimals['beets']} decimals): {beets_balance}
-            RELIC ({decimals['relic']} decimals): {relic_balance}
-
-            Normalized amounts:
-            USDC-e: {usdce_eth_amount}
-            SHADOW: {shadow_eth_amount}
-            BEETS: {beets_eth_amount}
-            RELIC: {relic_eth_amount}
-
-            Total amount: {total_amount}
-            """)
-
-            usdce_weight = (usdce_eth_amount / total_amount) * 100
-            shadow_weight = (shadow_eth_amount / total_amount) * 100
-            beets_weight = (beets_eth_amount / total_amount) * 100
-            relic_weight = (relic_eth_amount / total_amount) * 100
-
-            logger.info(f"""
-            Calculated weights:
-            USDC-e: {usdce_weight:.2f}%
-            SHADOW: {shadow_weight:.2f}%
-            BEETS: {beets_weight:.2f}%
-            RELIC: {relic_weight:.2f}%
-            """)
-            usdce_weight_description = get_weight_description(usdce_weight)
-            shadow_weight_description = get_weight_description(shadow_weight)
-            beets_weight_description = get_weight_description(beets_weight)
-            relic_weight_description = get_weight_description(relic_weight)
-
-            print("USDCe:", usdce_weight_description)
-            print("SHADOW:", shadow_weight_description)
-            print("BEETS:", beets_weight_description)
-            print("RELIC:", relic_weight_description)
+            # Everything fetched from chain and market APIs comes from the precomputed snapshot
+            context = await self._get_reading_context()
+            logger.info(f"Using reading context from {context.age():.1f}s ago")
+            usdce_weight = context.weights["usdce"]
+            shadow_weight = context.weights["shadow"]
+            beets_weight = context.weights["beets"]
+            relic_weight = context.weights["relic"]
 
             # try to get defillama data
             raw_defillama_data = "" # goat.perform_action("get_chain_volume", chain ="sonic")
             clean_defillama_data = "" #self.defillama_result_to_prompt(raw_defillama_data)
             logger.info(clean_defillama_data)
-
-            # Get basic price data for SONIC
-            try:
-                raw_market_data = goat.perform_action("get_coin_price",
-                    coin_id= "sonic-3",
-                    vs_currency= "usd",
-                    include_market_cap= True,
-                    include_24hr_vol= True,
-                    include_24hr_change= True,
-                    include_last_updated_at= True
-                )
-                print("market data: ", str(raw_market_data))
-                market_data = raw_market_data.get('sonic-3', {})
-                    
-                # Format market data with actual values
-                formatted_market_data = {
-                    "price": market_data.get("usd", 0.0),
-                    "price_change": market_data.get("usd_24h_change", 0),
-                    "market_cap": market_data.get("usd_market_cap", 0),
-                    "volume": market_data.get("usd_24h_vol", 0)
-                }
-                    
-                logger.info(f"Retrieved market data: {formatted_market_data}")
-            except Exception as e:
-                logger.error(f"Failed to fetch market data: {e}")
-                formatted_market_data = {
-                    "price": 0.0,
-                    "price_change": 0.0,
-                    "market_cap": 0,
-                    "volume": 0
-                }
             
             if stop_before_openai:
                 logger.info("Stopping before openai...")
                 return
 
             # Get mystical interpretation
-            logger.info("Getting OpenAI connection for mystical interpretation...")
+            logger.info("Getting LLM connections for mystical interpretation...")
             openai_conn = self.connection_manager.connections.get("openai")
             if not openai_conn:
                 logger.error("OpenAI connection not found")
                 return "The mystical forces are weak today... Try again when the connections align."
+            llm_conn = self._get_llm()
 
             system_prompt = (
                 "You are a mystical Tarot Reader who interprets blockchain omens.\n"
@@ -795,26 +1003,10 @@ Below is the mystical reading (for reference only; do not include it in your out
             # Channel the mystical forces to interpret these blockchain omens.
             # """
 
-            sonic_price_in_usd = formatted_market_data["price"]
-            sonic_price_change = formatted_market_data["price_change"]
-            sonic_market_cap_usd = formatted_market_data["market_cap"]
-            sonic_volume_usd = formatted_market_data["volume"]
-            try:
-                sonic_price_in_usd = round(float(formatted_market_data["price"]), 2)
-            except:
-                pass
-            try:
-                sonic_price_change = round(float(formatted_market_data["price_change"]), 2)
-            except:
-                pass
-            try:
-                sonic_market_cap_usd = int(formatted_market_data["market_cap"])
-            except:
-                pass
-            try:
-                sonic_volume_usd = int(formatted_market_data["volume"])
-            except:
-                pass
+            sonic_price_in_usd = context.market_data["price"]
+            sonic_price_change = context.market_data["price_change"]
+            sonic_market_cap_usd = context.market_data["market_cap"]
+            sonic_volume_usd = context.market_data["volume"]
             top_10_protocols_on_defillama = clean_defillama_data
 
             usdc_e_prompt = f"""
@@ -890,8 +1082,7 @@ Below is the mystical reading (for reference only; do not include it in your out
             # else:
             #     winner_bribe = usdc_e_prompt  # Fallback if no clear winner
 
-            allora_conn = self.connection_manager.connections.get("allora")
-            allora_price_prediction = await allora_conn.perform_action("get-inference", {"topic_id": 2,})
+            allora_price_prediction = {"inference": context.allora_inference}
             prompt = f"""
 # Sonic Chain Cartomancer Tarot Reading Prompt
 
@@ -948,8 +1139,7 @@ Channel the spirit of medieval lore and sprinkle your insights with emojis.
             mystical_reading = "The mystical forces are clouded..."
 
             try:
-                # Use synchronous generate_text instead
-                mystical_reading = openai_conn.perform_action("generate-text", {
+                mystical_reading = await self._llm_action(llm_conn, "generate-text", {
                     "prompt": prompt,
                     "system_prompt": system_prompt
                 })
@@ -991,61 +1181,14 @@ Channel the spirit of medieval lore and sprinkle your insights with emojis.
                 logger.error(f"Failed to generate mystical reading: {e}")
                 twitter_final_content = mystical_reading
             logger.info(twitter_final_content)
-            dalle_friendly_prompt = mystical_reading
-            try:
-                # Use synchronous generate_text instead
-                dalle_friendly_prompt_content = f"""
-You will enhance the following text to create a DALL-E prompt:
-* A tarot card illustration in a Rider-Waite style, featuring [describe the central figure], symbolizing [the underlying concept]. The figure is adorned in [describe attire and accessories] and [include additional distinctive features]. The card incorporates [describe key elements or objects], set against a background that is [describe the environment], evoking [a specific mood or atmosphere]. The illustration should be hand-drawn with bold black outlines, vibrant flat colors, and subtle shading for depth, staying true to the timeless tarot aesthetic. *
-Using the mystical reading provided below, add a detailed character description. Include negative parameters to ensure no text appears in the image and that only one card is depicted.
-Below is the mystical reading (for reference only; do not include it in your output):
-{ mystical_reading }
-                """
-                dalle_friendly_prompt = openai_conn.perform_action("generate-text", { "prompt": dalle_friendly_prompt_content, "system_prompt": system_prompt })
-            except Exception as e:
-                logger.error(f"Failed to generate dall-e friendly prompt reading: {e}")
-
-            logger.info("dall-e will read this: " + dalle_friendly_prompt)
-            image_url = None
-            try:
-                # Use synchronous generate_text instead
-                image_url = openai_conn.perform_action("generate-image", {
-                    "prompt": dalle_friendly_prompt[:999]
-                })
-            except Exception as e:
-                logger.error(f"Failed to generate mystical image: {e}")
+            # The image prompt is written from the reading, so its media is prepared once the text exists
+            dalle_friendly_prompt, image_url, image_path, media_id = await self._prepare_tweet_media(
+                llm_conn, openai_conn, system_prompt, mystical_reading
+            )
+            if not image_url:
                 mystical_reading = "The mystical forces are silent today..."
-            logger.info(image_url)
-            
-            if False and stop_before_tweet:
-                logger.info("Stopping before tweet...")
-                return {
-                    "image_url": image_url,
-                    "reading_long": mystical_reading,
-                    "reading_short": dalle_friendly_prompt,
-                    "prompt": prompt
-                }
             
             if image_url:
-                # Define the base and images folder paths
-                base_path = os.getcwd()  # This is the project's base path
-                images_folder = os.path.join(base_path, "images")
-                os.makedirs(images_folder, exist_ok=True)
-                
-                # Define the image file name and complete path
-                image_filename = "generated_image.jpg"
-                image_path = os.path.join(images_folder, image_filename)
-
-                # Download the image using requests
-                try:
-                    response = requests.get(image_url)
-                    response.raise_for_status()  # Check for HTTP errors
-                    with open(image_path, "wb") as f:
-                        f.write(response.content)
-                    logger.info(f"Image successfully downloaded to {image_path}")
-                except Exception as e:
-                    logger.error(f"Error downloading image: {e}")
-                    image_path = None
                 # If the image was downloaded, tweet it using the post_tweet_with_image action
                 if image_path:
                     try:
@@ -1055,12 +1198,24 @@ Below is the mystical reading (for reference only; do not include it in your out
                             # list connections:
                             logger.info(f"Available connections: {list(self.connection_manager.connections.keys())}")
                             return None
-                        # twitter_conn is assumed to be your TwitterConnection instance
-                        tweet_response = twitter_conn.post_tweet_with_image(
-                            message=twitter_final_content,
-                            image_path=image_path
-                        )
-                        logger.info(f"Tweet with image posted successfully: {tweet_response}")
+                        outbox = self.connection_manager.outbox
+                        if outbox:
+                            # Check the length now, a tweet rejected at its slot can't be regenerated
+                            twitter_conn.validate_tweet_text(twitter_final_content)
+                            post_id = await self._run_blocking(
+                                outbox.enqueue, "twitter", "post-tweet-with-image",
+                                {"message": twitter_final_content, "image_path": image_path, "image_url": image_url}
+                            )
+                            logger.info(f"Tweet with image queued as post {post_id}")
+                        else:
+                            # Reuses the media uploaded with the image, uploads again if that failed
+                            tweet_response = await self._run_blocking(
+                                twitter_conn.post_tweet_with_image,
+                                message=twitter_final_content,
+                                image_path=image_path,
+                                media_id=media_id
+                            )
+                            logger.info(f"Tweet with image posted successfully: {tweet_response}")
                     except Exception as e:
                         # throw an error since we have to try again
                         raise e
@@ -1072,7 +1227,12 @@ Below is the mystical reading (for reference only; do not include it in your out
                     if twitter_conn and twitter_conn.is_configured():
                         tweet_text = mystical_reading
                         # tweet_text = f"🔮 Sonic Network Reading:\n{mystical_reading[:200]}..."  # Truncate if needed
-                        twitter_conn.post_tweet(tweet_text)
+                        outbox = self.connection_manager.outbox
+                        if outbox:
+                            twitter_conn.validate_tweet_text(tweet_text)
+                            await self._run_blocking(outbox.enqueue, "twitter", "post-tweet", {"message": tweet_text})
+                        else:
+                            await self._run_blocking(twitter_conn.post_tweet, tweet_text)
                         logger.info("Successfully posted to Twitter")
                 except Exception as e:
                     logger.warning(f"Twitter posting failed (this is okay): {e}")
@@ -1324,6 +1484,11 @@ Below is the mystical reading (for reference only; do not include it in your out
         if action_name not in self.actions:
             raise KeyError(f"Unknown action: {action_name}")
 
+        action = self.actions[action_name]
+        errors = action.validate_params(kwargs)
+        if errors:
+            raise ValueError(f"Invalid parameters: {', '.join(errors)}")
+
         method_name = action_name.replace('-', '_')
         method = getattr(self, method_name)
         if method_name == "perform_reading":
@@ -1332,3 +1497,9 @@ Below is the mystical reading (for reference only; do not include it in your out
             return await self.perform_reading_twitter()
         elif method_name == "get_market_sentiment":
             return await self.get_market_sentiment()
+        elif method_name == "perform_reading_pipelined":
+            return await self.perform_reading_pipelined()
+        elif method_name == "get_reading_image":
+            return await self.get_reading_image(**kwargs)
+        elif method_name == "get_context_status":
+            return await self.get_context_status()
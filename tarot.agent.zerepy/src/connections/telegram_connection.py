@@ -1,10 +1,21 @@
 import os
+import asyncio
+import hmac
+import json
 import logging
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from dotenv import set_key, load_dotenv
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Deque, Dict, Any, List, Optional, Tuple
 
-import requests
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.event_loop import get_event_loop
+from src.helpers.image_store import image_store
+from src.helpers.rate_limiter import TokenBucket
+from src.helpers.user_limits import get_user_limiter
 from src.helpers import print_h_bar
 
 logger = logging.getLogger("connections.telegram_connection")
@@ -19,14 +30,161 @@ class TelegramConfigurationError(TelegramConnectionError):
 
 class TelegramAPIError(TelegramConnectionError):
     """Raised when Telegram API requests fail"""
-    pass
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        # Seconds Telegram asked us to wait when it answered 429
+        self.retry_after = retry_after
+
+# Telegram's flood limits: about 30 messages a second overall, one a second per chat
+# and 20 a minute in groups
+GLOBAL_MESSAGES_PER_SECOND = 30
+CHAT_MESSAGE_INTERVAL = 1.0
+GROUP_MESSAGE_INTERVAL = 3.0
+MAX_SEND_RETRIES = 3
+# Chat queues with nothing to send for this long are dropped
+CHAT_IDLE_SECONDS = 60
+
+# Update ingestion: `updates` config mode and long-poll timeout
+UPDATE_MODES = ("polling", "webhook")
+POLL_TIMEOUT = 30
+# How long a reading's image may take before the user only gets the text
+READING_IMAGE_WAIT = 180
+# Recent update ids, so updates Telegram delivers twice are handled once
+SEEN_UPDATES = 1000
+
+
+def format_wait(seconds: float) -> str:
+    """Human readable duration, e.g. '11 hours, 5 minutes'"""
+    seconds = int(seconds)
+    hours, minutes, seconds = seconds // 3600, seconds % 3600 // 60, seconds % 60
+    parts = []
+    if hours:
+        parts.append(f"{hours} {'hour' if hours == 1 else 'hours'}")
+    if minutes:
+        parts.append(f"{minutes} {'minute' if minutes == 1 else 'minutes'}")
+    if seconds or not parts:
+        parts.append(f"{seconds} {'second' if seconds == 1 else 'seconds'}")
+    return ", ".join(parts)
+
+
+class TelegramDispatcher:
+    """
+    Outbound message queue of a Telegram bot.
+
+    Every chat has its own queue and worker on the shared event loop, so messages to a
+    chat go out in order while different chats are sent concurrently. Sends are paced to
+    Telegram's global and per chat limits; a 429 pauses the chat for its retry_after and
+    the message is retried, up to MAX_SEND_RETRIES times, instead of every queued message
+    hitting the limit.
+    """
+
+    def __init__(self):
+        self._global = TokenBucket(GLOBAL_MESSAGES_PER_SECOND, GLOBAL_MESSAGES_PER_SECOND)
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._latencies: Deque[float] = deque(maxlen=500)
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._failed = 0
+        self._rate_limited = 0
+
+    def submit(self, chat_id: Any, send: Callable[[], dict]) -> Future:
+        """Queue a send for a chat, the future resolves with the Telegram response"""
+        future = Future()
+        get_event_loop().call_soon_threadsafe(self._enqueue, str(chat_id), send, future, time.monotonic())
+        return future
+
+    def _enqueue(self, chat: str, send: Callable[[], dict], future: Future, queued_at: float) -> None:
+        queue = self._queues.get(chat)
+        if queue is None:
+            queue = self._queues[chat] = asyncio.Queue()
+            asyncio.get_running_loop().create_task(self._worker(chat, queue))
+        queue.put_nowait((send, future, queued_at))
+
+    async def _worker(self, chat: str, queue: asyncio.Queue) -> None:
+        interval = GROUP_MESSAGE_INTERVAL if chat.startswith("-") else CHAT_MESSAGE_INTERVAL
+        resume_at = 0.0
+        while True:
+            try:
+                send, future, queued_at = await asyncio.wait_for(queue.get(), timeout=CHAT_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                # Nothing can be enqueued between the timeout and this check, both run on the loop
+                if queue.empty():
+                    del self._queues[chat]
+                    return
+                continue
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            for attempt in range(MAX_SEND_RETRIES + 1):
+                delay = resume_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await self._global.aacquire()
+                try:
+                    result = await asyncio.to_thread(send)
+                except TelegramAPIError as e:
+                    if e.retry_after is not None and attempt < MAX_SEND_RETRIES:
+                        with self._lock:
+                            self._rate_limited += 1
+                        logger.warning(f"Telegram rate limited chat {chat}, pausing it {e.retry_after}s")
+                        resume_at = time.monotonic() + e.retry_after
+                        continue
+                    resume_at = time.monotonic() + interval
+                    with self._lock:
+                        self._failed += 1
+                    future.set_exception(e)
+                    break
+                except Exception as e:
+                    resume_at = time.monotonic() + interval
+                    with self._lock:
+                        self._failed += 1
+                    future.set_exception(e)
+                    break
+
+                resume_at = time.monotonic() + interval
+                with self._lock:
+                    self._sent += 1
+                    self._latencies.append(time.monotonic() - queued_at)
+                future.set_result(result)
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        """Send counters and queue-to-delivery latency"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "sent": self._sent,
+                "failed": self._failed,
+                "rate_limited": self._rate_limited
+            }
+        stats["queued"] = sum(queue.qsize() for queue in list(self._queues.values()))
+        stats["chats"] = len(self._queues)
+        stats["latency_p50_seconds"] = round(latencies[len(latencies) // 2], 3) if latencies else None
+        stats["latency_p95_seconds"] = round(
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3
+        ) if latencies else None
+        return stats
 
 
 class TelegramConnection(BaseConnection):
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], connection_manager=None):
+        super().__init__(config, connection_manager=connection_manager)
         # self._oauth_session = None
-    
+        self.dispatcher = TelegramDispatcher()
+        # Per-user reading limit, shared with every other ingress path using the same limiter
+        self.reading_limiter = get_user_limiter("readings", self.config.get("reading_limit"))
+        # Bot commands handled in-process, by name without the leading slash
+        self.commands = {"tarot": self._tarot_command}
+        load_dotenv()
+        self._webhook_secret = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+        self._seen_updates: Deque[int] = deque(maxlen=SEEN_UPDATES)
+        self._updates_lock = threading.Lock()
+        self._offset: Optional[int] = None
+        self._poller: Optional[threading.Thread] = None
+        self._stop_polling = threading.Event()
+
     @property
     def is_llm_provider(self) -> bool:
         return False
@@ -35,10 +193,16 @@ class TelegramConnection(BaseConnection):
         """Validate Telegram configuration from JSON"""
         required_fields = []
         missing_fields = [field for field in required_fields if field not in config]
-        
+
         if missing_fields:
             raise ValueError(f"Missing required configuration fields: {', '.join(missing_fields)}")
 
+        updates = config.get("updates")
+        if updates is not None and updates not in UPDATE_MODES:
+            raise ValueError(f"updates must be one of: {', '.join(UPDATE_MODES)}")
+        if updates == "webhook" and not config.get("webhook_url"):
+            raise ValueError("webhook_url is required when updates is 'webhook'")
+
         return config
     
     def register_actions(self) -> None:
@@ -81,11 +245,16 @@ class TelegramConnection(BaseConnection):
                         "image_url",
                         required=True,
                         type=str,
-                        description="URL of the image to be sent"
+                        description="URL of the image to be sent, or the path of a stored image"
                     ),
                 ],
                 description="Send a message with an image via Telegram bot"
             ),
+            "get-send-stats": Action(
+                name="get-send-stats",
+                parameters=[],
+                description="Get outbound message queue and send latency stats"
+            ),
             "set-webhook": Action(
                 name="set-webhook",
                 parameters=[
@@ -120,6 +289,16 @@ class TelegramConnection(BaseConnection):
                 parameters=[],
                 description="Retrieve current webhook status and configuration from Telegram"
             ),
+            "start-polling": Action(
+                name="start-polling",
+                parameters=[],
+                description="Long-poll Telegram for updates and handle bot commands in-process"
+            ),
+            "stop-polling": Action(
+                name="stop-polling",
+                parameters=[],
+                description="Stop long-polling Telegram for updates"
+            ),
         }
 
 
@@ -169,19 +348,28 @@ class TelegramConnection(BaseConnection):
             full_url = f"https://api.telegram.org/bot{api_key}/{endpoint.lstrip('/')}"
             logger.debug(f"Full URL: {full_url}")
 
-            # Make the HTTP request using the requests library
-            response = getattr(requests, method.lower())(full_url, **kwargs)
+            # Make the HTTP request through the pooled session
+            response = getattr(self.http, method.lower())(full_url, **kwargs)
 
             # Check for unsuccessful status codes
             if response.status_code not in [200, 201]:
                 logger.error(f"Request failed: {response.status_code} - {response.text}")
+                retry_after = None
+                if response.status_code == 429:
+                    try:
+                        retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                    except ValueError:
+                        retry_after = 1
                 raise TelegramAPIError(
-                    f"Request failed with status {response.status_code}: {response.text}"
+                    f"Request failed with status {response.status_code}: {response.text}",
+                    retry_after=retry_after
                 )
 
             logger.debug(f"Request successful: {response.status_code}")
             return response.json()
 
+        except TelegramAPIError:
+            raise
         except Exception as e:
             raise TelegramAPIError(f"API request failed: {str(e)}")
 
@@ -212,7 +400,7 @@ class TelegramConnection(BaseConnection):
 
             # Validate the API key by calling the getMe endpoint
             test_url = f"https://api.telegram.org/bot{api_key}/getMe"
-            response = requests.get(test_url)
+            response = self.http.get(test_url)
             if response.status_code != 200:
                 raise TelegramAPIError(f"Failed to contact Telegram API. Status code: {response.status_code}")
 
@@ -258,7 +446,7 @@ class TelegramConnection(BaseConnection):
 
             # Validate the configuration by calling getMe
             test_url = f"https://api.telegram.org/bot{credentials['TELEGRAM_API_KEY']}/getMe"
-            response = requests.get(test_url)
+            response = self.http.get(test_url)
             if response.status_code != 200 or not response.json().get("ok"):
                 raise TelegramAPIError("Invalid API key or unable to reach Telegram API.")
 
@@ -306,9 +494,13 @@ class TelegramConnection(BaseConnection):
             payload["allowed_updates"] = allowed_updates
 
         if secret:
-            payload["secret"] = secret
+            payload["secret_token"] = secret
 
-        return self._make_request("post", "setWebhook", json=payload)
+        response = self._make_request("post", "setWebhook", json=payload)
+        if secret:
+            # Webhook requests are only accepted if they carry this secret
+            self._webhook_secret = secret
+        return response
 
     def delete_webhook(self) -> dict:
         """
@@ -328,6 +520,37 @@ class TelegramConnection(BaseConnection):
         """
         return self._make_request("get", "getWebhookInfo")
 
+    def _queue_message(self, chat_id: int, text: str, **kwargs) -> Future:
+        payload = {
+            "chat_id": chat_id,
+            "text": text
+        }
+        # Merge any additional optional parameters into the payload
+        payload.update(kwargs)
+
+        return self.dispatcher.submit(
+            chat_id, lambda: self._make_request("post", "sendMessage", json=payload)
+        )
+
+    def _queue_message_with_image(self, chat_id: int, text: str, image_url: str, **kwargs) -> Future:
+        payload = {
+            "chat_id": chat_id,
+            "caption": text
+        }
+        # Merge any additional optional parameters into the payload
+        payload.update(kwargs)
+
+        def send() -> dict:
+            if image_store.contains(image_url):
+                # Upload a stored image instead of making Telegram fetch an expiring URL
+                # Multipart fields are strings, anything else (reply_markup, booleans) goes as JSON
+                form = {key: value if isinstance(value, str) else json.dumps(value) for key, value in payload.items()}
+                with open(image_url, "rb") as image:
+                    return self._make_request("post", "sendPhoto", data=form, files={"photo": image})
+            return self._make_request("post", "sendPhoto", json={**payload, "photo": image_url})
+
+        return self.dispatcher.submit(chat_id, send)
+
     def send_message(self, chat_id: int, text: str, **kwargs) -> dict:
         """
         Send a message via Telegram bot.
@@ -340,14 +563,11 @@ class TelegramConnection(BaseConnection):
         Returns:
             A dict containing the Telegram API response.
         """
-        payload = {
-            "chat_id": chat_id,
-            "text": text
-        }
-        # Merge any additional optional parameters into the payload
-        payload.update(kwargs)
+        return self._queue_message(chat_id, text, **kwargs).result()
 
-        return self._make_request("post", "sendMessage", json=payload)
+    async def asend_message(self, chat_id: int, text: str, **kwargs) -> dict:
+        """Async version of send_message"""
+        return await asyncio.wrap_future(self._queue_message(chat_id, text, **kwargs))
 
     def send_message_with_image(self, chat_id: int, text: str, image_url: str, **kwargs) -> dict:
         """
@@ -356,18 +576,177 @@ class TelegramConnection(BaseConnection):
         Args:
             chat_id: Unique identifier for the target chat or username of the target channel.
             text: Caption text for the image.
-            image_url: URL of the image to be sent.
+            image_url: URL of the image to be sent, or the path of a file in the image store.
             **kwargs: Additional optional parameters to pass to the Telegram API.
 
         Returns:
             A dict containing the Telegram API response.
         """
-        payload = {
-            "chat_id": chat_id,
-            "photo": image_url,
-            "caption": text
-        }
-        # Merge any additional optional parameters into the payload
-        payload.update(kwargs)
+        return self._queue_message_with_image(chat_id, text, image_url, **kwargs).result()
+
+    async def asend_message_with_image(self, chat_id: int, text: str, image_url: str, **kwargs) -> dict:
+        """Async version of send_message_with_image"""
+        return await asyncio.wrap_future(self._queue_message_with_image(chat_id, text, image_url, **kwargs))
+
+    def get_send_stats(self, **kwargs) -> Dict[str, Any]:
+        """Outbound queue counters and send latency"""
+        return self.dispatcher.stats()
+
+    def verify_webhook_secret(self, secret: Optional[str]) -> bool:
+        """Whether a webhook request carries the secret registered with set_webhook"""
+        if not self._webhook_secret:
+            return False
+        return hmac.compare_digest(secret or "", self._webhook_secret)
+
+    def _parse_command(self, message: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(command, arguments) of a message starting with a bot command addressed to this bot"""
+        text = message.get("text") or ""
+        entity = next((entity for entity in message.get("entities", []) if entity.get("type") == "bot_command"), None)
+        if entity is None or entity.get("offset") != 0:
+            return None
+
+        command = text[1:entity["length"]]
+        command, _, bot_username = command.partition("@")
+        # In groups, /tarot@other_bot is meant for another bot
+        own_username = os.getenv("TELEGRAM_BOT_USERNAME")
+        if bot_username and own_username and bot_username.lower() != own_username.lower():
+            return None
+        return command.lower(), text[entity["length"]:].strip()
+
+    def handle_update(self, update: Dict[str, Any]) -> bool:
+        """
+        Handle one update from getUpdates or the webhook.
+
+        Commands run as tasks on the shared event loop, so this returns straight away.
+        Returns whether the update carried a command this bot handles.
+        """
+        with self._updates_lock:
+            update_id = update.get("update_id")
+            if update_id is not None:
+                if update_id in self._seen_updates:
+                    return False
+                self._seen_updates.append(update_id)
+
+        message = update.get("message")
+        if not message or "from" not in message:
+            return False
+        parsed = self._parse_command(message)
+        if parsed is None or parsed[0] not in self.commands:
+            return False
+
+        command, arguments = parsed
+        logger.info(f"Received /{command} from Telegram user {message['from'].get('id')}")
+        future = asyncio.run_coroutine_threadsafe(
+            self.commands[command](message, arguments), get_event_loop()
+        )
+
+        def log_failure(finished: Future) -> None:
+            if not finished.cancelled() and finished.exception():
+                logger.error(f"Telegram command /{command} failed: {finished.exception()}")
+        future.add_done_callback(log_failure)
+        return True
+
+    async def _tarot_command(self, message: Dict[str, Any], arguments: str) -> None:
+        """Perform a reading for the user, within the reading_limit budget"""
+        user = message["from"]
+        chat = message["chat"]
+        is_group = chat.get("type") in ("group", "supergroup")
+        # Replies go to the group the command came from, or privately to the user
+        target_chat_id = chat["id"] if is_group else user["id"]
+        mention = f"@{user['username']} " if is_group and user.get("username") else ""
+
+        user_key = f"telegram:{user['id']}"
+        remaining = await self.reading_limiter.aacquire(user_key)
+        if remaining:
+            wait = f"wait {format_wait(remaining)} before requesting another reading."
+            await self.asend_message(target_chat_id, f"{mention}please {wait}" if is_group else f"Please {wait}")
+            return
+
+        tarot = self.connection_manager.connections.get("tarot-reader") if self.connection_manager else None
+        if tarot is None:
+            await self.reading_limiter.arelease(user_key)
+            raise TelegramConnectionError("The tarot-reader connection is not available")
+
+        await self.asend_message(target_chat_id, f"{mention}Performing your reading... please wait...")
+        reading = await tarot.perform_reading(pipeline=True)
+        if not isinstance(reading, dict):
+            # The reading failed, don't count it against the user
+            await self.reading_limiter.arelease(user_key)
+            await self.asend_message(target_chat_id, f"{mention}{reading or 'The cards are unclear... Try again later.'}")
+            return
+
+        # The text goes out while the card image is still being drawn
+        await self.asend_message(target_chat_id, f"{mention}{reading['reading_long']}")
+        image = await tarot.get_reading_image(reading["image_job_id"], wait=READING_IMAGE_WAIT)
+        if image["status"] == "done":
+            await self.asend_message_with_image(target_chat_id, mention.strip(), image["image_url"])
+        else:
+            logger.error(f"No image for reading job {reading['image_job_id']}: {image['status']}")
+
+    def _poll_updates(self) -> None:
+        while not self._stop_polling.is_set():
+            try:
+                response = self._make_request(
+                    "get", "getUpdates",
+                    params={
+                        "offset": self._offset,
+                        "timeout": POLL_TIMEOUT,
+                        "allowed_updates": json.dumps(["message"])
+                    },
+                    # Telegram holds the request open for up to POLL_TIMEOUT seconds
+                    timeout=(5, POLL_TIMEOUT + 10)
+                )
+            except TelegramAPIError as e:
+                logger.error(f"Polling Telegram updates failed: {e}")
+                self._stop_polling.wait(e.retry_after or 5)
+                continue
+
+            for update in response.get("result", []):
+                self._offset = update["update_id"] + 1
+                try:
+                    self.handle_update(update)
+                except Exception as e:
+                    logger.error(f"Failed to handle Telegram update {update.get('update_id')}: {e}")
+
+    def start_polling(self, **kwargs) -> Dict[str, Any]:
+        """Long-poll getUpdates on a background thread, handling commands in-process"""
+        if self._poller and self._poller.is_alive():
+            return {"polling": True}
+
+        # getUpdates is refused while a webhook is set
+        self.delete_webhook()
+        self._stop_polling.clear()
+        self._poller = threading.Thread(target=self._poll_updates, name="telegram-updates", daemon=True)
+        self._poller.start()
+        logger.info("Polling Telegram for updates")
+        return {"polling": True}
+
+    def stop_polling(self, **kwargs) -> Dict[str, Any]:
+        """Stop the update poller after its current getUpdates request"""
+        self._stop_polling.set()
+        return {"polling": False}
+
+    def start_updates(self) -> None:
+        """Start receiving updates the way the `updates` config asks for, if it does"""
+        mode = self.config.get("updates")
+        if mode == "polling":
+            self.start_polling()
+        elif mode == "webhook":
+            # The server's /telegram/webhook route checks requests against this secret
+            self.set_webhook(self.config["webhook_url"], self._webhook_secret or secrets.token_hex(32), ["message"])
+            logger.info(f"Receiving Telegram updates at {self.config['webhook_url']}")
+
+    async def aperform_action(self, action_name: str, kwargs) -> Any:
+        """Async version of perform_action, sends wait on the dispatcher without holding a thread"""
+        if action_name not in self.actions:
+            raise KeyError(f"Unknown action: {action_name}")
+
+        action = self.actions[action_name]
+        errors = action.validate_params(kwargs)
+        if errors:
+            raise ValueError(f"Invalid parameters: {', '.join(errors)}")
 
-        return self._make_request("post", "sendPhoto", json=payload)
\ No newline at end of file
+        method_name = action_name.replace('-', '_')
+        if hasattr(self, f"a{method_name}"):
+            return await getattr(self, f"a{method_name}")(**kwargs)
+        return await asyncio.to_thread(getattr(self, method_name), **kwargs)
\ No newline at end of file
@@ -6,6 +6,8 @@ from together import Together
 from together.types.models import ModelObject, ModelType
 
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
+from src.helpers.rate_limiter import estimate_tokens, rate_limited
 
 logger = logging.getLogger("connections.together_ai_connection")
 
@@ -130,6 +132,7 @@ class TogetherAIConnection(BaseConnection):
                 logger.debug(f"Configuration check failed: {e}")
             return False
 
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using Together AI models"""
         try:
@@ -141,10 +144,12 @@ class TogetherAIConnection(BaseConnection):
 
             messages = [{"role": "user", "content": prompt},{"role": "system", "content": system_prompt},] 
 
-            completion = client.chat.completions.create(
-                model=model,
-                messages=messages,
-            )
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                )
+                slot.record_tokens(completion.usage.total_tokens if completion.usage else None)
 
             return completion.choices[0].message.content
             
@@ -1,13 +1,32 @@
 import os
+import io
+import json
 import logging
-from typing import Dict, Any, List, Tuple
+import mimetypes
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from requests_oauthlib import OAuth1Session
 from dotenv import set_key, load_dotenv
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
 from src.helpers import print_h_bar
+from src.helpers.http import get_session
 
 logger = logging.getLogger("connections.twitter_connection")
 
+MEDIA_UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
+# APPEND segments may be up to 5MB, smaller ones keep peak memory low
+MEDIA_CHUNK_SIZE = 1024 * 1024
+
+# Read cursors of incremental reads, kept between runs
+CURSORS_PATH = os.path.join(".cache", "twitter_cursors.json")
+AUTHOR_CACHE_SIZE = 1000
+MAX_PAGE_SIZE = 100
+# tweets/search/recent refuses pages smaller than this
+MIN_SEARCH_PAGE_SIZE = 10
+
 class TwitterConnectionError(Exception):
     """Base exception for Twitter connection errors"""
     pass
@@ -18,12 +37,159 @@ class TwitterConfigurationError(TwitterConnectionError):
 
 class TwitterAPIError(TwitterConnectionError):
     """Raised when Twitter API requests fail"""
-    pass
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        # Seconds until the rate limit resets when Twitter answered 429 or the quota is used up
+        self.retry_after = retry_after
+
+
+def rate_limit_wait(headers: Dict[str, str]) -> Optional[float]:
+    """Seconds until the rate limit of a 429 response resets, None if its headers don't say"""
+    try:
+        if headers.get("x-rate-limit-reset"):
+            return max(1.0, int(headers["x-rate-limit-reset"]) - time.time())
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+class ReadCursors:
+    """
+    Per-read cursors, persisted so a restarted agent only fetches what it hasn't seen.
+
+    A cursor holds the newest tweet id of the last completed read (since_id). Reads
+    start from the newest tweets, so one interrupted before it completes is simply
+    made again.
+    """
+
+    def __init__(self, path: str = CURSORS_PATH):
+        self.path = path
+        self._cursors: Dict[str, Dict[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self._cursors = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable Twitter cursors file {path}: {e}")
+
+    def get(self, key: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            return dict(self._cursors.get(key, {}))
+
+    def set(self, key: str, since_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._cursors[key] = {"since_id": since_id}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self._cursors, f)
+            os.replace(temp_path, self.path)
+
+    def complete(self, key: str, newest_id: Optional[str]) -> None:
+        """Finish a read, later reads only return tweets newer than newest_id"""
+        since_id = self.get(key).get("since_id")
+        if newest_id and (since_id is None or int(newest_id) > int(since_id)):
+            self.set(key, since_id=newest_id)
+
+
+class AuthorCache:
+    """Bounded LRU map of user id -> name and username, filled from API includes"""
+
+    def __init__(self, max_size: int = AUTHOR_CACHE_SIZE):
+        self.max_size = max_size
+        self._authors: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, users: List[dict]) -> None:
+        with self._lock:
+            for user in users:
+                self._authors[user["id"]] = {"name": user["name"], "username": user["username"]}
+                self._authors.move_to_end(user["id"])
+            while len(self._authors) > self.max_size:
+                self._authors.popitem(last=False)
+
+    def get(self, user_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            author = self._authors.get(user_id)
+            if author is not None:
+                self._authors.move_to_end(user_id)
+            return author
+
+    def annotate(self, tweets: List[dict]) -> None:
+        """Add author_name and author_username to tweets"""
+        for tweet in tweets:
+            if "author_id" not in tweet:
+                continue
+            author = self.get(tweet["author_id"]) or {"name": "Unknown", "username": "Unknown"}
+            tweet.update({
+                "author_name": author["name"],
+                "author_username": author["username"]
+            })
+
+
+class EndpointQuota:
+    """
+    Twitter API usage per endpoint, from the x-rate-limit headers of every response.
+
+    Requests to an endpoint whose window is used up fail straight away instead of
+    spending a call on a 429.
+    """
+
+    def __init__(self):
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(method: str, endpoint: str) -> str:
+        """Endpoint template, with ids replaced so every tweet or user shares one entry"""
+        return f"{method.upper()} " + re.sub(r"/\d+(?=/|$)", "/:id", "/" + endpoint.lstrip("/"))
+
+    def check(self, key: str) -> None:
+        with self._lock:
+            usage = self._endpoints.get(key, {})
+            reset_at = usage.get("reset_at") or 0
+            if usage.get("remaining") == 0 and reset_at > time.time():
+                raise TwitterAPIError(
+                    f"Rate limit of {key} used up, resets in {int(reset_at - time.time())}s",
+                    retry_after=reset_at - time.time()
+                )
+
+    def record(self, key: str, headers: Dict[str, str]) -> None:
+        with self._lock:
+            usage = self._endpoints.setdefault(key, {"calls": 0})
+            usage["calls"] += 1
+            try:
+                if "x-rate-limit-remaining" in headers:
+                    usage["limit"] = int(headers["x-rate-limit-limit"])
+                    usage["remaining"] = int(headers["x-rate-limit-remaining"])
+                    usage["reset_at"] = int(headers["x-rate-limit-reset"])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                key: {
+                    **usage,
+                    "resets_in": max(0, int(usage["reset_at"] - time.time())) if usage.get("reset_at") else None
+                }
+                for key, usage in self._endpoints.items()
+            }
+
 
 class TwitterConnection(BaseConnection):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._oauth_session = None
+        self.cursors = ReadCursors()
+        self.authors = AuthorCache()
+        self.quota = EndpointQuota()
 
     @property
     def is_llm_provider(self) -> bool:
@@ -91,6 +257,11 @@ class TwitterConnection(BaseConnection):
                     ActionParameter("tweet_id", True, str, "ID of the tweet to query for replies")
                 ],
                 description="Fetch tweet replies"
+            ),
+            "get-api-quota": Action(
+                name="get-api-quota",
+                parameters=[],
+                description="Get calls made and rate limit left per Twitter API endpoint"
             )
         }
 
@@ -137,24 +308,28 @@ class TwitterConnection(BaseConnection):
         """
         logger.debug(f"Making {method.upper()} request to {endpoint}")
         try:
+            quota_key = self.quota.endpoint_key(method, endpoint)
+            self.quota.check(quota_key)
             oauth = self._get_oauth()
             full_url = f"https://api.twitter.com/2/{endpoint.lstrip('/')}"
 
             response = getattr(oauth, method.lower())(full_url, **kwargs)
+            self.quota.record(quota_key, response.headers)
 
             if response.status_code not in [200, 201]:
                 logger.error(
                     f"Request failed: {response.status_code} - {response.text}"
                 )
                 raise TwitterAPIError(
-                    f"Request failed with status {response.status_code}: {response.text}"
+                    f"Request failed with status {response.status_code}: {response.text}",
+                    retry_after=rate_limit_wait(response.headers) if response.status_code == 429 else None
                 )
 
             logger.debug(f"Request successful: {response.status_code}")
             return response.json()
 
         except Exception as e:
-            raise TwitterAPIError(f"API request failed: {str(e)}")
+            raise TwitterAPIError(f"API request failed: {str(e)}", retry_after=getattr(e, "retry_after", None))
 
     def _get_oauth(self) -> OAuth1Session:
         """Get or create OAuth session using stored credentials"""
@@ -193,7 +368,7 @@ class TwitterConnection(BaseConnection):
             raise TwitterConfigurationError(
                 "Could not retrieve user information") from e
 
-    def _validate_tweet_text(self, text: str, context: str = "Tweet") -> None:
+    def validate_tweet_text(self, text: str, context: str = "Tweet") -> None:
         """Validate tweet text meets Twitter requirements"""
         if not text:
             error_msg = f"{context} text cannot be empty"
@@ -364,49 +539,85 @@ class TwitterConnection(BaseConnection):
         method = getattr(self, method_name)
         return method(**kwargs)
 
+    def iter_tweets(self, endpoint: str, params: Dict[str, Any], cursor_key: str = None,
+                    max_results: int = None, page_size: int = MAX_PAGE_SIZE,
+                    token_param: str = "pagination_token", max_pages: int = None) -> Iterator[dict]:
+        """
+        Page through a tweet listing endpoint, yielding tweets with their authors filled in.
+
+        With a cursor_key only tweets newer than the last completed read are requested.
+        A read completes once the listing is exhausted, max_results or max_pages is
+        reached or the caller stops iterating, and the next one starts from the newest
+        tweets again, so tweets older than the ones a short read returned are skipped.
+        """
+        since_id = self.cursors.get(cursor_key).get("since_id") if cursor_key else None
+        newest_id = None
+        token = None
+        yielded = 0
+        pages = 0
+
+        try:
+            while True:
+                page_params = dict(params)
+                page_params["max_results"] = page_size
+                if since_id:
+                    page_params["since_id"] = since_id
+                if token:
+                    page_params[token_param] = token
+
+                response = self._make_request('get', endpoint, params=page_params)
+                pages += 1
+                self.authors.update(response.get("includes", {}).get("users", []))
+                meta = response.get("meta", {})
+                newest_id = newest_id or meta.get("newest_id")
+
+                tweets = response.get("data", [])
+                if max_results is not None:
+                    tweets = tweets[:max_results - yielded]
+                self.authors.annotate(tweets)
+                for tweet in tweets:
+                    yield tweet
+                    yielded += 1
+
+                token = meta.get("next_token")
+                if (not token or (max_results is not None and yielded >= max_results)
+                        or (max_pages is not None and pages >= max_pages)):
+                    break
+        except GeneratorExit:
+            # The caller has the newest tweets it wanted
+            if cursor_key:
+                self.cursors.complete(cursor_key, newest_id)
+            raise
+
+        if cursor_key:
+            self.cursors.complete(cursor_key, newest_id)
+
+    def _read(self, endpoint: str, params: Dict[str, Any], cursor_key: str, count: int,
+              **kwargs) -> List[dict]:
+        """One page of a listing, or with incremental_reads only the tweets since the previous read"""
+        if not self.config.get("incremental_reads"):
+            return list(self.iter_tweets(endpoint, params, max_results=count, max_pages=1, **kwargs))
+        return list(self.iter_tweets(endpoint, params, cursor_key, max_results=count, **kwargs))
+
     def read_timeline(self, count: int = None, **kwargs) -> list:
         """Read tweets from the user's timeline"""
         if count is None:
             count = self.config["timeline_read_count"]
-            
+
         logger.debug(f"Reading timeline, count: {count}")
         credentials = self._get_credentials()
 
         params = {
             "tweet.fields": "created_at,author_id,attachments",
             "expansions": "author_id",
-            "user.fields": "name,username",
-            "max_results": count
+            "user.fields": "name,username"
         }
 
-        response = self._make_request(
-            'get',
+        tweets = self._read(
             f"users/{credentials['TWITTER_USER_ID']}/timelines/reverse_chronological",
-            params=params
+            params, "timeline", count, page_size=min(count, MAX_PAGE_SIZE)
         )
 
-        tweets = response.get("data", [])
-        user_info = response.get("includes", {}).get("users", [])
-
-        user_dict = {
-            user['id']: {
-                'name': user['name'],
-                'username': user['username']
-            }
-            for user in user_info
-        }
-
-        for tweet in tweets:
-            author_id = tweet['author_id']
-            author_info = user_dict.get(author_id, {
-                'name': "Unknown",
-                'username': "Unknown"
-            })
-            tweet.update({
-                'author_name': author_info['name'],
-                'author_username': author_info['username']
-            })
-
         logger.debug(f"Retrieved {len(tweets)} tweets")
         return tweets
 
@@ -417,26 +628,24 @@ class TwitterConnection(BaseConnection):
         """Get latest tweets for a user"""
         logger.debug(f"Getting latest tweets for {username}, count: {count}")
 
-        credentials = self._get_credentials()
         params = {
             "tweet.fields": "created_at,text",
-            "max_results": min(count, 100),
             "query": f"from:{username} -is:retweet -is:reply"
         }
 
-        response = self._make_request('get',
-                                      f"tweets/search/recent",
-                                      params=params)
-
-        tweets = response.get("data", [])
+        tweets = self._read(
+            "tweets/search/recent", params, f"latest:{username.lower()}", count,
+            page_size=max(MIN_SEARCH_PAGE_SIZE, min(count, MAX_PAGE_SIZE)), token_param="next_token"
+        )
         logger.debug(f"Retrieved {len(tweets)} tweets")
         return tweets
 
-
-    def post_tweet_with_image(self, message: str, image_path: str, **kwargs) -> dict:
+    def post_tweet_with_image(self, message: str, image_path: str = None, media_id: str = None, **kwargs) -> dict:
+        """Post a tweet with an image, uploading image_path unless it was already uploaded as media_id"""
         logger.debug("Posting tweet with image")
-        self._validate_tweet_text(message)
-        media_id = self.upload_media(image_path)
+        self.validate_tweet_text(message)
+        if media_id is None:
+            media_id = self.upload_media(image_path)
         response = self._make_request('post', 'tweets', json={
             'text': message,
             'media': {'media_ids': [media_id]}
@@ -445,17 +654,96 @@ class TwitterConnection(BaseConnection):
         return response
 
 
-    def upload_media(self, image_path: str) -> str:
-        logger.debug(f"Uploading media from {image_path}")
+    def _media_command(self, data: Dict[str, Any], files: Dict[str, Any] = None, method: str = "post") -> dict:
+        """Run one command of the chunked media upload"""
         oauth = self._get_oauth()
-        upload_url = "https://upload.twitter.com/1.1/media/upload.json"
-        with open(image_path, 'rb') as file:
-            files = {'media': file}
-            response = oauth.post(upload_url, files=files)
-        if response.status_code != 200:
-            logger.error(f"Media upload failed: {response.status_code} {response.text}")
-            raise TwitterAPIError("Media upload failed")
-        media_id = response.json().get("media_id_string")
+        if method == "get":
+            response = oauth.get(MEDIA_UPLOAD_URL, params=data)
+        else:
+            response = oauth.post(MEDIA_UPLOAD_URL, data=data, files=files)
+        if response.status_code not in (200, 201, 202, 204):
+            logger.error(f"Media {data.get('command')} failed: {response.status_code} {response.text}")
+            raise TwitterAPIError(
+                f"Media {data.get('command')} failed",
+                retry_after=rate_limit_wait(response.headers) if response.status_code == 429 else None
+            )
+        return response.json() if response.content else {}
+
+    @staticmethod
+    def _file_chunks(path: str) -> Iterator[bytes]:
+        with open(path, "rb") as file:
+            while True:
+                chunk = file.read(MEDIA_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def upload_media(self, image_path: str = None, media: bytes = None, media_url: str = None,
+                     media_type: str = None) -> str:
+        """
+        Upload media with the chunked INIT/APPEND/FINALIZE flow, returns the media id.
+
+        The media comes from a file, from bytes in memory, or is streamed from a URL
+        (e.g. a DALL-E result), one chunk at a time and without a temp file.
+        """
+        response = None
+        if image_path:
+            logger.debug(f"Uploading media from {image_path}")
+            total_bytes = os.path.getsize(image_path)
+            media_type = media_type or mimetypes.guess_type(image_path)[0]
+            chunks = self._file_chunks(image_path)
+        elif media is not None:
+            logger.debug("Uploading media from memory")
+            total_bytes = len(media)
+            view = memoryview(media)
+            chunks = (view[offset:offset + MEDIA_CHUNK_SIZE] for offset in range(0, total_bytes, MEDIA_CHUNK_SIZE))
+        elif media_url:
+            logger.debug(f"Uploading media streamed from {media_url[:80]}")
+            response = get_session().get(media_url, stream=True)
+            response.raise_for_status()
+            media_type = media_type or response.headers.get("Content-Type", "").split(";")[0] or None
+            if response.headers.get("Content-Length"):
+                total_bytes = int(response.headers["Content-Length"])
+                chunks = response.iter_content(MEDIA_CHUNK_SIZE)
+            else:
+                # INIT needs the size up front
+                body = response.content
+                total_bytes = len(body)
+                chunks = (body[offset:offset + MEDIA_CHUNK_SIZE] for offset in range(0, total_bytes, MEDIA_CHUNK_SIZE))
+        else:
+            raise ValueError("upload_media needs image_path, media or media_url")
+
+        media_type = media_type or "image/jpeg"
+        try:
+            init = self._media_command({
+                "command": "INIT",
+                "total_bytes": total_bytes,
+                "media_type": media_type,
+                "media_category": "tweet_gif" if media_type == "image/gif" else "tweet_image"
+            })
+            media_id = init["media_id_string"]
+
+            for segment_index, chunk in enumerate(chunks):
+                self._media_command(
+                    {"command": "APPEND", "media_id": media_id, "segment_index": segment_index},
+                    files={"media": io.BytesIO(chunk)}
+                )
+        finally:
+            if response is not None:
+                response.close()
+
+        result = self._media_command({"command": "FINALIZE", "media_id": media_id})
+
+        # Animated media is processed asynchronously after FINALIZE
+        processing = result.get("processing_info")
+        while processing and processing.get("state") in ("pending", "in_progress"):
+            time.sleep(processing.get("check_after_secs", 1))
+            processing = self._media_command(
+                {"command": "STATUS", "media_id": media_id}, method="get"
+            ).get("processing_info")
+        if processing and processing.get("state") == "failed":
+            raise TwitterAPIError(f"Media processing failed: {processing.get('error')}")
+
         logger.debug(f"Media uploaded, media_id: {media_id}")
         return media_id
 
@@ -463,7 +751,7 @@ class TwitterConnection(BaseConnection):
     def post_tweet(self, message: str, **kwargs) -> dict:
         """Post a new tweet"""
         logger.debug("Posting new tweet")
-        self._validate_tweet_text(message)
+        self.validate_tweet_text(message)
 
         response = self._make_request('post', 'tweets', json={'text': message})
 
@@ -473,7 +761,7 @@ class TwitterConnection(BaseConnection):
     def reply_to_tweet(self, tweet_id: str, message: str, **kwargs) -> dict:
         """Reply to an existing tweet"""
         logger.debug(f"Replying to tweet {tweet_id}")
-        self._validate_tweet_text(message, "Reply")
+        self.validate_tweet_text(message, "Reply")
 
         response = self._make_request('post',
                                       'tweets',
@@ -500,18 +788,31 @@ class TwitterConnection(BaseConnection):
         logger.info("Tweet liked successfully")
         return response
     
-    def get_tweet_replies(self, tweet_id: str, count: int = 10, **kwargs) -> List[dict]:
-        """Fetch replies to a specific tweet"""
-        logger.debug(f"Fetching replies for tweet {tweet_id}, count: {count}")
-        
+    def iter_tweet_replies(self, tweet_id: str, max_results: int = None, new_only: bool = False) -> Iterator[dict]:
+        """Page through the replies to a tweet, only the ones not read before if new_only"""
         params = {
             "query": f"conversation_id:{tweet_id} is:reply",
             "tweet.fields": "author_id,created_at,text",
-            "max_results": min(count, 100)
+            "expansions": "author_id",
+            "user.fields": "name,username"
         }
-        
-        response = self._make_request('get', 'tweets/search/recent', params=params)
-        replies = response.get("data", [])
-        
+        return self.iter_tweets(
+            "tweets/search/recent", params, f"replies:{tweet_id}" if new_only else None,
+            max_results=max_results, page_size=max(MIN_SEARCH_PAGE_SIZE, min(max_results or MAX_PAGE_SIZE, MAX_PAGE_SIZE)),
+            token_param="next_token"
+        )
+
+    def get_tweet_replies(self, tweet_id: str, count: int = 10, **kwargs) -> List[dict]:
+        """Fetch replies to a specific tweet"""
+        logger.debug(f"Fetching replies for tweet {tweet_id}, count: {count}")
+
+        replies = list(self.iter_tweet_replies(
+            tweet_id, max_results=count, new_only=bool(self.config.get("incremental_reads"))
+        ))
+
         logger.info(f"Retrieved {len(replies)} replies")
-        return replies
\ No newline at end of file
+        return replies
+
+    def get_api_quota(self, **kwargs) -> Dict[str, Dict[str, Any]]:
+        """Calls made and rate limit left per endpoint"""
+        return self.quota.stats()
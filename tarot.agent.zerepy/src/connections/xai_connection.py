@@ -4,6 +4,8 @@ from typing import Dict, Any
 from openai import OpenAI
 from dotenv import set_key, load_dotenv
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.llm_cache import cached_generation
+from src.helpers.rate_limiter import estimate_tokens, rate_limited
 
 logger = logging.getLogger("connections.XAI_connection")
 
@@ -131,6 +133,7 @@ class XAIConnection(BaseConnection):
                 logger.debug(f"Configuration check failed: {e}")
             return False
 
+    @cached_generation
     def generate_text(self, prompt: str, system_prompt: str = None, model: str = None, **kwargs) -> str:
         """Generate text using XAI models"""
         try:
@@ -140,13 +143,15 @@ class XAIConnection(BaseConnection):
             if not model:
                 model = self.config["model"]
 
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt} if system_prompt else {"role": "system", "content": ""},
-                    {"role": "user", "content": prompt},
-                ]
-            )
+            with rate_limited(self.rate_limiter, estimate_tokens(prompt, system_prompt)) as slot:
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt} if system_prompt else {"role": "system", "content": ""},
+                        {"role": "user", "content": prompt},
+                    ]
+                )
+                slot.record_tokens(response.usage.total_tokens if response.usage else None)
             return response.choices[0].message.content
             
         except Exception as e:
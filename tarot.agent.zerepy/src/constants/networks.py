@@ -1,11 +1,13 @@
 SONIC_NETWORKS = {
     "mainnet": {
         "rpc_url": "https://rpc.soniclabs.com",
-        "scanner_url": "https://sonicscan.org"
+        "scanner_url": "https://sonicscan.org",
+        "chain_id": 146
     },
     "testnet": {
         "rpc_url": "https://rpc.blaze.soniclabs.com",
-        "scanner_url": "https://testnet.sonicscan.org"
+        "scanner_url": "https://testnet.sonicscan.org",
+        "chain_id": 57054
     },
     "custom": {
         "rpc_url": "placeholder",
@@ -29,4 +31,17 @@ EVM_NETWORKS = {
         "scanner_url": "api.polygonscan.com",
         "chain_id": 137
     }
-}
\ No newline at end of file
+}
+
+# Token metadata that never changes, loaded into the token registry so it costs no RPC
+KNOWN_TOKENS = {
+    146: {
+        "0x039e2fB66102314Ce7b64Ce5Ce3E5183bc94aD38": {"symbol": "wS", "decimals": 18},
+        "0x29219dd400f2Bf60E5a23d13Be72B486D4038894": {"symbol": "USDC.e", "decimals": 6}
+    },
+    1: {
+        "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2": {"symbol": "WETH", "decimals": 18},
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48": {"symbol": "USDC", "decimals": 6},
+        "0xdAC17F958D2ee523a2206206994597C13D831ec7": {"symbol": "USDT", "decimals": 6}
+    }
+}
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger("helpers.cache")
+
+
+def make_cache_key(connection: str, action: str, params: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Build a hashable cache key from a connection name, action name and its parameters"""
+    return connection, action, json.dumps(params, sort_keys=True, default=str)
+
+
+class TTLCache:
+    """
+    In-process cache with a per-entry time to live.
+
+    Concurrent misses for the same key are deduplicated: the first caller loads the
+    value, every other caller (sync or async, on any thread or event loop) waits for
+    that load instead of issuing its own. Failed loads are never cached.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any, Future, bool]:
+        """
+        Look a key up under the lock.
+
+        Returns (hit, value, flight, is_leader). On a miss the caller either becomes the
+        leader of a new flight or gets the flight it has to wait for.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._hits += 1
+                return True, entry[1], None, False
+
+            flight = self._inflight.get(key)
+            if flight:
+                self._coalesced += 1
+                return False, None, flight, False
+
+            self._misses += 1
+            flight = Future()
+            self._inflight[key] = flight
+            return False, None, flight, True
+
+    def _settle(self, key: Hashable, flight: Future, ttl: float, value: Any = None, error: BaseException = None) -> None:
+        """Store the result of a load and release everyone waiting on it"""
+        with self._lock:
+            now = time.monotonic()
+            # Drop expired entries so keys that are never read again don't pile up
+            for stale_key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[stale_key]
+            if error is None:
+                self._entries[key] = (now + ttl, value)
+            self._inflight.pop(key, None)
+        if error is None:
+            flight.set_result(value)
+        else:
+            flight.set_exception(error)
+
+    def get_or_call(self, key: Hashable, ttl: float, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader on a miss"""
+        hit, value, flight, is_leader = self._lookup(key)
+        if hit:
+            return value
+        if not is_leader:
+            return flight.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            self._settle(key, flight, ttl, error=e)
+            raise
+        self._settle(key, flight, ttl, value=value)
+        return value
+
+    async def aget_or_call(self, key: Hashable, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of get_or_call, loader is a coroutine function"""
+        hit, value, flight, is_leader = self._lookup(key)
+        if hit:
+            return value
+        if not is_leader:
+            return await asyncio.wrap_future(flight)
+
+        try:
+            value = await loader()
+        except BaseException as e:
+            self._settle(key, flight, ttl, error=e)
+            raise
+        self._settle(key, flight, ttl, value=value)
+        return value
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop a single entry, or every entry if no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            now = time.monotonic()
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "hit_rate": round((self._hits + self._coalesced) / lookups, 4) if lookups else 0.0,
+                "entries": sum(1 for expires_at, _ in self._entries.values() if expires_at > now),
+                "inflight": len(self._inflight)
+            }
+
+
+# Shared by every connection so that readings from different users hit the same entries
+shared_cache = TTLCache()
@@ -0,0 +1,37 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger("helpers.event_loop")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide event loop used by async connections from synchronous code.
+
+    The loop runs forever on a daemon thread, so async clients created on it (HTTP
+    sessions, RPC clients) stay usable across calls instead of dying with a per-call
+    asyncio.run loop.
+    """
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="zerepy-event-loop", daemon=True)
+            _loop_thread.start()
+            logger.debug("Started shared event loop")
+        return _loop
+
+
+def run_coroutine(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared event loop and block until it finishes"""
+    loop = get_event_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_coroutine called from the shared event loop, await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+logger = logging.getLogger("helpers.health")
+
+# How long a successful check is trusted, and how soon a failed one is retried
+DEFAULT_TTL = 300
+DEFAULT_FAILURE_TTL = 30
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class HealthResult:
+    configured: bool
+    checked_at: float
+    latency: float
+    error: Optional[str] = None
+
+
+class HealthChecker:
+    """
+    Cached is_configured results for a set of connections.
+
+    Checks run in parallel on a thread pool. Once a connection has a result, callers get
+    it straight away and an expired result is re-probed in the background, so the action
+    path only waits on the network for a connection's very first check.
+    """
+
+    def __init__(self, connections: Mapping[str, Any], ttl: float = DEFAULT_TTL,
+                 failure_ttl: float = DEFAULT_FAILURE_TTL, max_workers: int = DEFAULT_WORKERS):
+        self._connections = connections
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._results: Dict[str, HealthResult] = {}
+        self._probing: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="health-check")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _probe(self, name: str, verbose: bool = False) -> bool:
+        """Run the connection's own is_configured and store the outcome"""
+        started = time.monotonic()
+        error = None
+        try:
+            configured = bool(self._connections[name].is_configured(verbose=verbose))
+        except Exception as e:
+            configured = False
+            error = str(e)
+            logger.debug(f"Health check of {name} failed: {e}")
+
+        with self._lock:
+            self._results[name] = HealthResult(configured, time.time(), time.monotonic() - started, error)
+        return configured
+
+    def _probe_done(self, name: str, future: Future) -> None:
+        """Forget a finished pool probe, unless a newer one took its place"""
+        with self._lock:
+            if self._probing.get(name) is future:
+                del self._probing[name]
+
+    def _submit(self, name: str) -> Future:
+        """Probe a connection on the pool, joining a probe that is already running"""
+        with self._lock:
+            future = self._probing.get(name)
+            if future is None:
+                future = self._executor.submit(self._probe, name)
+                self._probing[name] = future
+                future.add_done_callback(lambda done: self._probe_done(name, done))
+            return future
+
+    def _expired(self, result: HealthResult) -> bool:
+        ttl = self.ttl if result.configured else self.failure_ttl
+        return time.time() - result.checked_at >= ttl
+
+    def is_configured(self, name: str) -> bool:
+        """Last known status of a connection, probing it only if it was never checked"""
+        with self._lock:
+            result = self._results.get(name)
+
+        if result is None:
+            # Concurrent first callers share one probe
+            return self._submit(name).result()
+
+        if self._expired(result):
+            self._submit(name)
+        return result.configured
+
+    def check(self, name: str, verbose: bool = False) -> bool:
+        """Probe a connection now, ignoring any cached result"""
+        return self._probe(name, verbose=verbose)
+
+    def check_all(self, names: Optional[Iterable[str]] = None, timeout: Optional[float] = None,
+                  force: bool = True) -> Dict[str, bool]:
+        """
+        Probe connections in parallel, every registered connection by default.
+
+        With force=False only connections that were never checked are probed.
+        """
+        names = list(self._connections) if names is None else list(names)
+        with self._lock:
+            pending = [name for name in names if force or name not in self._results]
+        wait([self._submit(name) for name in pending], timeout=timeout)
+        with self._lock:
+            return {
+                name: self._results[name].configured
+                for name in names if name in self._results
+            }
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget a connection's result, e.g. after it was reconfigured, or every result"""
+        with self._lock:
+            if name is None:
+                self._results.clear()
+            else:
+                self._results.pop(name, None)
+
+    def start(self) -> None:
+        """Re-probe checked connections in the background before their results expire"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._reprobe_loop, name="health-reprobe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _reprobe_loop(self) -> None:
+        interval = min(self.ttl, self.failure_ttl) / 2
+        while not self._stop.wait(interval):
+            with self._lock:
+                due = [
+                    name for name, result in self._results.items()
+                    if time.time() - result.checked_at >= (self.ttl if result.configured else self.failure_ttl) - interval
+                ]
+            for name in due:
+                self._submit(name)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Cached result of every checked connection"""
+        with self._lock:
+            results = dict(self._results)
+        return {
+            name: {
+                "configured": result.configured,
+                "checked_at": result.checked_at,
+                "latency_seconds": round(result.latency, 3),
+                "stale": self._expired(result),
+                "error": result.error
+            }
+            for name, result in results.items()
+        }
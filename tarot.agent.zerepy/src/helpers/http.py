@@ -0,0 +1,86 @@
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger("helpers.http")
+
+# (connect, read) seconds, used by every request that doesn't pass its own timeout
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+# Keep-alive connections kept open per host
+DEFAULT_POOL_SIZE = 20
+
+HTTP_FIELDS = ("timeout", "connect_timeout", "retries", "backoff", "pool_size")
+
+# Only idempotent requests are retried, a repeated POST could post twice
+RETRY_METHODS = frozenset(["HEAD", "GET", "PUT", "DELETE", "OPTIONS"])
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class PooledSession(requests.Session):
+    """requests.Session with pooled keep-alive connections, retries and a default timeout"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, pool_size: int = DEFAULT_POOL_SIZE):
+        super().__init__()
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def _session_options(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate a connection's `http` config block into PooledSession arguments"""
+    config = config or {}
+    if not isinstance(config, dict):
+        raise ValueError("http must be a dictionary")
+    unknown = [key for key in config if key not in HTTP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown http fields: {', '.join(unknown)}")
+    for field in HTTP_FIELDS:
+        if field in config and (not isinstance(config[field], (int, float)) or config[field] < 0):
+            raise ValueError(f"http.{field} must be a non-negative number")
+
+    return {
+        "timeout": (config.get("connect_timeout", DEFAULT_TIMEOUT[0]), config.get("timeout", DEFAULT_TIMEOUT[1])),
+        "retries": int(config.get("retries", DEFAULT_RETRIES)),
+        "backoff": config.get("backoff", DEFAULT_BACKOFF),
+        "pool_size": int(config.get("pool_size", DEFAULT_POOL_SIZE)) or 1
+    }
+
+
+_sessions: Dict[str, PooledSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(config: Optional[Dict[str, Any]] = None) -> PooledSession:
+    """
+    Get the shared session for a connection's `http` config block.
+
+    Connections with the same settings (most of them, using the defaults) share one
+    session, so connections to a host are reused across connections and calls.
+    """
+    options = _session_options(config)
+    key = json.dumps(options, sort_keys=True)
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = PooledSession(**options)
+        return _sessions[key]
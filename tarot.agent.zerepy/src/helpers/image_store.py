@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+
+from src.helpers.cache import TTLCache
+from src.helpers.http import get_session
+
+logger = logging.getLogger("helpers.image_store")
+
+DEFAULT_IMAGE_DIR = os.path.join(".cache", "images")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp"
+}
+
+
+class ImageStore:
+    """
+    Content-addressed store for downloaded and generated images.
+
+    Files are named after the sha256 of their bytes, so identical images are stored once
+    and concurrent readings never overwrite each other's file. Downloads stream to disk
+    and concurrent fetches of the same URL share one transfer. Files older than max_age
+    are evicted, then the least recently used ones until the store fits in max_bytes.
+    """
+
+    def __init__(self, root: str = DEFAULT_IMAGE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        # URL -> stored path, also coalesces concurrent downloads of the same URL
+        self._urls = TTLCache()
+        self._lock = threading.Lock()
+
+    def _store(self, temp_path: str, digest: str, extension: str) -> str:
+        """Move a finished temp file to its content address, dropping it if the image is already stored"""
+        path = os.path.join(self.root, f"{digest}{extension}")
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(temp_path)
+                os.utime(path)
+            else:
+                os.replace(temp_path, path)
+        self.evict()
+        return path
+
+    def _temp_path(self) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        return os.path.join(self.root, f".{uuid.uuid4().hex}.part")
+
+    def put(self, data: bytes, extension: str = ".jpg") -> str:
+        """Store image bytes, returns the path of the stored file"""
+        temp_path = self._temp_path()
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        return self._store(temp_path, hashlib.sha256(data).hexdigest(), extension)
+
+    def _download(self, url: str) -> str:
+        temp_path = self._temp_path()
+        digest = hashlib.sha256()
+        try:
+            with get_session().get(url, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+                with open(temp_path, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        path = self._store(temp_path, digest.hexdigest(), CONTENT_TYPE_EXTENSIONS.get(content_type, ".jpg"))
+        logger.info(f"Image from {url[:80]} stored at {path}")
+        return path
+
+    def fetch(self, url: str) -> str:
+        """Download an image once, returns the path of the stored file"""
+        path = self._urls.get_or_call(url, self.max_age, lambda: self._download(url))
+        if not os.path.exists(path):
+            # Evicted since it was downloaded
+            self._urls.invalidate(url)
+            path = self._urls.get_or_call(url, self.max_age, lambda: self._download(url))
+        return path
+
+    def contains(self, path: str) -> bool:
+        """Whether path is a stored image, so callers never hand out arbitrary local files"""
+        root = os.path.realpath(self.root)
+        return os.path.isfile(path) and os.path.dirname(os.path.realpath(path)) == root
+
+    def read_bytes(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def evict(self) -> None:
+        """Drop expired images, then the least recently used ones while over max_bytes"""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.root) if entry.is_file()]
+            except FileNotFoundError:
+                return
+
+            now = time.time()
+            files = []
+            for entry in entries:
+                stat = entry.stat()
+                # Leftover partial downloads count as expired after ten minutes
+                max_age = 600 if entry.name.endswith(".part") else self.max_age
+                if now - stat.st_mtime > max_age:
+                    os.remove(entry.path)
+                elif not entry.name.endswith(".part"):
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            try:
+                files = [entry.stat().st_size for entry in os.scandir(self.root)
+                         if entry.is_file() and not entry.name.endswith(".part")]
+            except FileNotFoundError:
+                files = []
+        return {"images": len(files), "bytes": sum(files), "max_bytes": self.max_bytes}
+
+
+# Shared by every connection that downloads or uploads images
+image_store = ImageStore()
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+from typing import List, Tuple
+
+# Modules imported on a cold start of the CLI and of the server
+DEFAULT_TARGETS = ("src.cli", "src.server.app")
+
+
+def profile_imports(module: str) -> List[Tuple[str, float, float]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns (module, self seconds, cumulative seconds) for every module it imported,
+    nested imports keep the indentation python reports them with.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append((name[1:].rstrip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    if result.returncode != 0:
+        timings.append((f"{module} (failed: {result.stderr.strip().splitlines()[-1]})", 0.0, 0.0))
+    return timings
+
+
+def import_report(targets=DEFAULT_TARGETS, top: int = 25) -> str:
+    """Slowest modules pulled in by each target, by cumulative import time"""
+    lines = []
+    for target in targets:
+        timings = profile_imports(target)
+        # A module's nested imports are reported before it, the target's subtree starts after the
+        # last top-level import that came before it (interpreter startup)
+        end = next((i for i, timing in enumerate(timings) if timing[0] == target), len(timings) - 1)
+        start = max((i + 1 for i, timing in enumerate(timings[:end]) if not timing[0].startswith(" ")), default=0)
+        subtree = timings[start:end + 1]
+        total = subtree[-1][2] if subtree else 0.0
+        lines.append(f"{target}: {total:.3f}s")
+        for name, _, cumulative in sorted(subtree, key=lambda timing: timing[2], reverse=True)[:top]:
+            lines.append(f"  {cumulative:8.3f}s  {name.strip()}")
+    return "\n".join(lines)
@@ -0,0 +1,267 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("helpers.llm_cache")
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite")
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MEMORY_BYTES = 16 * 1024 * 1024
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+# Expired responses are purged this often, and a full disk tier is trimmed to this share of its size
+PURGE_INTERVAL = 60 * 60
+TRIM_RATIO = 0.9
+
+
+def make_llm_cache_key(provider: str, model: Optional[str], system_prompt: Optional[str], prompt: str,
+                       chain_id: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash of everything that determines a response, with whitespace in the prompts normalised.
+
+    options are the other generation arguments, e.g. temperature.
+    """
+    def normalise(text: Optional[str]) -> str:
+        return re.sub(r"\s+", " ", text or "").strip()
+
+    parts = [provider, model or "", normalise(system_prompt), normalise(prompt)]
+    if chain_id:
+        # Only added when set, so keys of providers without chains stay the same
+        parts.append(str(chain_id))
+    if options:
+        parts.append(json.dumps(options, sort_keys=True, default=str))
+    payload = json.dumps(parts)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two tier cache of LLM responses.
+
+    Recent entries live in an in-memory LRU, everything else in a SQLite file that
+    survives restarts. Entries expire after their TTL and the disk tier is trimmed to
+    max_disk_bytes, least recently used first. The memory tier is bounded by
+    max_memory_bytes the same way. The disk tier's size is tracked as responses are
+    written, so trimming and purging expired rows only scan the table when it is over
+    its size or every PURGE_INTERVAL.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.path = path
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._next_purge = 0.0
+        self._hits = {"memory": 0, "disk": 0}
+        self._misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite tier on first use, callers hold the lock"""
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._db.commit()
+            self._disk_bytes = self._measure_disk()
+        return self._db
+
+    def _measure_disk(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(LENGTH(CAST(response AS BLOB))), 0) FROM responses").fetchone()[0]
+
+    def _trim_disk(self, now: float) -> None:
+        """Purge expired responses and keep the most recently used ones that fit, callers hold the lock"""
+        db = self._connect()
+        db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        if self._measure_disk() > self.max_disk_bytes:
+            # Trim below the limit so the next writes don't trigger another scan right away
+            db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM ("
+                "SELECT key, SUM(LENGTH(CAST(response AS BLOB))) OVER (ORDER BY accessed_at DESC, key) AS total "
+                "FROM responses) WHERE total > ?)",
+                (int(self.max_disk_bytes * TRIM_RATIO),)
+            )
+        self._disk_bytes = self._measure_disk()
+        self._next_purge = now + PURGE_INTERVAL
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry:
+            self._memory_bytes -= len(entry[1].encode("utf-8"))
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        self._forget(key)
+        self._memory[key] = (expires_at, response)
+        self._memory_bytes += len(response.encode("utf-8"))
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            self._forget(next(iter(self._memory)))
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._hits["memory"] += 1
+                return entry[1]
+            self._forget(key)
+
+            try:
+                db = self._connect()
+                row = db.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row:
+                    db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"LLM cache read failed: {e}")
+                row = None
+
+            if not row:
+                self._misses += 1
+                return None
+            self._hits["disk"] += 1
+            self._remember(key, row[1], row[0])
+            return row[0]
+
+    def set(self, key: str, response: str, ttl: float) -> None:
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+            try:
+                db = self._connect()
+                replaced = db.execute(
+                    "SELECT LENGTH(CAST(response AS BLOB)) FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, response, expires_at, now)
+                )
+                self._disk_bytes += len(response.encode("utf-8")) - (replaced[0] if replaced else 0)
+                if self._disk_bytes > self.max_disk_bytes or now >= self._next_purge:
+                    self._trim_disk(now)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"LLM cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            try:
+                self._connect().execute("DELETE FROM responses")
+                self._db.commit()
+                self._disk_bytes = 0
+            except sqlite3.Error as e:
+                logger.error(f"LLM cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits["memory"] + self._hits["disk"] + self._misses
+            try:
+                disk_entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error:
+                disk_entries = None
+            return {
+                "memory_hits": self._hits["memory"],
+                "disk_hits": self._hits["disk"],
+                "misses": self._misses,
+                "hit_rate": round((lookups - self._misses) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries,
+                "disk_bytes": self._disk_bytes
+            }
+
+
+# Shared by every LLM connection that enables response_cache
+llm_cache = LLMResponseCache()
+
+
+def response_cache_ttl(config: Any) -> Optional[float]:
+    """
+    TTL from a connection's `response_cache` config, None when caching is off.
+
+    Accepts true (default TTL) or {"ttl": seconds}.
+    """
+    if not config:
+        return None
+    if config is True:
+        return DEFAULT_TTL
+    if isinstance(config, dict):
+        ttl = config.get("ttl", DEFAULT_TTL)
+        if isinstance(ttl, (int, float)) and ttl > 0:
+            return ttl
+    raise ValueError("response_cache must be true or a dictionary with a positive ttl")
+
+
+def _cache_key(connection, prompt: str, system_prompt: Optional[str], model: Optional[str],
+               kwargs: Dict[str, Any]) -> str:
+    options = {name: value for name, value in kwargs.items() if name != "chain_id" and value is not None}
+    return make_llm_cache_key(
+        connection.config.get("name", type(connection).__name__),
+        model or connection.config.get("model"),
+        system_prompt,
+        prompt,
+        kwargs.get("chain_id") or connection.config.get("chain_id"),
+        options
+    )
+
+
+def cached_generation(func):
+    """Serve generate_text from the LLM response cache when the connection enables it"""
+    @functools.wraps(func)
+    def wrapper(self, prompt: str, system_prompt: str = None, model: str = None, **kwargs):
+        ttl = getattr(self, "response_cache_ttl", None)
+        if not ttl:
+            return func(self, prompt, system_prompt, model, **kwargs)
+
+        key = _cache_key(self, prompt, system_prompt, model, kwargs)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        response = func(self, prompt, system_prompt, model, **kwargs)
+        if response is not None:
+            llm_cache.set(key, response, ttl)
+        return response
+    return wrapper
+
+
+def acached_generation(func):
+    """Async version of cached_generation, for agenerate_text"""
+    @functools.wraps(func)
+    async def wrapper(self, prompt: str, system_prompt: str = None, model: str = None, **kwargs):
+        ttl = getattr(self, "response_cache_ttl", None)
+        if not ttl:
+            return await func(self, prompt, system_prompt, model, **kwargs)
+
+        key = _cache_key(self, prompt, system_prompt, model, kwargs)
+        # The disk tier is SQLite, keep its reads and writes off the event loop
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            return cached
+        response = await func(self, prompt, system_prompt, model, **kwargs)
+        if response is not None:
+            await asyncio.to_thread(llm_cache.set, key, response, ttl)
+        return response
+    return wrapper
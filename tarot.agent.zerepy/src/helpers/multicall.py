@@ -0,0 +1,103 @@
+import logging
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from web3 import Web3
+
+from src.constants.abi import ERC20_ABI
+
+logger = logging.getLogger("helpers.multicall")
+
+# Multicall3 is deployed at the same address on Sonic, Ethereum and most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Sentinel used by the connections for the chain's native token
+NATIVE_TOKEN = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+_chain_ids: "weakref.WeakKeyDictionary[Web3, int]" = weakref.WeakKeyDictionary()
+
+
+def chain_id(web3: Web3) -> int:
+    """Chain id of a Web3 instance, asked from the node only once"""
+    if web3 not in _chain_ids:
+        _chain_ids[web3] = web3.eth.chain_id
+    return _chain_ids[web3]
+
+
+def _aggregate3(web3: Web3, calls: Sequence[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+    """Run read calls in one eth_call, returns each call's return data or None if it reverted"""
+    multicall = web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    results = multicall.functions.aggregate3(
+        [(target, True, call_data) for target, call_data in calls]
+    ).call()
+    return [return_data if success else None for success, return_data in results]
+
+
+def _decode_uint(web3: Web3, data: Optional[bytes]) -> Optional[int]:
+    if not data:
+        return None
+    return web3.codec.decode(["uint256"], data)[0]
+
+
+def get_balances(web3: Web3, token_addresses: Sequence[str],
+                 wallet_addresses: Sequence[str]) -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    Raw balances of N tokens for M wallets in a single Multicall3 aggregate3 call.
+
+    Returns {wallet: {token: balance}} keyed by the addresses as given. NATIVE_TOKEN
+    reads the native balance; a balance is None if its call reverted.
+    """
+    erc20 = web3.eth.contract(abi=ERC20_ABI)
+    multicall = web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+    pairs = [(wallet, token) for wallet in wallet_addresses for token in token_addresses]
+    calls = []
+    for wallet, token in pairs:
+        owner = Web3.to_checksum_address(wallet)
+        if token.lower() == NATIVE_TOKEN.lower():
+            calls.append((MULTICALL3_ADDRESS, multicall.encodeABI(fn_name="getEthBalance", args=[owner])))
+        else:
+            calls.append((Web3.to_checksum_address(token), erc20.encodeABI(fn_name="balanceOf", args=[owner])))
+
+    balances: Dict[str, Dict[str, Optional[int]]] = {wallet: {} for wallet in wallet_addresses}
+    for (wallet, token), data in zip(pairs, _aggregate3(web3, calls)):
+        balances[wallet][token] = _decode_uint(web3, data)
+    return balances
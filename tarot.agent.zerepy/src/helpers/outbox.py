@@ -0,0 +1,447 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.helpers.event_loop import run_coroutine
+from src.helpers.image_store import image_store
+from src.helpers.rate_limiter import TokenBucket, retry_after
+
+logger = logging.getLogger("helpers.outbox")
+
+DEFAULT_OUTBOX_PATH = os.path.join(".cache", "outbox.sqlite")
+# Media of a post is uploaded this long before its slot
+DEFAULT_PREPARE_AHEAD = 10 * 60
+# The same content isn't queued twice for a platform within this window
+DEFAULT_DEDUPE_WINDOW = 7 * 24 * 60 * 60
+# Twitter media ids expire after a day, older uploads are redone before posting
+MEDIA_ID_TTL = 23 * 60 * 60
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 60
+# Longest the worker sleeps before looking at the queue again
+POLL_INTERVAL = 30
+MAX_DUE_POSTS = 100
+
+# Platform -> actions the outbox can send, each one a method of the platform's connection
+OUTBOX_ACTIONS = {
+    "twitter": ("post-tweet", "post-tweet-with-image", "reply-to-tweet"),
+    "farcaster": ("post-cast", "reply-to-cast"),
+    "discord": ("post-message", "reply-to-message"),
+    "echochambers": ("send-message",)
+}
+
+# Posting budget of each platform unless the config says otherwise,
+# Twitter's free tier allows 17 posts a day
+DEFAULT_BUDGETS = {
+    "twitter": {"posts_per_hour": 17 / 24, "burst": 1},
+    "farcaster": {"posts_per_hour": 30, "burst": 3},
+    "discord": {"posts_per_hour": 120, "burst": 5},
+    "echochambers": {"posts_per_hour": 60, "burst": 1}
+}
+
+OUTBOX_FIELDS = ("path", "budgets", "prepare_ahead", "dedupe_window")
+BUDGET_FIELDS = ("posts_per_hour", "burst")
+POST_STATUSES = ("queued", "sending", "sent", "failed", "cancelled")
+
+
+def content_hash(platform: str, action: str, params: Dict[str, Any]) -> str:
+    """Hash of a post's content, with whitespace in its text normalised"""
+    def normalise(value: Any) -> Any:
+        return re.sub(r"\s+", " ", value).strip() if isinstance(value, str) else value
+
+    payload = json.dumps([platform, action, {key: normalise(value) for key, value in params.items()}],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _prepare_tweet_image(connection, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Download a tweet's image into the image store and upload it, so posting only sends the tweet"""
+    params = dict(params)
+    # The stored image may have been evicted while the post was queued, download it again
+    image_path = params.get("image_path")
+    if params.get("image_url") and not (image_path and os.path.exists(image_path)):
+        params["image_path"] = image_store.fetch(params["image_url"])
+    params["media_id"] = connection.upload_media(params["image_path"])
+    return params
+
+
+# (platform, action) -> function preparing the post's media before its slot
+MEDIA_PREPARERS: Dict[tuple, Callable[[Any, Dict[str, Any]], Dict[str, Any]]] = {
+    ("twitter", "post-tweet-with-image"): _prepare_tweet_image
+}
+
+
+def _validate_budget(platform: str, budget: Any) -> Dict[str, float]:
+    if not isinstance(budget, dict):
+        raise ValueError(f"Outbox budget of {platform} must be a dictionary")
+    unknown = [key for key in budget if key not in BUDGET_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown outbox budget fields: {', '.join(unknown)}")
+    budget = {**DEFAULT_BUDGETS.get(platform, {}), **budget}
+    for field_name in BUDGET_FIELDS:
+        value = budget.get(field_name)
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"Outbox {field_name} of {platform} must be a positive number")
+    return budget
+
+
+class Outbox:
+    """
+    Persistent queue of outbound posts, sent by a background worker.
+
+    Posts are kept in SQLite with a send time, and each platform has a token bucket
+    budget so queued posts go out no faster than the platform allows. Posts queued
+    without a send time get the platform's next free slot. Media is uploaded shortly
+    before a post's slot, and content already queued or sent for a platform within the
+    dedupe window is dropped. Failed sends are retried with backoff.
+    """
+
+    def __init__(self, connection_manager, path: str = DEFAULT_OUTBOX_PATH,
+                 budgets: Optional[Dict[str, Dict[str, float]]] = None,
+                 prepare_ahead: float = DEFAULT_PREPARE_AHEAD, dedupe_window: float = DEFAULT_DEDUPE_WINDOW):
+        self.connection_manager = connection_manager
+        self.path = path
+        self.prepare_ahead = prepare_ahead
+        self.dedupe_window = dedupe_window
+        self.budgets = {platform: dict(budget) for platform, budget in DEFAULT_BUDGETS.items()}
+        self.budgets.update(budgets or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._worker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        # Posts whose media couldn't be prepared ahead, they are prepared again when sent
+        self._unprepared = set()
+        self._duplicates = 0
+        with self._lock:
+            self._recover()
+            self._restore_budgets()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], connection_manager) -> "Outbox":
+        """Build an outbox from the agent's `outbox` config block"""
+        if not isinstance(config, dict):
+            raise ValueError("outbox must be a dictionary")
+        unknown = [key for key in config if key not in OUTBOX_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown outbox fields: {', '.join(unknown)}")
+        budgets = config.get("budgets", {})
+        if not isinstance(budgets, dict):
+            raise ValueError("Outbox budgets must be a dictionary")
+        for platform in budgets:
+            if platform not in OUTBOX_ACTIONS:
+                raise ValueError(f"Unknown outbox platform '{platform}'. Must be one of: {', '.join(OUTBOX_ACTIONS)}")
+        for field_name in ("prepare_ahead", "dedupe_window"):
+            value = config.get(field_name)
+            if value is not None and (not isinstance(value, (int, float)) or value < 0):
+                raise ValueError(f"Outbox {field_name} must be a non-negative number of seconds")
+        return cls(
+            connection_manager,
+            path=config.get("path", DEFAULT_OUTBOX_PATH),
+            budgets={platform: _validate_budget(platform, budget) for platform, budget in budgets.items()},
+            prepare_ahead=config.get("prepare_ahead", DEFAULT_PREPARE_AHEAD),
+            dedupe_window=config.get("dedupe_window", DEFAULT_DEDUPE_WINDOW)
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the queue on first use, callers hold the lock"""
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, platform TEXT NOT NULL, action TEXT NOT NULL, "
+                "params TEXT NOT NULL, content_hash TEXT NOT NULL, status TEXT NOT NULL, send_at REAL NOT NULL, "
+                "created_at REAL NOT NULL, prepared_at REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "sent_at REAL, error TEXT, result TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS posts_status_send_at ON posts (status, send_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS posts_content_hash ON posts (platform, content_hash)")
+            self._db.commit()
+        return self._db
+
+    def _recover(self) -> None:
+        """Fail posts left mid-send by a previous run, resending them could post twice"""
+        db = self._connect()
+        interrupted = db.execute(
+            "UPDATE posts SET status = 'failed', error = 'Interrupted while sending' WHERE status = 'sending'"
+        ).rowcount
+        db.commit()
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted posts as failed")
+
+    def _bucket(self, platform: str) -> TokenBucket:
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            budget = self.budgets[platform]
+            bucket = self._buckets[platform] = TokenBucket(budget["posts_per_hour"] / 3600, budget["burst"])
+        return bucket
+
+    def _restore_budgets(self) -> None:
+        """Charge each bucket for posts sent before a restart, so restarting doesn't refill the budgets"""
+        db = self._connect()
+        now = time.time()
+        for platform in self.budgets:
+            bucket = self._bucket(platform)
+            refill_seconds = bucket.capacity / bucket.rate
+            sent = db.execute(
+                "SELECT COUNT(*) FROM posts WHERE platform = ? AND status = 'sent' AND sent_at > ?",
+                (platform, now - refill_seconds)
+            ).fetchone()[0]
+            if sent:
+                bucket.reserve(min(sent, bucket.capacity))
+
+    def _next_slot(self, platform: str, now: float) -> float:
+        """Send time after the platform's last queued post, one budget interval apart"""
+        last = self._connect().execute(
+            "SELECT MAX(send_at) FROM posts WHERE platform = ? AND status = 'queued'", (platform,)
+        ).fetchone()[0]
+        if last is None:
+            return now
+        return max(now, last + 3600 / self.budgets[platform]["posts_per_hour"])
+
+    def enqueue(self, platform: str, action: str, params: Dict[str, Any], send_at: Optional[float] = None) -> Optional[int]:
+        """
+        Queue a post, returns its id or None if the same content is already queued or was sent recently.
+
+        params are the keyword arguments of the connection method, e.g. {"message": ...}.
+        Without send_at the post takes the platform's next free slot.
+        """
+        if action not in OUTBOX_ACTIONS.get(platform, ()):
+            raise ValueError(f"The outbox can't send {action} on {platform}")
+        digest = content_hash(platform, action, params)
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            duplicate = db.execute(
+                "SELECT id FROM posts WHERE platform = ? AND content_hash = ? "
+                "AND status IN ('queued', 'sending', 'sent') AND created_at > ?",
+                (platform, digest, now - self.dedupe_window)
+            ).fetchone()
+            if duplicate:
+                self._duplicates += 1
+                logger.info(f"Dropping {action} on {platform}, same content as post {duplicate['id']}")
+                return None
+            if send_at is None:
+                send_at = self._next_slot(platform, now)
+            post_id = db.execute(
+                "INSERT INTO posts (platform, action, params, content_hash, status, send_at, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (platform, action, json.dumps(params), digest, send_at, now)
+            ).lastrowid
+            db.commit()
+        logger.info(f"Queued {action} on {platform} as post {post_id}, sending in {max(0, send_at - now):.0f}s")
+        self._wake.set()
+        return post_id
+
+    @staticmethod
+    def _row_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        post = dict(row)
+        post["params"] = json.loads(post["params"])
+        return post
+
+    def get(self, post_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return self._row_dict(row) if row else None
+
+    def pending(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Queued posts, next to send first"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM posts WHERE status = 'queued' ORDER BY send_at, id LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_dict(row) for row in rows]
+
+    def cancel(self, post_id: int) -> bool:
+        """Cancel a queued post, returns False if it isn't queued"""
+        with self._lock:
+            db = self._connect()
+            cancelled = db.execute(
+                "UPDATE posts SET status = 'cancelled' WHERE id = ? AND status = 'queued'", (post_id,)
+            ).rowcount
+            db.commit()
+        return bool(cancelled)
+
+    def _prepare(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the post's media preparer and store the prepared params"""
+        preparer = MEDIA_PREPARERS[(post["platform"], post["action"])]
+        params = preparer(self.connection_manager.connections[post["platform"]], post["params"])
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "UPDATE posts SET params = ?, prepared_at = ? WHERE id = ?",
+                (json.dumps(params), time.time(), post["id"])
+            )
+            db.commit()
+        return params
+
+    def _prepare_upcoming(self, now: float) -> None:
+        """Prepare the media of posts whose slot is within prepare_ahead"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM posts WHERE status = 'queued' AND prepared_at IS NULL AND send_at <= ? "
+                "ORDER BY send_at, id LIMIT ?",
+                (now + self.prepare_ahead, MAX_DUE_POSTS)
+            ).fetchall()
+        for row in rows:
+            post = self._row_dict(row)
+            if (post["platform"], post["action"]) not in MEDIA_PREPARERS or post["id"] in self._unprepared:
+                continue
+            try:
+                self._prepare(post)
+                logger.info(f"Prepared media of post {post['id']}")
+            except Exception as e:
+                self._unprepared.add(post["id"])
+                logger.warning(f"Preparing media of post {post['id']} failed, retrying when it is sent: {e}")
+
+    def _finish(self, post_id: int, **fields: Any) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            db = self._connect()
+            db.execute(f"UPDATE posts SET {columns} WHERE id = ?", (*fields.values(), post_id))
+            db.commit()
+
+    def _send(self, post: Dict[str, Any]) -> None:
+        """Send one claimed post and record the outcome"""
+        platform, action = post["platform"], post["action"]
+        attempts = post["attempts"] + 1
+        try:
+            if not self.connection_manager.health.is_configured(platform):
+                raise ValueError(f"Connection {platform} is not configured")
+            params = post["params"]
+            media_stale = post["prepared_at"] is None or time.time() - post["prepared_at"] > MEDIA_ID_TTL
+            if (platform, action) in MEDIA_PREPARERS and media_stale:
+                params = self._prepare(post)
+            connection = self.connection_manager.connections[platform]
+            result = getattr(connection, action.replace("-", "_"))(**params)
+            if inspect.isawaitable(result):
+                result = run_coroutine(result)
+        except Exception as e:
+            self._unprepared.discard(post["id"])
+            wait = retry_after(e)
+            if attempts >= MAX_ATTEMPTS:
+                logger.error(f"Giving up on post {post['id']} ({action} on {platform}): {e}")
+                self._finish(post["id"], status="failed", attempts=attempts, error=str(e))
+                return
+            delay = wait if wait is not None else RETRY_DELAY * 2 ** (attempts - 1)
+            logger.warning(f"Sending post {post['id']} failed, retrying in {delay:.0f}s: {e}")
+            self._finish(post["id"], status="queued", attempts=attempts, error=str(e),
+                         send_at=time.time() + delay)
+            return
+        logger.info(f"Sent post {post['id']} ({action} on {platform})")
+        self._finish(post["id"], status="sent", attempts=attempts, sent_at=time.time(), error=None,
+                     result=json.dumps(result, default=str))
+
+    def _claim(self, post_id: int) -> Optional[Dict[str, Any]]:
+        """Mark a queued post as sending, unless it was cancelled in the meantime"""
+        with self._lock:
+            db = self._connect()
+            claimed = db.execute(
+                "UPDATE posts SET status = 'sending' WHERE id = ? AND status = 'queued'", (post_id,)
+            ).rowcount
+            db.commit()
+            row = db.execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone() if claimed else None
+        return self._row_dict(row) if row else None
+
+    def run_once(self) -> float:
+        """Prepare upcoming media and send the due posts the budgets allow, returns seconds until there's more to do"""
+        now = time.time()
+        self._prepare_upcoming(now)
+        with self._lock:
+            due = self._connect().execute(
+                "SELECT id, platform FROM posts WHERE status = 'queued' AND send_at <= ? ORDER BY send_at, id LIMIT ?",
+                (now, MAX_DUE_POSTS)
+            ).fetchall()
+
+        waits = [POLL_INTERVAL]
+        blocked = set()
+        for post_id, platform in due:
+            if platform in blocked:
+                continue
+            bucket = self._bucket(platform)
+            available = bucket.available()
+            if available < 1:
+                # Out of budget, later posts of this platform wait for the same refill
+                blocked.add(platform)
+                waits.append((1 - available) / bucket.rate)
+                continue
+            post = self._claim(post_id)
+            if post is None:
+                continue
+            bucket.reserve()
+            self._send(post)
+
+        with self._lock:
+            db = self._connect()
+            next_send = db.execute("SELECT MIN(send_at) FROM posts WHERE status = 'queued'").fetchone()[0]
+            next_prepare = db.execute(
+                "SELECT MIN(send_at) FROM posts WHERE status = 'queued' AND prepared_at IS NULL"
+            ).fetchone()[0]
+        now = time.time()
+        if next_send is not None and next_send > now:
+            waits.append(next_send - now)
+        if next_prepare is not None and next_prepare - self.prepare_ahead > now:
+            waits.append(next_prepare - self.prepare_ahead - now)
+        return max(0.0, min(waits))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                wait = self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+                wait = POLL_INTERVAL
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the background worker, does nothing if it is already running"""
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="outbox", daemon=True)
+        self._worker.start()
+        logger.info("Outbox worker started")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._worker:
+            self._worker.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            db = self._connect()
+            counts = db.execute("SELECT platform, status, COUNT(*) FROM posts GROUP BY platform, status").fetchall()
+            next_sends = dict(db.execute(
+                "SELECT platform, MIN(send_at) FROM posts WHERE status = 'queued' GROUP BY platform"
+            ).fetchall())
+            platforms = {
+                platform: {
+                    "posts_per_hour": budget["posts_per_hour"],
+                    "burst": budget["burst"],
+                    "available": round(self._bucket(platform).available(), 2),
+                    "next_send_at": next_sends.get(platform),
+                    **{status: 0 for status in POST_STATUSES}
+                }
+                for platform, budget in self.budgets.items()
+            }
+        for platform, status, count in counts:
+            if platform in platforms:
+                platforms[platform][status] = count
+        return {
+            "running": bool(self._worker and self._worker.is_alive()),
+            "duplicates_dropped": self._duplicates,
+            "platforms": platforms
+        }
@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, ContextManager, Deque, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger("helpers.rate_limiter")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers that find
+    the bucket empty reserve their tokens anyway and wait out the debt, so concurrent
+    callers are spread over distinct slots instead of all retrying at once.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens from the bucket, returns how many seconds the caller must wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            # Requests bigger than the bucket would never fit, let them through one at a time
+            tokens = min(tokens, self.capacity)
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block the current thread until tokens are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limiting: waiting {delay:.2f}s")
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: float = 1) -> None:
+        """Wait on the event loop until tokens are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limiting: waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def available(self) -> float:
+        """Tokens currently in the bucket, negative while callers are waiting out a debt"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def refund(self, tokens: float) -> None:
+        """Give unused tokens back to the bucket"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+# Rough size of a completion when the real usage isn't known yet
+DEFAULT_COMPLETION_TOKENS = 500
+
+RATE_LIMIT_FIELDS = ("requests_per_minute", "tokens_per_minute", "max_concurrency", "burst")
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """Rough token count of a request, about four characters per token plus the expected completion"""
+    return sum(len(text) for text in texts if text) // 4 + DEFAULT_COMPLETION_TOKENS
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds a provider asked us to wait in a 429 response, if the error carries one"""
+    # Connection errors that parsed the wait themselves, e.g. TwitterAPIError
+    wait = getattr(error, "retry_after", None)
+    if isinstance(wait, (int, float)):
+        return float(wait)
+
+    response = getattr(error, "response", None)
+    if response is None or getattr(response, "status_code", None) != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    # Rate limited without a hint, back off for a second
+    return 1.0
+
+
+class RateSlot:
+    """Handle for a request admitted by a RateLimiter, used to report its real token usage"""
+
+    def __init__(self, limiter: Optional["RateLimiter"], estimated_tokens: float):
+        self._limiter = limiter
+        self._estimated_tokens = estimated_tokens
+
+    def record_tokens(self, used_tokens: Optional[float]) -> None:
+        """Correct the token budget once the provider reported what the request actually used"""
+        if self._limiter is None or used_tokens is None or self._limiter._tokens is None:
+            return
+        difference = used_tokens - self._estimated_tokens
+        if difference > 0:
+            self._limiter._tokens.reserve(difference)
+        elif difference < 0:
+            self._limiter._tokens.refund(-difference)
+        self._estimated_tokens = used_tokens
+
+
+class RateLimiter:
+    """
+    Request, token and concurrency budget for an LLM provider.
+
+    Requests and tokens per minute are token buckets, so bursts are smoothed out instead of
+    tripping the provider's limits. A 429 with a Retry-After header pauses every caller
+    sharing the limiter until the provider is ready again.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 max_concurrency: int = None, burst: float = None):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(
+            requests_per_minute / 60, burst or max(1, requests_per_minute // 10)
+        ) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self._condition = threading.Condition()
+        # Async callers waiting for a concurrency slot, woken from whichever thread frees one
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._throttled = 0
+        self._rate_limited = 0
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> "RateLimiter":
+        """Build a limiter from a connection's `rate_limit` config block"""
+        if not isinstance(config, dict):
+            raise ValueError("rate_limit must be a dictionary")
+        unknown = [key for key in config if key not in RATE_LIMIT_FIELDS + ("key",)]
+        if unknown:
+            raise ValueError(f"Unknown rate_limit fields: {', '.join(unknown)}")
+        for field in RATE_LIMIT_FIELDS:
+            if field in config and (not isinstance(config[field], (int, float)) or config[field] <= 0):
+                raise ValueError(f"rate_limit.{field} must be a positive number")
+        return cls(name, **{field: config[field] for field in RATE_LIMIT_FIELDS if field in config})
+
+    def _delay(self, tokens: float) -> float:
+        """Reserve a request and its tokens, returns how long the caller has to wait"""
+        delay = max(0.0, self._blocked_until - time.monotonic())
+        if self._requests:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens and tokens:
+            delay = max(delay, self._tokens.reserve(tokens))
+        if delay > 0:
+            self._throttled += 1
+            logger.debug(f"Rate limiting {self.name}: waiting {delay:.2f}s")
+        return delay
+
+    def _try_enter(self) -> bool:
+        with self._condition:
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _leave(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+            self._wake_async_waiter()
+
+    def _wake_async_waiter(self) -> None:
+        """Wake the longest waiting async caller, callers hold the condition"""
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_release_waiter, waiter)
+                return
+            except RuntimeError:
+                # Its loop was closed, try the next one
+                continue
+
+    async def _aenter(self) -> None:
+        """Take a concurrency slot, waiting on the event loop without polling"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._try_enter():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._condition:
+                    try:
+                        self._async_waiters.remove((loop, waiter))
+                    except ValueError:
+                        # Already woken for a free slot, hand it to the next waiter
+                        self._wake_async_waiter()
+                raise
+
+    def _observe_error(self, error: BaseException) -> None:
+        """Pause the limiter if the provider rate limited us"""
+        wait = retry_after(error)
+        if wait is None:
+            return
+        self._rate_limited += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+        logger.warning(f"{self.name} rate limited by the provider, backing off {wait:.1f}s")
+
+    @contextmanager
+    def limit(self, tokens: float = 0) -> Iterator[RateSlot]:
+        """Block until a request of `tokens` tokens fits in the budget"""
+        delay = self._delay(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        with self._condition:
+            while not self._try_enter():
+                self._condition.wait()
+        try:
+            yield RateSlot(self, tokens)
+        except Exception as e:
+            self._observe_error(e)
+            raise
+        finally:
+            self._leave()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: float = 0) -> AsyncIterator[RateSlot]:
+        """Async version of limit, waits on the event loop"""
+        delay = self._delay(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self._aenter()
+        try:
+            yield RateSlot(self, tokens)
+        except Exception as e:
+            self._observe_error(e)
+            raise
+        finally:
+            self._leave()
+
+    def utilisation(self) -> Dict[str, Any]:
+        """How much of each budget is currently in use"""
+        def bucket_usage(bucket: Optional[TokenBucket], limit: Optional[float]) -> Optional[Dict[str, Any]]:
+            if bucket is None:
+                return None
+            available = bucket.available()
+            return {
+                "per_minute": limit,
+                "available": round(available, 2),
+                "utilisation": round(min(1.0, 1 - available / bucket.capacity), 4)
+            }
+
+        with self._condition:
+            in_flight = self._in_flight
+        return {
+            "requests": bucket_usage(self._requests, self.requests_per_minute),
+            "tokens": bucket_usage(self._tokens, self.tokens_per_minute),
+            "concurrency": {
+                "in_flight": in_flight,
+                "max": self.max_concurrency,
+                "utilisation": round(in_flight / self.max_concurrency, 4) if self.max_concurrency else None
+            },
+            "backoff_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            "throttled": self._throttled,
+            "rate_limited": self._rate_limited
+        }
+
+
+def _release_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+# Config each shared limiter was built from, to spot connections disagreeing on it
+_limiter_configs: Dict[str, Dict[str, Any]] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, config: Optional[Dict[str, Any]]) -> Optional[RateLimiter]:
+    """
+    Get the limiter declared by a connection's `rate_limit` config, or None if it has none.
+
+    Connections whose configs use the same `key` (defaults to the connection name) share
+    one limiter, e.g. two connections spending the same API key.
+    """
+    if not config:
+        return None
+    limiter = RateLimiter.from_config(name, config)
+    key = config.get("key", name)
+    with _limiters_lock:
+        existing = _limiters.get(key)
+        if existing is None:
+            _limiters[key] = limiter
+            _limiter_configs[key] = config
+            return limiter
+        if _limiter_configs[key] != config:
+            logger.warning(
+                f"{name} and {existing.name} share rate limit key '{key}' with different budgets, "
+                f"using the one of {existing.name}"
+            )
+        return existing
+
+
+def rate_limited(limiter: Optional[RateLimiter], tokens: float = 0) -> ContextManager[RateSlot]:
+    """limiter.limit(tokens), or a no-op when the connection has no limiter"""
+    return limiter.limit(tokens) if limiter else nullcontext(RateSlot(None, tokens))
+
+
+def arate_limited(limiter: Optional[RateLimiter], tokens: float = 0) -> AsyncContextManager[RateSlot]:
+    """limiter.alimit(tokens), or a no-op when the connection has no limiter"""
+    return limiter.alimit(tokens) if limiter else nullcontext(RateSlot(None, tokens))
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Utilisation of every registered limiter"""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {key: limiter.utilisation() for key, limiter in limiters.items()}
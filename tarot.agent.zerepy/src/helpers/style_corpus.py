@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("helpers.style_corpus")
+
+DEFAULT_CORPUS_PATH = os.path.join(".cache", "example_tweets.json")
+# Example accounts don't change style overnight, refetch their tweets once a day
+DEFAULT_CORPUS_TTL = 24 * 60 * 60
+# Tweets kept per account, the default count of get-latest-tweets
+DEFAULT_ACCOUNT_TWEETS = 10
+MAX_FETCH_WORKERS = 8
+
+
+class StyleCorpus:
+    """
+    Latest tweets of example accounts, persisted on disk with a refresh TTL.
+
+    Stored tweets are available as soon as the corpus is created. Stale or missing
+    accounts are refetched concurrently on a background thread. Fetched tweets are
+    merged ahead of the stored ones, newest first, so a fetch returning only tweets
+    new since the last read, or none at all, keeps the previous ones. A fetch that
+    raises or returns None failed and leaves the account stale, to be retried.
+    """
+
+    def __init__(self, path: str = DEFAULT_CORPUS_PATH, ttl: float = DEFAULT_CORPUS_TTL,
+                 max_tweets: int = DEFAULT_ACCOUNT_TWEETS):
+        self.path = path
+        self.ttl = ttl
+        self.max_tweets = max_tweets
+        self._accounts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._refresh: Optional[threading.Thread] = None
+        try:
+            with open(path, "r") as f:
+                self._accounts = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable example tweets file {path}: {e}")
+
+    def tweets(self, accounts: Iterable[str]) -> List[str]:
+        """Stored tweet texts of the given accounts, in account order"""
+        with self._lock:
+            return [text for account in accounts for text in self._accounts.get(account, {}).get("tweets", [])]
+
+    def stale_accounts(self, accounts: Iterable[str]) -> List[str]:
+        """Accounts never fetched or fetched longer than ttl ago"""
+        now = time.time()
+        with self._lock:
+            return [
+                account for account in accounts
+                if now - self._accounts.get(account, {}).get("fetched_at", 0) >= self.ttl
+            ]
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._accounts, f)
+        os.replace(temp_path, self.path)
+
+    def refresh(self, accounts: Iterable[str], fetch: Callable[[str], Optional[List[dict]]]) -> int:
+        """Fetch the accounts' tweets concurrently and persist them, returns how many accounts were updated"""
+        accounts = list(accounts)
+        if not accounts:
+            return 0
+
+        def fetch_account(account: str) -> Optional[List[str]]:
+            try:
+                tweets = fetch(account)
+            except Exception as e:
+                logger.warning(f"Fetching example tweets of {account} failed: {e}")
+                return None
+            if tweets is None:
+                # Actions report their errors by returning None, keep the account stale
+                logger.warning(f"Fetching example tweets of {account} failed")
+                return None
+            return [tweet["text"] for tweet in tweets]
+
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(accounts))) as executor:
+            results = list(executor.map(fetch_account, accounts))
+
+        updated = 0
+        with self._lock:
+            for account, texts in zip(accounts, results):
+                if texts is not None:
+                    stored = self._accounts.get(account, {}).get("tweets", [])
+                    merged = list(dict.fromkeys(texts + stored))[:self.max_tweets]
+                    self._accounts[account] = {"fetched_at": time.time(), "tweets": merged}
+                    updated += 1
+            if updated:
+                self._save()
+        logger.info(f"Refreshed example tweets of {updated}/{len(accounts)} accounts")
+        return updated
+
+    def refresh_in_background(self, accounts: Iterable[str], fetch: Callable[[str], Optional[List[dict]]],
+                              on_done: Optional[Callable[[int], None]] = None) -> bool:
+        """Refresh stale accounts on a background thread, returns whether a refresh was started"""
+        stale = self.stale_accounts(accounts)
+        if not stale:
+            return False
+
+        def run() -> None:
+            updated = self.refresh(stale, fetch)
+            if on_done:
+                on_done(updated)
+
+        with self._lock:
+            if self._refresh and self._refresh.is_alive():
+                return False
+            self._refresh = threading.Thread(target=run, name="example-tweets-refresh", daemon=True)
+            self._refresh.start()
+        return True
@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from web3 import Web3
+
+from src.constants.abi import ERC20_ABI
+from src.constants.networks import KNOWN_TOKENS
+from src.helpers.multicall import NATIVE_TOKEN, _aggregate3, _decode_uint, chain_id
+
+logger = logging.getLogger("helpers.token_registry")
+
+DEFAULT_REGISTRY_PATH = os.path.join(".cache", "token_metadata.json")
+
+
+@lru_cache(maxsize=4096)
+def checksum(address: str) -> str:
+    """Checksummed form of an address, computed once per address"""
+    return Web3.to_checksum_address(address)
+
+
+def _is_native(address: str) -> bool:
+    return address.lower() == NATIVE_TOKEN.lower()
+
+
+class TokenRegistry:
+    """
+    Metadata of ERC-20 tokens (decimals, symbol) keyed by chain id and address.
+
+    Token metadata is immutable, so every value is read from the chain at most once and
+    saved to a JSON file that survives restarts. Contract objects are kept in memory per
+    Web3 instance so they aren't rebuilt for every call.
+    """
+
+    def __init__(self, path: str = DEFAULT_REGISTRY_PATH):
+        self.path = path
+        self._tokens: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._contracts: "weakref.WeakKeyDictionary[Web3, Dict[Tuple[str, int], Any]]" = weakref.WeakKeyDictionary()
+
+    def _load(self) -> None:
+        """Read the registry file on first use, callers hold the lock"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read token registry {self.path}: {e}")
+            return
+        for chain, tokens in stored.items():
+            for address, metadata in tokens.items():
+                self._tokens.setdefault(int(chain), {}).setdefault(address, {}).update(metadata)
+
+    def _save(self) -> None:
+        """Write the registry atomically, callers hold the lock"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({str(chain): tokens for chain, tokens in self._tokens.items()}, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Could not write token registry {self.path}: {e}")
+
+    def _entry(self, chain: int, address: str) -> Dict[str, Any]:
+        self._load()
+        return self._tokens.setdefault(chain, {}).setdefault(checksum(address), {})
+
+    def prewarm(self, chain: int, tokens: Dict[str, Dict[str, Any]]) -> None:
+        """Seed metadata that is already known, e.g. {address: {"decimals": 6, "symbol": "USDC"}}"""
+        with self._lock:
+            for address, metadata in tokens.items():
+                entry = self._entry(chain, address)
+                for field, value in metadata.items():
+                    entry.setdefault(field, value)
+
+    def contract(self, web3: Web3, address: str, abi: List[Dict[str, Any]] = ERC20_ABI):
+        """Contract object for a token, built once per Web3 instance"""
+        address = checksum(address)
+        with self._lock:
+            contracts = self._contracts.setdefault(web3, {})
+            key = (address, id(abi))
+            if key not in contracts:
+                contracts[key] = web3.eth.contract(address=address, abi=abi)
+            return contracts[key]
+
+    def get_decimals(self, web3: Web3, token_addresses: Iterable[str]) -> Dict[str, int]:
+        """decimals() of each token keyed by the addresses as given, unknown ones are read in one multicall"""
+        token_addresses = list(token_addresses)
+        chain = chain_id(web3)
+
+        with self._lock:
+            missing = list(dict.fromkeys(
+                checksum(token) for token in token_addresses
+                if not _is_native(token) and "decimals" not in self._entry(chain, token)
+            ))
+
+        if missing:
+            read = self._read_decimals(web3, missing)
+            with self._lock:
+                for token, decimals in zip(missing, read):
+                    if decimals is None:
+                        logger.warning(f"Could not read decimals of {token}")
+                        continue
+                    self._entry(chain, token)["decimals"] = decimals
+                self._save()
+
+        decimals = {}
+        with self._lock:
+            for token in token_addresses:
+                if _is_native(token):
+                    decimals[token] = 18
+                elif "decimals" in self._entry(chain, token):
+                    decimals[token] = self._entry(chain, token)["decimals"]
+        return decimals
+
+    def _read_decimals(self, web3: Web3, tokens: List[str]) -> List[Optional[int]]:
+        """
+        decimals() of tokens from the chain, in one multicall when there are several.
+
+        A single token, or a chain or RPC without Multicall3, is read with direct calls.
+        """
+        if len(tokens) > 1:
+            call_data = web3.eth.contract(abi=ERC20_ABI).encodeABI(fn_name="decimals")
+            try:
+                results = _aggregate3(web3, [(token, call_data) for token in tokens])
+                return [_decode_uint(web3, data) for data in results]
+            except Exception as e:
+                logger.warning(f"Multicall of decimals failed, reading tokens one by one: {e}")
+
+        decimals = []
+        for token in tokens:
+            try:
+                decimals.append(self.contract(web3, token).functions.decimals().call())
+            except Exception as e:
+                logger.warning(f"decimals() call on {token} failed: {e}")
+                decimals.append(None)
+        return decimals
+
+    def decimals(self, web3: Web3, address: str) -> int:
+        """decimals() of one token"""
+        decimals = self.get_decimals(web3, [address])
+        if address not in decimals:
+            raise ValueError(f"Could not read decimals of {address}")
+        return decimals[address]
+
+    def symbol(self, web3: Web3, address: str) -> Optional[str]:
+        """symbol() of one token, None if the token doesn't implement it"""
+        chain = chain_id(web3)
+        with self._lock:
+            entry = self._entry(chain, address)
+            if "symbol" in entry:
+                return entry["symbol"]
+
+        try:
+            symbol = self.contract(web3, address).functions.symbol().call()
+        except Exception as e:
+            logger.warning(f"Could not read symbol of {address}: {e}")
+            return None
+
+        with self._lock:
+            self._entry(chain, address)["symbol"] = symbol
+            self._save()
+        return symbol
+
+
+# Shared by every EVM connection
+token_registry = TokenRegistry()
+for _chain, _tokens in KNOWN_TOKENS.items():
+    token_registry.prewarm(_chain, _tokens)
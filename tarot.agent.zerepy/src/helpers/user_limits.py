@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger("helpers.user_limits")
+
+# One tarot reading per user every twelve hours
+DEFAULT_WINDOW = 12 * 60 * 60
+DEFAULT_LIMIT = 1
+DEFAULT_LIMITS_PATH = os.path.join(".cache", "user_limits.json")
+DEFAULT_REDIS_PREFIX = "zerepy:limits:"
+
+USER_LIMIT_BACKENDS = ("memory", "file", "redis")
+# Limits span hours, so by default they are kept on disk and survive restarts
+DEFAULT_BACKEND = "file"
+USER_LIMIT_FIELDS = ("window", "limit", "backend", "path", "url", "key")
+
+# Keys idle for longer than this are swept from the in-memory store
+SWEEP_INTERVAL = 60
+
+# Drops hits older than the window, then admits the caller if fewer than `limit` remain.
+# Runs as one script so concurrent callers can't both see room for a single slot
+SLIDING_WINDOW_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+    return '0'
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return tostring(tonumber(oldest[2]) + window - now)
+"""
+
+
+class MemoryLimitStore:
+    """
+    Sliding-window hit log per key, kept in memory.
+
+    hit() checks and records in one step under a lock, so duplicate commands arriving
+    together can't both take the last slot.
+    """
+
+    def __init__(self):
+        self._hits: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def _sweep(self, now: float, window: float) -> None:
+        """Forget keys whose hits have all left the window"""
+        if now - self._swept_at < SWEEP_INTERVAL:
+            return
+        self._swept_at = now
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - window]:
+            del self._hits[key]
+
+    def _save(self) -> None:
+        """Hook for stores that persist their hits"""
+
+    def hit(self, key: str, window: float, limit: int) -> float:
+        """Record a hit for key if it fits the window, returns 0 or the seconds until a slot frees up"""
+        with self._lock:
+            now = time.time()
+            self._sweep(now, window)
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) >= limit:
+                return hits[0] + window - now
+            hits.append(now)
+            self._save()
+            return 0.0
+
+    def undo(self, key: str) -> None:
+        """Drop key's latest hit"""
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits:
+                hits.pop()
+                self._save()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._hits)
+
+
+class FileLimitStore(MemoryLimitStore):
+    """Hits kept in a JSON file as well, so restarting the agent doesn't lift the limits"""
+
+    def __init__(self, path: str = DEFAULT_LIMITS_PATH):
+        super().__init__()
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self._hits = {key: deque(float(hit) for hit in hits) for key, hits in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable user limits file {path}: {e}")
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({key: list(hits) for key, hits in self._hits.items()}, f)
+        os.replace(temp_path, self.path)
+
+
+class RedisLimitStore:
+    """
+    Sliding-window hit log per key in Redis (or KeyDB), shared by every process using it.
+
+    Each key is a sorted set of hit timestamps, checked and updated by a single Lua
+    script on the server's clock, so callers racing each other stay in order.
+
+    Works against anything that speaks the Redis protocol with scripting; an existing
+    client (e.g. a stand-in for tests) can be passed instead of a url.
+    """
+
+    def __init__(self, url: str = None, prefix: str = DEFAULT_REDIS_PREFIX, client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._client = client
+        self._script = self._client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, key: str, window: float, limit: int) -> float:
+        result = self._script(
+            keys=[self.prefix + key],
+            args=[window, limit, uuid.uuid4().hex]
+        )
+        return max(0.0, float(result))
+
+    def undo(self, key: str) -> None:
+        self._client.zpopmax(self.prefix + key)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=f"{self.prefix}*"))
+
+
+_file_stores: Dict[str, FileLimitStore] = {}
+_file_stores_lock = threading.Lock()
+
+
+def create_limit_store(config: Dict[str, Any]):
+    """Build the store a `reading_limit`-style config block asks for, a file by default"""
+    backend = config.get("backend", DEFAULT_BACKEND)
+    if backend == "redis":
+        return RedisLimitStore(config.get("url", "redis://127.0.0.1:6379"))
+    if backend == "file":
+        # Limiters kept in the same file share one store, so their writes don't overwrite each other
+        path = os.path.realpath(config.get("path", DEFAULT_LIMITS_PATH))
+        with _file_stores_lock:
+            if path not in _file_stores:
+                _file_stores[path] = FileLimitStore(path)
+            return _file_stores[path]
+    return MemoryLimitStore()
+
+
+class UserLimiter:
+    """
+    Per-user budget of an action, e.g. `limit` readings per `window` seconds.
+
+    Ingress paths (Telegram, Discord, Farcaster, HTTP) share a limiter by name and
+    prefix user ids with their platform, so a user is throttled however they ask.
+    """
+
+    def __init__(self, name: str, store, window: float = DEFAULT_WINDOW, limit: int = DEFAULT_LIMIT):
+        self.name = name
+        self.window = window
+        self.limit = limit
+        self._store = store
+        self._allowed = 0
+        self._denied = 0
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> "UserLimiter":
+        """Build a limiter from a `reading_limit`-style config block"""
+        if not isinstance(config, dict):
+            raise ValueError(f"{name} limit must be a dictionary")
+        unknown = [key for key in config if key not in USER_LIMIT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown user limit fields: {', '.join(unknown)}")
+        if config.get("backend", DEFAULT_BACKEND) not in USER_LIMIT_BACKENDS:
+            raise ValueError(f"User limit backend must be one of: {', '.join(USER_LIMIT_BACKENDS)}")
+        window = config.get("window", DEFAULT_WINDOW)
+        if not isinstance(window, (int, float)) or window <= 0:
+            raise ValueError("User limit window must be a positive number of seconds")
+        limit = config.get("limit", DEFAULT_LIMIT)
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("User limit must be a positive integer")
+        return cls(name, create_limit_store(config), window, limit)
+
+    def acquire(self, user_key: str) -> float:
+        """Take a slot for the user, returns 0 if allowed or the seconds until they may try again"""
+        wait = self._store.hit(f"{self.name}:{user_key}", self.window, self.limit)
+        if wait:
+            self._denied += 1
+        else:
+            self._allowed += 1
+        return wait
+
+    async def aacquire(self, user_key: str) -> float:
+        """Async version of acquire, store round trips run off the event loop"""
+        return await asyncio.to_thread(self.acquire, user_key)
+
+    def release(self, user_key: str) -> None:
+        """Give back the user's latest slot, e.g. when the action it paid for failed"""
+        self._store.undo(f"{self.name}:{user_key}")
+
+    async def arelease(self, user_key: str) -> None:
+        """Async version of release"""
+        await asyncio.to_thread(self.release, user_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window,
+            "limit": self.limit,
+            "backend": type(self._store).__name__,
+            "allowed": self._allowed,
+            "denied": self._denied
+        }
+
+
+_user_limiters: Dict[str, UserLimiter] = {}
+_user_limiters_lock = threading.Lock()
+
+
+def get_user_limiter(name: str, config: Optional[Dict[str, Any]] = None) -> UserLimiter:
+    """
+    Get the shared limiter called `key` (defaults to name), creating it from config.
+
+    The first config registered under a key wins, so every ingress path asking for
+    "readings" throttles against the same store.
+    """
+    config = config or {}
+    key = config.get("key", name) if isinstance(config, dict) else name
+    with _user_limiters_lock:
+        limiter = _user_limiters.get(key)
+        if limiter is None:
+            limiter = _user_limiters[key] = UserLimiter.from_config(key, config)
+        return limiter
+
+
+def find_user_limiter(name: str) -> Optional[UserLimiter]:
+    """A registered limiter, or None"""
+    with _user_limiters_lock:
+        return _user_limiters.get(name)
+
+
+def user_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every registered user limiter"""
+    with _user_limiters_lock:
+        limiters = dict(_user_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request
 
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
@@ -8,6 +8,13 @@ import signal
 import threading
 from pathlib import Path
 from src.cli import ZerePyCLI
+from src.connection_manager import LLM_PROVIDERS
+from src.helpers.cache import shared_cache
+from src.helpers.image_store import image_store
+from src.helpers.llm_cache import llm_cache
+from src.helpers.rate_limiter import rate_limiter_stats
+from src.helpers.user_limits import find_user_limiter, user_limiter_stats
+from src.server.jobs import JobQueue
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("server/app")
@@ -18,6 +25,23 @@ class ActionRequest(BaseModel):
     action: str
     params: Optional[List[str]] = []
 
+class JobRequest(BaseModel):
+    """Request model for queued agent actions"""
+    connection: str
+    action: str
+    params: Optional[List[str]] = []
+    webhook_url: Optional[str] = None
+
+class OutboxRequest(BaseModel):
+    """Request model for queued posts"""
+    platform: str
+    action: str
+    params: Dict[str, Any] = {}
+    send_at: Optional[float] = None
+
+# Longest a GET /jobs/{id} request may block waiting for the job to finish
+MAX_JOB_WAIT = 60
+
 class ConfigureRequest(BaseModel):
     """Request model for configuring connections"""
     connection: str
@@ -30,6 +54,15 @@ class ServerState:
         self.agent_running = False
         self.agent_task = None
         self._stop_event = threading.Event()
+        self.jobs = JobQueue(self._run_action)
+
+    async def _run_action(self, connection: str, action: str, params: List[str]):
+        """Run a single agent action, used by the job queue workers"""
+        if not self.cli.agent:
+            raise ValueError("No agent loaded")
+        return await self.cli.agent.aperform_action(
+            connection=connection, action=action, params=params, raise_errors=True
+        )
 
     def _run_agent_loop(self):
         """Run agent loop in a separate thread"""
@@ -124,11 +157,16 @@ class ZerePyServer:
                 raise HTTPException(status_code=400, detail="No agent loaded")
             
             try:
+                # Only report what is known, listing must not construct every lazy connection
+                manager = self.state.cli.agent.connection_manager
+                health = manager.health.status()
+                loaded = manager.connections.loaded()
                 connections = {}
-                for name, conn in self.state.cli.agent.connection_manager.connections.items():
+                for name in manager.connections:
                     connections[name] = {
-                        "configured": conn.is_configured(),
-                        "is_llm_provider": conn.is_llm_provider
+                        "configured": health[name]["configured"] if name in health else None,
+                        "is_llm_provider": name in LLM_PROVIDERS,
+                        "loaded": name in loaded
                     }
                 return {"connections": connections}
             except Exception as e:
@@ -141,8 +179,7 @@ class ZerePyServer:
                 raise HTTPException(status_code=400, detail="No agent loaded")
             
             try:
-                result = await asyncio.to_thread(
-                    self.state.cli.agent.perform_action,
+                result = await self.state.cli.agent.aperform_action(
                     connection=action_request.connection,
                     action=action_request.action,
                     params=action_request.params
@@ -151,6 +188,44 @@ class ZerePyServer:
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
 
+        @self.app.post("/jobs", status_code=202)
+        async def submit_job(job_request: JobRequest):
+            """Queue an agent action and return its job id right away"""
+            if not self.state.cli.agent:
+                raise HTTPException(status_code=400, detail="No agent loaded")
+
+            try:
+                job = await self.state.jobs.submit(
+                    job_request.connection,
+                    job_request.action,
+                    job_request.params,
+                    webhook_url=job_request.webhook_url
+                )
+            except asyncio.QueueFull:
+                raise HTTPException(status_code=503, detail="Job queue is full")
+            return {"job_id": job.id, "status": job.status}
+
+        @self.app.get("/jobs")
+        async def job_metrics():
+            """Queue depth and worker utilisation of the job queue"""
+            return self.state.jobs.metrics()
+
+        @self.app.get("/jobs/{job_id}")
+        async def get_job(job_id: str, wait: float = 0):
+            """Get a job, waiting up to `wait` seconds for it to finish"""
+            job = await self.state.jobs.wait(job_id, min(max(wait, 0), MAX_JOB_WAIT))
+            if not job:
+                raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+            return job.to_dict()
+
+        @self.app.delete("/jobs/{job_id}")
+        async def cancel_job(job_id: str):
+            """Cancel a queued or running job"""
+            job = self.state.jobs.cancel(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+            return job.to_dict()
+
         @self.app.post("/agent/start")
         async def start_agent():
             """Start the agent loop"""
@@ -179,7 +254,7 @@ class ZerePyServer:
                 raise HTTPException(status_code=400, detail="No agent loaded")
             
             try:
-                connection = self.state.cli.agent.connection_manager.connections.get(name)
+                connection = await asyncio.to_thread(self.state.cli.agent.connection_manager.connections.get, name)
                 if not connection:
                     raise HTTPException(status_code=404, detail=f"Connection {name} not found")
                 
@@ -192,6 +267,113 @@ class ZerePyServer:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/tarot/context")
+        async def tarot_context():
+            """Age and status of the precomputed tarot reading context"""
+            if not self.state.cli.agent:
+                raise HTTPException(status_code=400, detail="No agent loaded")
+
+            # A first lookup constructs the connection, keep that off the loop
+            connection = await asyncio.to_thread(
+                self.state.cli.agent.connection_manager.connections.get, "tarot-reader"
+            )
+            if not connection:
+                raise HTTPException(status_code=404, detail="Connection tarot-reader not found")
+            return await connection.get_context_status()
+
+        @self.app.post("/telegram/webhook")
+        async def telegram_webhook(
+            request: Request,
+            x_telegram_bot_api_secret_token: Optional[str] = Header(None)
+        ):
+            """Receive a Telegram update and handle its command in-process"""
+            if not self.state.cli.agent:
+                raise HTTPException(status_code=400, detail="No agent loaded")
+
+            connection = await asyncio.to_thread(self.state.cli.agent.connection_manager.connections.get, "telegram")
+            if not connection:
+                raise HTTPException(status_code=404, detail="Connection telegram not found")
+            if not connection.verify_webhook_secret(x_telegram_bot_api_secret_token):
+                raise HTTPException(status_code=403, detail="Unauthorized")
+
+            # Acknowledge right away, the command runs on the shared event loop
+            connection.handle_update(await request.json())
+            return {"status": "ok"}
+
+        @self.app.get("/cache")
+        async def cache_stats():
+            """Hit/miss counters of the shared connection cache"""
+            return shared_cache.stats()
+
+        @self.app.get("/cache/llm")
+        async def llm_cache_stats():
+            """Hit/miss counters of the LLM response cache"""
+            return llm_cache.stats()
+
+        @self.app.get("/cache/images")
+        async def image_store_stats():
+            """Size of the downloaded image store"""
+            return image_store.stats()
+
+        @self.app.get("/rate-limits")
+        async def rate_limits():
+            """Current budget utilisation of every LLM rate limiter"""
+            return rate_limiter_stats()
+
+        @self.app.get("/user-limits")
+        async def user_limits():
+            """Allowed and denied counters of every per-user limiter"""
+            return user_limiter_stats()
+
+        @self.app.post("/user-limits/{name}/{user_key}")
+        async def acquire_user_limit(name: str, user_key: str):
+            """Take a slot of a per-user limit, for ingress paths outside the agent"""
+            limiter = find_user_limiter(name)
+            if not limiter:
+                raise HTTPException(status_code=404, detail=f"User limit {name} not found")
+            retry_after = await limiter.aacquire(user_key)
+            return {"allowed": not retry_after, "retry_after": round(retry_after)}
+
+        def get_outbox():
+            if not self.state.cli.agent:
+                raise HTTPException(status_code=400, detail="No agent loaded")
+            if not self.state.cli.agent.outbox:
+                raise HTTPException(status_code=404, detail="Outbox not configured")
+            return self.state.cli.agent.outbox
+
+        @self.app.get("/outbox")
+        async def outbox_status(limit: int = 50):
+            """Posting budgets, post counts and the next queued posts"""
+            outbox = get_outbox()
+            return {**await asyncio.to_thread(outbox.stats), "pending": await asyncio.to_thread(outbox.pending, limit)}
+
+        @self.app.post("/outbox", status_code=202)
+        async def queue_post(post_request: OutboxRequest):
+            """Queue a post, it is sent at its send time once the platform's budget allows"""
+            outbox = get_outbox()
+            try:
+                post_id = await asyncio.to_thread(
+                    outbox.enqueue, post_request.platform, post_request.action,
+                    post_request.params, post_request.send_at
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {"post_id": post_id, "duplicate": post_id is None}
+
+        @self.app.delete("/outbox/{post_id}")
+        async def cancel_post(post_id: int):
+            """Cancel a queued post"""
+            if not await asyncio.to_thread(get_outbox().cancel, post_id):
+                raise HTTPException(status_code=404, detail=f"No queued post {post_id}")
+            return {"post_id": post_id, "status": "cancelled"}
+
+        @self.app.get("/health")
+        async def connection_health():
+            """Cached health check result of every checked connection"""
+            if not self.state.cli.agent:
+                raise HTTPException(status_code=400, detail="No agent loaded")
+            return self.state.cli.agent.connection_manager.health.status()
+
         @self.app.get("/connections/{name}/status")
         async def connection_status(name: str):
             """Get configuration status of a connection"""
@@ -199,13 +381,14 @@ class ZerePyServer:
                 raise HTTPException(status_code=400, detail="No agent loaded")
                 
             try:
-                connection = self.state.cli.agent.connection_manager.connections.get(name)
+                manager = self.state.cli.agent.connection_manager
+                connection = await asyncio.to_thread(manager.connections.get, name)
                 if not connection:
                     raise HTTPException(status_code=404, detail=f"Connection {name} not found")
                     
                 return {
                     "name": name,
-                    "configured": connection.is_configured(verbose=True),
+                    "configured": await asyncio.to_thread(manager.health.check, name, verbose=True),
                     "is_llm_provider": connection.is_llm_provider
                 }
                 
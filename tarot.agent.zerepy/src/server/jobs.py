@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.helpers.http import get_session
+
+logger = logging.getLogger("server/jobs")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job:
+    """A single queued agent action"""
+
+    def __init__(self, connection: str, action: str, params: List[Any], webhook_url: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.connection = connection
+        self.action = action
+        self.params = params
+        self.webhook_url = webhook_url
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "connection": self.connection,
+            "action": self.action,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    Runs agent actions in the background with a bounded number of workers.
+
+    Jobs are submitted with submit() and looked up with get()/wait(). Finished jobs are
+    kept around (up to max_finished) so that clients can collect their results, and
+    can optionally be pushed to a webhook URL when they complete.
+    """
+
+    def __init__(self, runner: Callable[[str, str, List[Any]], Awaitable[Any]], max_workers: int = 4,
+                 max_queued: int = 1000, max_finished: int = 1000, webhook_timeout: float = 10):
+        self._runner = runner
+        self._max_workers = max_workers
+        self._max_finished = max_finished
+        self._webhook_timeout = webhook_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        self._counts = {SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+        self._wait_times: List[float] = []
+        self._run_times: List[float] = []
+        # Pending webhook calls, referenced so they aren't garbage collected mid-flight
+        self._notifications: Set[asyncio.Task] = set()
+
+    def _ensure_workers(self) -> None:
+        """Start the worker tasks on the running event loop the first time they're needed"""
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self._max_workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def submit(self, connection: str, action: str, params: List[Any],
+                     webhook_url: Optional[str] = None) -> Job:
+        """Queue an action, raises asyncio.QueueFull when the queue is at capacity"""
+        self._ensure_workers()
+        job = Job(connection, action, params, webhook_url)
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        logger.info(f"Queued job {job.id}: {connection}.{action}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Wait up to timeout seconds for a job to finish, then return it whatever its state"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job. Queued jobs never run; running jobs are cancelled, although a blocking
+        action that already started in a worker thread runs to completion.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        if job.status == RUNNING and job.task:
+            job.cancel_requested = True
+            job.task.cancel()
+        else:
+            self._finish(job, CANCELLED)
+        return job
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, worker utilisation and job counters"""
+        def average(values: List[float]) -> Optional[float]:
+            return round(sum(values) / len(values), 3) if values else None
+
+        return {
+            "queued": sum(1 for job in self._jobs.values() if job.status == QUEUED),
+            "running": self._running,
+            "workers": self._max_workers,
+            "succeeded": self._counts[SUCCEEDED],
+            "failed": self._counts[FAILED],
+            "cancelled": self._counts[CANCELLED],
+            "avg_wait_seconds": average(self._wait_times),
+            "avg_run_seconds": average(self._run_times)
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != QUEUED:
+                    continue
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Job worker error on {job.id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._record(self._wait_times, job.started_at - job.created_at)
+        self._running += 1
+        job.task = asyncio.create_task(self._runner(job.connection, job.action, job.params))
+        try:
+            result = await job.task
+        except asyncio.CancelledError:
+            if not job.cancel_requested:
+                raise
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            self._finish(job, FAILED, error=str(e))
+        else:
+            self._finish(job, SUCCEEDED, result=result)
+        finally:
+            self._running -= 1
+            self._record(self._run_times, time.time() - job.started_at)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.task = None
+        job.done.set()
+        self._counts[status] += 1
+        self._forget_finished()
+        # Every terminal state is pushed, including jobs cancelled before they ran
+        if job.webhook_url:
+            notification = asyncio.get_running_loop().create_task(self._notify(job))
+            self._notifications.add(notification)
+            notification.add_done_callback(self._notifications.discard)
+
+    def _forget_finished(self) -> None:
+        """Drop the oldest finished jobs once more than max_finished are kept"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self._max_finished)]:
+            del self._jobs[job_id]
+
+    async def _notify(self, job: Job) -> None:
+        """POST the finished job to its webhook URL"""
+        try:
+            response = await asyncio.to_thread(
+                get_session().post, job.webhook_url, json=job.to_dict(), timeout=self._webhook_timeout
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Webhook for job {job.id} failed: {e}")
+
+    @staticmethod
+    def _record(values: List[float], value: float, keep: int = 100) -> None:
+        values.append(value)
+        del values[:-keep]
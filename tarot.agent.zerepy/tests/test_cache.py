@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.helpers.cache import TTLCache, make_cache_key
+
+
+def test_make_cache_key_ignores_param_order():
+    assert make_cache_key("allora", "get-inference", {"a": 1, "b": 2}) == \
+        make_cache_key("allora", "get-inference", {"b": 2, "a": 1})
+
+
+def test_value_is_served_until_it_expires():
+    cache = TTLCache()
+    calls = []
+    load = lambda: calls.append(1) or len(calls)
+    assert cache.get_or_call("key", 0.05, load) == 1
+    assert cache.get_or_call("key", 0.05, load) == 1
+    time.sleep(0.06)
+    assert cache.get_or_call("key", 0.05, load) == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    calls = []
+    barrier = threading.Barrier(10)
+    results = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    def get():
+        barrier.wait()
+        results.append(cache.get_or_call("key", 60, load))
+
+    threads = [threading.Thread(target=get) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ["value"] * 10
+    assert cache.stats()["misses"] == 1
+
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache()
+
+    def fail():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_call("key", 60, fail)
+    assert cache.get_or_call("key", 60, lambda: "value") == "value"
+    assert cache.stats()["inflight"] == 0
+
+
+def test_async_waiters_share_one_load():
+    cache = TTLCache()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_call("key", 60, load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_invalidate_forces_a_reload():
+    cache = TTLCache()
+    cache.get_or_call("key", 60, lambda: 1)
+    cache.invalidate("key")
+    assert cache.get_or_call("key", 60, lambda: 2) == 2
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
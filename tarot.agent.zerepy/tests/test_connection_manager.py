@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from src.connection_manager import ConnectionManager
+from src.connections.base_connection import Action, ActionParameter
+
+
+class FakeConnection:
+    actions = {
+        "reply-to-tweet": Action(
+            name="reply-to-tweet",
+            parameters=[
+                ActionParameter("tweet_id", True, str, "ID of the tweet to reply to"),
+                ActionParameter("message", True, str, "Reply message content")
+            ],
+            description="Reply to an existing tweet"
+        )
+    }
+
+    def __init__(self, config):
+        self.config = config
+
+    def perform_action(self, action_name, kwargs):
+        return kwargs
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = ConnectionManager([{"name": "twitter"}, {"name": "openai"}])
+    builds = []
+
+    def create_connection(config):
+        builds.append(config["name"])
+        if config["name"] == "twitter":
+            time.sleep(0.3)
+        return FakeConnection(config)
+
+    monkeypatch.setattr(manager, "_create_connection", create_connection)
+    manager.builds = builds
+    return manager
+
+
+def test_connection_is_built_once_on_first_lookup(manager):
+    assert "twitter" in manager.connections
+    assert manager.builds == []
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.connections["twitter"])) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager.builds == ["twitter"]
+    assert all(connection is results[0] for connection in results)
+
+
+def test_slow_build_does_not_block_other_lookups(manager):
+    thread = threading.Thread(target=lambda: manager.connections["twitter"])
+    thread.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert manager.connections["openai"].config["name"] == "openai"
+    assert time.monotonic() - started < 0.2
+    thread.join()
+
+
+def test_connection_failing_to_build_is_dropped(manager, monkeypatch):
+    monkeypatch.setattr(manager, "_create_connection", lambda config: None)
+    with pytest.raises(KeyError):
+        manager.connections["openai"]
+    assert "openai" not in manager.connections
+
+
+def test_params_can_be_passed_by_name(manager, monkeypatch):
+    monkeypatch.setattr(manager.health, "is_configured", lambda name: True)
+    params = {"message": "the tower", "tweet_id": "1"}
+    assert manager.perform_action("openai", "reply-to-tweet", params) == params
+    assert manager.perform_action("openai", "reply-to-tweet", ["1", "the tower"]) == params
+    assert manager.perform_action("openai", "reply-to-tweet", {"message": "the tower"}) is None
+    assert manager.perform_action("openai", "reply-to-tweet", {**params, "media_id": "2"}) is None
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from src.helpers.health import HealthChecker
+
+
+class FakeConnection:
+    def __init__(self, configured=True, delay=0.0):
+        self.configured = configured
+        self.delay = delay
+        self.calls = 0
+
+    def is_configured(self, verbose=False):
+        self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.configured, Exception):
+            raise self.configured
+        return self.configured
+
+
+def test_concurrent_first_callers_share_one_probe():
+    connection = FakeConnection(delay=0.05)
+    checker = HealthChecker({"twitter": connection})
+    barrier = threading.Barrier(8)
+    results = []
+
+    def check():
+        barrier.wait()
+        results.append(checker.is_configured("twitter"))
+
+    threads = [threading.Thread(target=check) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 8
+    assert connection.calls == 1
+
+
+def test_cached_result_is_served_without_probing():
+    connection = FakeConnection()
+    checker = HealthChecker({"twitter": connection})
+    assert checker.is_configured("twitter")
+    assert checker.is_configured("twitter")
+    assert connection.calls == 1
+
+
+def test_expired_result_is_served_while_reprobed():
+    connection = FakeConnection()
+    checker = HealthChecker({"twitter": connection}, ttl=0.01)
+    assert checker.is_configured("twitter")
+    time.sleep(0.02)
+    connection.configured = False
+    assert checker.is_configured("twitter")
+    time.sleep(0.05)
+    assert not checker.is_configured("twitter")
+
+
+def test_failing_probe_counts_as_not_configured():
+    checker = HealthChecker({"twitter": FakeConnection(RuntimeError("down"))})
+    assert not checker.is_configured("twitter")
+    assert checker.status()["twitter"]["error"] == "down"
+
+
+def test_check_all_probes_every_connection():
+    checker = HealthChecker({"twitter": FakeConnection(), "discord": FakeConnection(False)})
+    assert checker.check_all(timeout=1) == {"twitter": True, "discord": False}
+
+
+def test_invalidate_forces_a_new_probe():
+    connection = FakeConnection()
+    checker = HealthChecker({"twitter": connection})
+    checker.is_configured("twitter")
+    checker.invalidate("twitter")
+    checker.is_configured("twitter")
+    assert connection.calls == 2
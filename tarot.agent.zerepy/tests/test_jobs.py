@@ -0,0 +1,49 @@
+import asyncio
+import functools
+from types import SimpleNamespace
+
+from src.agent import ZerePyAgent
+from src.connection_manager import ConnectionManager
+from src.server.jobs import FAILED, SUCCEEDED, JobQueue
+
+
+def manager_agent():
+    """The agent's action path over a connection manager with no connections"""
+    agent = SimpleNamespace(connection_manager=ConnectionManager([]))
+    return SimpleNamespace(aperform_action=functools.partial(ZerePyAgent.aperform_action, agent))
+
+
+def run_job(runner, connection="twitter", action="post-tweet", params=("the tower",)):
+    async def main():
+        jobs = JobQueue(runner)
+        job = await jobs.submit(connection, action, list(params))
+        await jobs.wait(job.id, 5)
+        return job, jobs.metrics()
+    return asyncio.run(main())
+
+
+def test_failed_action_marks_the_job_failed():
+    agent = manager_agent()
+
+    async def runner(connection, action, params):
+        return await agent.aperform_action(connection=connection, action=action, params=params, raise_errors=True)
+
+    job, metrics = run_job(runner)
+    assert job.status == FAILED
+    assert "twitter" in job.error
+    assert metrics["failed"] == 1
+
+
+def test_action_errors_give_none_without_raise_errors():
+    agent = manager_agent()
+    assert asyncio.run(agent.aperform_action(connection="twitter", action="post-tweet", params=[])) is None
+
+
+def test_successful_action_stores_its_result():
+    async def runner(connection, action, params):
+        return {"posted": params[0]}
+
+    job, metrics = run_job(runner)
+    assert job.status == SUCCEEDED
+    assert job.result == {"posted": "the tower"}
+    assert metrics["succeeded"] == 1
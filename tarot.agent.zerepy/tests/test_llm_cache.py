@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from src.helpers import llm_cache as llm_cache_module
+from src.helpers.llm_cache import LLMResponseCache, cached_generation, make_llm_cache_key
+
+
+def test_key_normalises_whitespace_in_prompts():
+    assert make_llm_cache_key("openai", "gpt-4", "be  mystical", "draw\n a card ") == \
+        make_llm_cache_key("openai", "gpt-4", "be mystical", "draw a card")
+
+
+def test_key_includes_generation_options():
+    plain = make_llm_cache_key("groq", "llama", "system", "prompt")
+    assert make_llm_cache_key("groq", "llama", "system", "prompt", options={}) == plain
+    assert make_llm_cache_key("groq", "llama", "system", "prompt", options={"temperature": 0.2}) != \
+        make_llm_cache_key("groq", "llama", "system", "prompt", options={"temperature": 0.9})
+
+
+def test_cached_generation_keys_on_kwargs(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "llm_cache", LLMResponseCache(str(tmp_path / "cache.sqlite")))
+    calls = []
+
+    @cached_generation
+    def generate_text(self, prompt, system_prompt, model=None, **kwargs):
+        calls.append(kwargs)
+        return f"response {len(calls)}"
+
+    connection = SimpleNamespace(config={"name": "groq", "model": "llama"}, response_cache_ttl=60)
+    assert generate_text(connection, "prompt", "system", temperature=0.2) == "response 1"
+    assert generate_text(connection, "prompt", "system", temperature=0.2) == "response 1"
+    assert generate_text(connection, "prompt", "system", temperature=0.9) == "response 2"
+
+
+def test_disk_tier_survives_restarts(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    LLMResponseCache(path).set("key", "the tower", 60)
+    cache = LLMResponseCache(path)
+    assert cache.get("key") == "the tower"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_response_is_a_miss(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"))
+    cache.set("key", "the tower", -1)
+    assert cache.get("key") is None
+
+
+def test_disk_tier_is_trimmed_by_size_only_when_full(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_disk_bytes=1000)
+    cache.set("first", "a" * 100, 60)
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    for i in range(8):
+        cache.set(f"key{i}", "b" * 100, 60)
+    assert not any("OVER" in statement for statement in statements)
+
+    cache.set("big", "c" * 400, 60)
+    assert any("OVER" in statement for statement in statements)
+    assert cache.stats()["disk_bytes"] <= 900
+    cache._memory.clear()
+    assert cache.get("big") is not None
+    assert cache.get("first") is None
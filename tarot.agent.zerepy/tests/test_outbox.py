@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from src.helpers import outbox as outbox_module
+from src.helpers.outbox import Outbox, content_hash
+
+
+class FakeTwitter:
+    def __init__(self):
+        self.posts = []
+        self.uploads = []
+        self.error = None
+
+    def post_tweet(self, message, **kwargs):
+        if self.error:
+            raise self.error
+        self.posts.append(message)
+        return {"data": {"id": str(len(self.posts))}}
+
+    def upload_media(self, image_path):
+        self.uploads.append(image_path)
+        return "media-1"
+
+    def post_tweet_with_image(self, message, image_path=None, media_id=None, **kwargs):
+        self.posts.append((message, media_id))
+        return {"data": {"id": str(len(self.posts))}}
+
+
+class FakeHealth:
+    def is_configured(self, name):
+        return True
+
+
+class FakeConnectionManager:
+    def __init__(self):
+        self.connections = {"twitter": FakeTwitter()}
+        self.health = FakeHealth()
+
+
+@pytest.fixture
+def manager():
+    return FakeConnectionManager()
+
+
+@pytest.fixture
+def outbox(tmp_path, manager):
+    return Outbox(manager, path=str(tmp_path / "outbox.sqlite"),
+                  budgets={"twitter": {"posts_per_hour": 3600, "burst": 2}})
+
+
+def test_content_hash_normalises_whitespace():
+    assert content_hash("twitter", "post-tweet", {"message": "the  tower\n"}) == \
+        content_hash("twitter", "post-tweet", {"message": "the tower"})
+
+
+def test_duplicate_content_is_dropped(outbox):
+    assert outbox.enqueue("twitter", "post-tweet", {"message": "the tower"}) is not None
+    assert outbox.enqueue("twitter", "post-tweet", {"message": "the  tower"}) is None
+    assert outbox.stats()["duplicates_dropped"] == 1
+
+
+def test_unknown_action_is_rejected(outbox):
+    with pytest.raises(ValueError):
+        outbox.enqueue("twitter", "delete-tweet", {"tweet_id": "1"})
+
+
+def test_due_posts_are_sent_within_the_budget(outbox, manager):
+    for card in ("the tower", "the star", "the moon"):
+        outbox.enqueue("twitter", "post-tweet", {"message": card}, send_at=time.time())
+    outbox.run_once()
+    assert manager.connections["twitter"].posts == ["the tower", "the star"]
+    assert [post["params"]["message"] for post in outbox.pending()] == ["the moon"]
+
+
+def test_cancelled_post_is_not_sent(outbox, manager):
+    post_id = outbox.enqueue("twitter", "post-tweet", {"message": "the tower"}, send_at=time.time())
+    assert outbox.cancel(post_id)
+    outbox.run_once()
+    assert manager.connections["twitter"].posts == []
+    assert outbox.get(post_id)["status"] == "cancelled"
+
+
+def test_rate_limited_post_waits_for_the_reset(outbox, manager):
+    error = RuntimeError("rate limited")
+    error.retry_after = 900
+    manager.connections["twitter"].error = error
+    post_id = outbox.enqueue("twitter", "post-tweet", {"message": "the tower"}, send_at=time.time())
+    outbox.run_once()
+    post = outbox.get(post_id)
+    assert post["status"] == "queued"
+    assert post["attempts"] == 1
+    assert post["send_at"] == pytest.approx(time.time() + 900, abs=5)
+
+
+def test_interrupted_send_is_failed_on_restart(tmp_path, manager):
+    path = str(tmp_path / "outbox.sqlite")
+    post_id = Outbox(manager, path=path).enqueue("twitter", "post-tweet", {"message": "the tower"})
+    Outbox(manager, path=path)._claim(post_id)
+    assert Outbox(manager, path=path).get(post_id)["status"] == "failed"
+
+
+def test_evicted_image_is_downloaded_again(outbox, manager, tmp_path, monkeypatch):
+    fetched = tmp_path / "image.jpg"
+    fetched.write_bytes(b"jpeg")
+    monkeypatch.setattr(outbox_module.image_store, "fetch", lambda url: str(fetched))
+    post_id = outbox.enqueue("twitter", "post-tweet-with-image", {
+        "message": "the tower", "image_path": str(tmp_path / "evicted.jpg"), "image_url": "https://example.com/a.jpg"
+    }, send_at=time.time())
+    outbox.run_once()
+    twitter = manager.connections["twitter"]
+    assert twitter.uploads == [str(fetched)]
+    assert twitter.posts == [("the tower", "media-1")]
+    assert outbox.get(post_id)["status"] == "sent"
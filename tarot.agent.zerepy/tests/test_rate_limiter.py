@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from src.helpers.rate_limiter import RateLimiter, TokenBucket, estimate_tokens, get_rate_limiter, retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, response):
+        super().__init__("request failed")
+        self.response = response
+
+
+def test_bucket_spreads_callers_past_its_capacity():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_bucket_refund_is_capped_at_capacity():
+    bucket = TokenBucket(rate=1, capacity=5)
+    bucket.reserve(3)
+    bucket.refund(10)
+    assert bucket.available() == pytest.approx(5)
+
+
+def test_bucket_rejects_non_positive_settings():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
+
+
+def test_retry_after_reads_429_headers():
+    assert retry_after(FakeHTTPError(FakeResponse(429, {"retry-after": "7"}))) == 7.0
+    assert retry_after(FakeHTTPError(FakeResponse(429, {"retry-after-ms": "1500"}))) == 1.5
+    assert retry_after(FakeHTTPError(FakeResponse(429))) == 1.0
+    assert retry_after(FakeHTTPError(FakeResponse(500, {"retry-after": "7"}))) is None
+    assert retry_after(ValueError("no response")) is None
+
+
+def test_retry_after_prefers_the_error_own_wait():
+    error = RuntimeError("rate limited")
+    error.retry_after = 42
+    assert retry_after(error) == 42.0
+
+
+def test_limiter_pauses_after_a_429():
+    limiter = RateLimiter("test")
+    with pytest.raises(FakeHTTPError):
+        with limiter.limit():
+            raise FakeHTTPError(FakeResponse(429, {"retry-after": "0.1"}))
+
+    started = time.monotonic()
+    with limiter.limit():
+        pass
+    assert time.monotonic() - started >= 0.09
+
+
+def test_limiter_from_config_validates_fields():
+    assert RateLimiter.from_config("test", {"requests_per_minute": 60}).requests_per_minute == 60
+    with pytest.raises(ValueError):
+        RateLimiter.from_config("test", {"requests_per_hour": 60})
+    with pytest.raises(ValueError):
+        RateLimiter.from_config("test", {"max_concurrency": 0})
+
+
+def test_estimate_tokens_counts_every_text():
+    assert estimate_tokens("a" * 400, None, "b" * 400) == estimate_tokens("") + 200
+
+
+def test_async_callers_respect_max_concurrency():
+    limiter = RateLimiter("test", max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.alimit():
+            peak = max(peak, limiter.utilisation()["concurrency"]["in_flight"])
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.utilisation()["concurrency"]["in_flight"] == 0
+
+
+def test_async_waiter_is_woken_by_a_thread():
+    limiter = RateLimiter("test", max_concurrency=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with limiter.limit():
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    entered.wait()
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        started = time.monotonic()
+        async with limiter.alimit():
+            return time.monotonic() - started
+
+    assert asyncio.run(main()) < 1
+    thread.join()
+
+
+def test_cancelled_waiter_hands_its_slot_on():
+    limiter = RateLimiter("test", max_concurrency=1)
+
+    async def main():
+        holder = asyncio.Event()
+
+        async def hold():
+            async with limiter.alimit():
+                await holder.wait()
+
+        async def wait_for_slot():
+            async with limiter.alimit():
+                return True
+
+        holding = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(wait_for_slot())
+        waiting = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0)
+        # Cancel the first waiter after the release woke it, before it took the slot
+        holder.set()
+        await holding
+        cancelled.cancel()
+        return await asyncio.wait_for(waiting, 1)
+
+    assert asyncio.run(main())
+
+
+def test_shared_key_with_different_budgets_warns(caplog):
+    with caplog.at_level(logging.WARNING, logger="helpers.rate_limiter"):
+        first = get_rate_limiter("openai", {"key": "test-shared", "requests_per_minute": 60})
+        second = get_rate_limiter("together", {"key": "test-shared", "requests_per_minute": 600})
+    assert second is first
+    assert "different budgets" in caplog.text
@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from src.connection_manager import ConnectionManager
+from src.connections.base_connection import Action, ActionParameter
+from src.server.app import ZerePyServer
+
+GET_READING_IMAGE = Action(
+    name="get-reading-image",
+    parameters=[
+        ActionParameter("job_id", True, str, "Image job id returned by perform-reading-pipelined"),
+        ActionParameter("wait", False, float, "Seconds to wait for the image if it isn't ready yet")
+    ],
+    description="Get the status and image of a pipelined reading"
+)
+
+
+class FakeAgent:
+    """Stands in for a loaded agent, validating params like the connection manager does"""
+
+    name = "tarot"
+
+    def __init__(self):
+        self.calls = []
+
+    async def aperform_action(self, connection, action, params):
+        kwargs = dict(zip([param.name for param in GET_READING_IMAGE.parameters], params))
+        errors = GET_READING_IMAGE.validate_params(kwargs)
+        if errors:
+            raise ValueError(", ".join(errors))
+        self.calls.append((connection, action, kwargs))
+        return {"status": "done", "image_url": "https://example.com/card.jpg"}
+
+
+@pytest.fixture
+def agent():
+    return FakeAgent()
+
+
+@pytest.fixture
+def client(agent):
+    server = ZerePyServer()
+    server.state.cli.agent = agent
+    return TestClient(server.app)
+
+
+def test_get_reading_image_as_the_backend_sends_it(client, agent):
+    # Mirrors waitForReadingImage in tarot.agent.backend/app.js
+    response = client.post("/agent/action", json={
+        "connection": "tarot-reader",
+        "action": "get-reading-image",
+        "params": ["job-1", str(30)]
+    })
+    assert response.status_code == 200
+    assert response.json()["result"]["status"] == "done"
+    assert agent.calls == [("tarot-reader", "get-reading-image", {"job_id": "job-1", "wait": 30.0})]
+
+
+def test_action_params_must_be_strings(client):
+    response = client.post("/agent/action", json={
+        "connection": "tarot-reader",
+        "action": "get-reading-image",
+        "params": ["job-1", 30]
+    })
+    assert response.status_code == 422
+
+
+def test_listing_connections_builds_none_of_them(client, agent):
+    manager = ConnectionManager([{"name": "twitter"}, {"name": "openai", "model": "gpt-4"}])
+    agent.connection_manager = manager
+    response = client.get("/connections")
+    assert response.status_code == 200
+    assert response.json()["connections"] == {
+        "twitter": {"configured": None, "is_llm_provider": False, "loaded": False},
+        "openai": {"configured": None, "is_llm_provider": True, "loaded": False}
+    }
+    assert manager.connections.loaded() == {}
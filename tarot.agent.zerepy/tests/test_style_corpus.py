@@ -0,0 +1,27 @@
+from src.helpers.style_corpus import StyleCorpus
+
+
+def test_fetched_tweets_are_merged_ahead_of_stored_ones(tmp_path):
+    path = str(tmp_path / "example_tweets.json")
+    corpus = StyleCorpus(path, max_tweets=3)
+    assert corpus.refresh(["oracle"], lambda account: [{"text": "the star"}, {"text": "the moon"}]) == 1
+    assert corpus.refresh(["oracle"], lambda account: [{"text": "the sun"}, {"text": "the star"}]) == 1
+    assert StyleCorpus(path).tweets(["oracle"]) == ["the sun", "the star", "the moon"]
+
+
+def test_failed_fetch_keeps_the_account_stale(tmp_path):
+    corpus = StyleCorpus(str(tmp_path / "example_tweets.json"))
+
+    def fetch(account):
+        if account == "raises":
+            raise RuntimeError("rate limited")
+        return None
+
+    assert corpus.refresh(["raises", "returns-none"], fetch) == 0
+    assert corpus.stale_accounts(["raises", "returns-none"]) == ["raises", "returns-none"]
+
+
+def test_fetch_with_no_new_tweets_is_a_refresh(tmp_path):
+    corpus = StyleCorpus(str(tmp_path / "example_tweets.json"))
+    assert corpus.refresh(["oracle"], lambda account: []) == 1
+    assert corpus.stale_accounts(["oracle"]) == []
@@ -0,0 +1,77 @@
+import pytest
+
+from src.connections import twitter_connection as twitter_module
+from src.connections.twitter_connection import ReadCursors, TwitterConnection
+
+CONFIG = {"name": "twitter", "timeline_read_count": 10, "tweet_interval": 900, "own_tweet_replies_count": 2}
+
+
+class FakeListing:
+    """A newest first listing paged two tweets at a time, records the requests made"""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.requests = []
+
+    def __call__(self, method, endpoint, params=None, **kwargs):
+        self.requests.append(dict(params))
+        ids = [i for i in self.ids if not params.get("since_id") or i > int(params["since_id"])]
+        start = int(params.get("pagination_token") or 0)
+        page = ids[start:start + 2]
+        meta = {"newest_id": str(ids[0])} if ids else {}
+        if start + 2 < len(ids):
+            meta["next_token"] = str(start + 2)
+        return {"data": [{"id": str(i), "author_id": "1", "text": f"tweet {i}"} for i in page], "meta": meta}
+
+
+@pytest.fixture
+def twitter(tmp_path, monkeypatch):
+    monkeypatch.setattr(twitter_module, "ReadCursors", lambda: ReadCursors(str(tmp_path / "cursors.json")))
+    connection = TwitterConnection(dict(CONFIG))
+    connection._make_request = FakeListing([9, 8, 7, 6, 5])
+    return connection
+
+
+def read(twitter, cursor_key="timeline", max_results=None):
+    return [int(tweet["id"]) for tweet in twitter.iter_tweets("listing", {}, cursor_key, max_results=max_results)]
+
+
+def test_read_pages_until_the_listing_is_exhausted(twitter):
+    assert read(twitter) == [9, 8, 7, 6, 5]
+    twitter._make_request.ids.insert(0, 10)
+    assert read(twitter) == [10]
+
+
+def test_short_read_completes_at_the_newest_tweet(twitter):
+    assert read(twitter, max_results=3) == [9, 8, 7]
+    assert twitter.cursors.get("timeline")["since_id"] == "9"
+    assert read(twitter) == []
+
+
+def test_stopped_read_completes_at_the_newest_tweet(twitter):
+    tweets = twitter.iter_tweets("listing", {}, "timeline")
+    assert next(tweets)["id"] == "9"
+    tweets.close()
+    assert read(twitter) == []
+
+
+def test_failed_read_is_made_again(twitter):
+    listing = twitter._make_request
+
+    def fail_second_page(method, endpoint, params=None, **kwargs):
+        if params.get("pagination_token"):
+            raise RuntimeError("rate limited")
+        return listing(method, endpoint, params)
+
+    twitter._make_request = fail_second_page
+    with pytest.raises(RuntimeError):
+        read(twitter)
+    twitter._make_request = listing
+    assert read(twitter) == [9, 8, 7, 6, 5]
+
+
+def test_read_without_incremental_reads_is_one_request(twitter):
+    tweets = twitter._read("listing", {}, "timeline", 10)
+    assert [tweet["id"] for tweet in tweets] == ["9", "8"]
+    assert len(twitter._make_request.requests) == 1
+    assert twitter.cursors.get("timeline") == {}
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from src.helpers.user_limits import (
+    FileLimitStore,
+    MemoryLimitStore,
+    RedisLimitStore,
+    UserLimiter,
+    find_user_limiter,
+    get_user_limiter,
+)
+
+
+def hit_concurrently(store, key, callers=20, window=60, limit=2):
+    """Hit a key from many threads at once, returns the waits they got"""
+    barrier = threading.Barrier(callers)
+    waits = []
+    lock = threading.Lock()
+
+    def hit():
+        barrier.wait()
+        wait = store.hit(key, window, limit)
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=hit) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return waits
+
+
+@pytest.fixture
+def redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisLimitStore(client=fakeredis.FakeRedis(), prefix="test:")
+
+
+def test_memory_store_admits_only_limit_of_concurrent_hits():
+    waits = hit_concurrently(MemoryLimitStore(), "readings:telegram:1")
+    assert waits.count(0.0) == 2
+    assert all(0 < wait <= 60 for wait in waits if wait)
+
+
+def test_memory_store_frees_slots_after_window():
+    store = MemoryLimitStore()
+    assert store.hit("key", 0.1, 1) == 0.0
+    assert store.hit("key", 0.1, 1) > 0
+    time.sleep(0.15)
+    assert store.hit("key", 0.1, 1) == 0.0
+
+
+def test_memory_store_undo_gives_back_latest_hit():
+    store = MemoryLimitStore()
+    assert store.hit("key", 60, 1) == 0.0
+    store.undo("key")
+    assert store.hit("key", 60, 1) == 0.0
+    assert store.hit("key", 60, 1) > 0
+
+
+def test_file_store_keeps_hits_across_restarts(tmp_path):
+    path = str(tmp_path / "limits.json")
+    assert FileLimitStore(path).hit("key", 60, 1) == 0.0
+    assert FileLimitStore(path).hit("key", 60, 1) > 0
+
+
+def test_limiters_default_to_a_shared_file_store(tmp_path):
+    path = str(tmp_path / "limits.json")
+    readings = UserLimiter.from_config("readings", {"path": path, "limit": 1})
+    spreads = UserLimiter.from_config("spreads", {"path": path, "limit": 1})
+    assert isinstance(readings._store, FileLimitStore)
+    assert spreads._store is readings._store
+    assert readings.acquire("telegram:1") == 0.0
+    assert spreads.acquire("telegram:1") == 0.0
+    assert UserLimiter("readings", FileLimitStore(path), window=60, limit=1).acquire("telegram:1") > 0
+
+
+def test_file_store_ignores_unreadable_file(tmp_path):
+    path = tmp_path / "limits.json"
+    path.write_text("not json")
+    assert FileLimitStore(str(path)).hit("key", 60, 1) == 0.0
+
+
+def test_redis_store_admits_only_limit_of_concurrent_hits(redis_store):
+    waits = hit_concurrently(redis_store, "readings:telegram:1")
+    assert waits.count(0.0) == 2
+    assert all(0 < wait <= 60 for wait in waits if wait)
+
+
+def test_redis_store_undo_gives_back_latest_hit(redis_store):
+    assert redis_store.hit("key", 60, 2) == 0.0
+    assert redis_store.hit("key", 60, 2) == 0.0
+    assert redis_store.hit("key", 60, 2) > 0
+    redis_store.undo("key")
+    assert redis_store.hit("key", 60, 2) == 0.0
+    assert redis_store.size() == 1
+
+
+def test_limiter_counts_and_releases():
+    limiter = UserLimiter("readings", MemoryLimitStore(), window=60, limit=1)
+    assert limiter.acquire("telegram:1") == 0.0
+    assert limiter.acquire("telegram:1") > 0
+    assert limiter.acquire("telegram:2") == 0.0
+    limiter.release("telegram:1")
+    assert limiter.acquire("telegram:1") == 0.0
+    assert limiter.stats()["allowed"] == 3
+    assert limiter.stats()["denied"] == 1
+
+
+@pytest.mark.parametrize("config", [
+    "readings",
+    {"unknown": 1},
+    {"backend": "sqlite"},
+    {"window": 0},
+    {"limit": 1.5},
+])
+def test_limiter_config_is_validated(config):
+    with pytest.raises(ValueError):
+        UserLimiter.from_config("readings", config)
+
+
+def test_registry_shares_limiters_by_key():
+    first = get_user_limiter("test-shared", {"limit": 3, "backend": "memory"})
+    assert get_user_limiter("test-shared") is first
+    assert find_user_limiter("test-shared") is first
+    assert get_user_limiter("other", {"key": "test-shared"}) is first
+    assert first.limit == 3